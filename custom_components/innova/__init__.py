@@ -2,33 +2,181 @@
 from __future__ import annotations
 
 import logging
+from collections.abc import Mapping
 from datetime import timedelta
+from importlib import import_module
+from typing import TYPE_CHECKING, Any
 
+import voluptuous as vol
 from homeassistant.config_entries import ConfigEntry
-from homeassistant.const import CONF_HOST, Platform
-from homeassistant.core import HomeAssistant
-from homeassistant.helpers.aiohttp_client import async_get_clientsession
-from innova_controls.innova import Innova
+from homeassistant.const import CONF_HOST, EVENT_HOMEASSISTANT_CLOSE
+from homeassistant.core import Event, HomeAssistant, ServiceCall
+from homeassistant.helpers import config_validation as cv
+from homeassistant.helpers.typing import ConfigType
 
-from .const import DOMAIN, DEFAULT_SCAN_INTERVAL
-from .coordinator import InnovaCoordinator
+from .const import (
+    CONF_COMPACT_STATISTICS,
+    CONF_EXTERNAL_SENSOR,
+    CONF_GATEWAY,
+    DATA_ANALYTICS,
+    DATA_LOAD_MANAGER,
+    DATA_ORCHESTRATOR,
+    DEFAULT_COMPACT_STATISTICS,
+    DEFAULT_LOAD_MIN_RUNTIME,
+    DEFAULT_LOAD_ROTATION,
+    DOMAIN,
+    MAX_CONCURRENT_REQUESTS,
+    POLL_JITTER,
+    RELOAD_OPTIONS,
+    SERVICE_SET_LOAD_LIMIT,
+    STARTUP_SPREAD,
+)
+from .discovery import format_uid
 
-PLATFORMS: list[Platform] = [Platform.CLIMATE, Platform.SENSOR, Platform.SWITCH]
+if TYPE_CHECKING:
+    from innova_controls.innova import Innova
+
+    from .cache import InnovaStateCache
+    from .coordinator import InnovaCoordinator
+    from .orchestrator import InnovaPollOrchestrator
+    from .runtime import InnovaRuntimeTracker
+    from .transport import InnovaTransport
 
 _LOGGER = logging.getLogger(__name__)
 
+CONFIG_SCHEMA = cv.config_entry_only_config_schema(DOMAIN)
+
+# Only needed once the integration is set up, not to load it for its config
+# flow. They are built on the device models of the client, and analytics on NumPy.
+ENTRY_MODULES = ("coordinator", "statistics", "analytics")
+
+SET_LOAD_LIMIT_SCHEMA = vol.Schema(
+    {
+        vol.Required("max_active_units"): vol.All(vol.Coerce(int), vol.Range(min=0)),
+        vol.Optional(
+            "min_runtime", default=DEFAULT_LOAD_MIN_RUNTIME // 60
+        ): vol.All(vol.Coerce(int), vol.Range(min=0)),
+        vol.Optional(
+            "rotation", default=DEFAULT_LOAD_ROTATION // 60
+        ): vol.All(vol.Coerce(int), vol.Range(min=1)),
+    }
+)
+
+
+async def async_setup(hass: HomeAssistant, config: ConfigType) -> bool:
+    """Set up the load manager shared by all the units."""
+    await _async_import_entry_modules(hass)
+    from .analytics import InnovaFleetAnalytics
+    from .load_manager import InnovaLoadManager
+
+    hass.data.setdefault(DOMAIN, {})
+    load_manager = InnovaLoadManager(hass)
+    await load_manager.async_load()
+    load_manager.async_start()
+    hass.data[DOMAIN][DATA_LOAD_MANAGER] = load_manager
+
+    async def _async_set_load_limit(call: ServiceCall) -> None:
+        load_manager.async_configure(
+            call.data["max_active_units"],
+            timedelta(minutes=call.data["min_runtime"]),
+            timedelta(minutes=call.data["rotation"]),
+        )
+
+    hass.services.async_register(
+        DOMAIN, SERVICE_SET_LOAD_LIMIT, _async_set_load_limit, SET_LOAD_LIMIT_SCHEMA
+    )
+
+    fleet_analytics = InnovaFleetAnalytics(hass)
+    fleet_analytics.async_start()
+    hass.data[DOMAIN][DATA_ANALYTICS] = fleet_analytics
+    return True
+
 
 async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     """Set up Innova AC from a config entry."""
+    from .compensation import InnovaTemperatureCompensator
+    from .preconditioning import InnovaPreconditioner
+    from .statistics import InnovaTemperatureStatistics
+    from .transport import InnovaTransport
+
     hass.data.setdefault(DOMAIN, {})
     host = entry.data[CONF_HOST]
-    session = async_get_clientsession(hass)
-    api = Innova(http_session=session, host=host)
+    if gateway := entry.options.get(CONF_GATEWAY):
+        # The gateway serves the API of each unit under its own path
+        host = f"{gateway}/units/{host}"
+    # Each unit gets its own keep-alive connection instead of the shared session,
+    # a gateway gets a second one for the event requests it holds
+    transport = InnovaTransport(host, connections=2 if gateway else 1)
+    entry.async_on_unload(transport.async_close)
+
+    async def _async_close_transport(_event: Event) -> None:
+        await transport.async_close()
+
+    entry.async_on_unload(
+        hass.bus.async_listen_once(EVENT_HOMEASSISTANT_CLOSE, _async_close_transport)
+    )
+    # The client and its device models are only needed once an entry is set up,
+    # not to load the integration for its config flow
+    client = await hass.async_add_import_executor_job(
+        import_module, "innova_controls.innova"
+    )
+    api = client.Innova(http_session=transport, host=host)
 
     # Get the scan interval from options, falling back to the default
-    coordinator = await _async_update_coordinator(hass, entry, api)
+    coordinator = await _async_update_coordinator(hass, entry, api, transport)
+
+    try:
+        if entry.unique_id is None and (uid := coordinator.value("uid")):
+            # Entries added before discovery have no unique id, DHCP updates need one
+            unique_id = format_uid(uid)
+            if all(
+                other.unique_id != unique_id
+                for other in hass.config_entries.async_entries(DOMAIN)
+            ):
+                hass.config_entries.async_update_entry(entry, unique_id=unique_id)
+
+        preconditioner = InnovaPreconditioner(hass, coordinator, entry.entry_id)
+        await preconditioner.async_load()
+        coordinator.preconditioner = preconditioner
+        entry.async_on_unload(preconditioner.async_start())
+
+        if external_sensor := entry.options.get(CONF_EXTERNAL_SENSOR):
+            compensator = InnovaTemperatureCompensator(
+                hass, coordinator, entry.entry_id, external_sensor
+            )
+            await compensator.async_load()
+            coordinator.compensator = compensator
+            entry.async_on_unload(compensator.async_start())
+
+        if entry.options.get(CONF_COMPACT_STATISTICS, DEFAULT_COMPACT_STATISTICS):
+            statistics = InnovaTemperatureStatistics(hass, coordinator, entry.entry_id)
+            await statistics.async_load()
+            entry.async_on_unload(statistics.async_start())
+            entry.async_on_unload(statistics.async_save)
+
+        load_manager = hass.data[DOMAIN][DATA_LOAD_MANAGER]
+        load_manager.register(entry.entry_id, coordinator)
+        fleet_analytics = hass.data[DOMAIN][DATA_ANALYTICS]
+        fleet_analytics.register(entry.entry_id, coordinator)
+
+        # Only the platforms the unit has entities for are loaded
+        coordinator.platforms = coordinator.capabilities.platforms
+        await hass.config_entries.async_forward_entry_setups(entry, coordinator.platforms)
+    except Exception:
+        # Nothing registered for the entry may outlive its failed setup
+        await _async_teardown(hass, entry.entry_id, coordinator)
+        raise
 
-    await hass.config_entries.async_forward_entry_setups(entry, PLATFORMS)
+    if coordinator.event_channel is not None:
+        # A gateway serves the event channel, a unit is probed for it once
+        coordinator.event_channel.async_start(probe=not gateway)
+
+    if coordinator.restored:
+        entry.async_create_background_task(
+            hass,
+            _async_refresh_restored(hass, coordinator),
+            f"{DOMAIN} {entry.title} first refresh",
+        )
 
     # Listen for changes in options
     entry.async_on_unload(entry.add_update_listener(_async_options_updated))
@@ -38,43 +186,89 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
 
 async def async_unload_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     """Unload a config entry."""
-    if unload_ok := await hass.config_entries.async_unload_platforms(entry, PLATFORMS):
-        hass.data[DOMAIN].pop(entry.entry_id)
+    coordinator: InnovaCoordinator = hass.data[DOMAIN][entry.entry_id]
+    if unload_ok := await hass.config_entries.async_unload_platforms(
+        entry, coordinator.platforms
+    ):
+        await _async_teardown(hass, entry.entry_id, coordinator)
 
     return unload_ok
 
 
+async def async_remove_entry(hass: HomeAssistant, entry: ConfigEntry) -> None:
+    """Remove everything stored for a deleted entry."""
+    await _async_import_entry_modules(hass)
+    from .cache import InnovaStateCache
+    from .compensation import InnovaTemperatureCompensator
+    from .preconditioning import InnovaPreconditioner
+    from .runtime import InnovaRuntimeTracker
+    from .statistics import InnovaTemperatureStatistics
+
+    await InnovaStateCache(hass, entry.entry_id).async_remove()
+    await InnovaTemperatureStatistics.async_remove_store(hass, entry.entry_id)
+    await InnovaRuntimeTracker.async_remove_store(hass, entry.entry_id)
+    await InnovaPreconditioner.async_remove_store(hass, entry.entry_id)
+    await InnovaTemperatureCompensator.async_remove_store(hass, entry.entry_id)
+
+
+async def _async_teardown(
+    hass: HomeAssistant, entry_id: str, coordinator: InnovaCoordinator
+) -> None:
+    """Stop the coordinator of an entry and unregister it from the fleet."""
+    hass.data[DOMAIN].pop(entry_id, None)
+    await coordinator.async_shutdown()
+    hass.data[DOMAIN][DATA_LOAD_MANAGER].unregister(entry_id)
+    hass.data[DOMAIN][DATA_ANALYTICS].unregister(entry_id)
+
+    orchestrator: InnovaPollOrchestrator = hass.data[DOMAIN][DATA_ORCHESTRATOR]
+    orchestrator.unregister(entry_id)
+    if not orchestrator.units:
+        hass.data[DOMAIN].pop(DATA_ORCHESTRATOR)
+
+
 async def _async_options_updated(hass: HomeAssistant, entry: ConfigEntry) -> None:
     """Handle options update."""
-    host = entry.data[CONF_HOST]
-    session = async_get_clientsession(hass)
-    api = Innova(http_session=session, host=host)
-    
-    # Reinitialize the coordinator with updated options
-    coordinator = hass.data[DOMAIN][entry.entry_id]
-    scan_interval_seconds = entry.options.get("scan_interval", DEFAULT_SCAN_INTERVAL)
-    scan_interval = timedelta(seconds=scan_interval_seconds)
-
-    # Dynamically update the polling interval
-    coordinator.update_interval = scan_interval
-
-    # Trigger an immediate refresh of the entities
-    await coordinator.async_refresh()
+    coordinator: InnovaCoordinator = hass.data[DOMAIN][entry.entry_id]
 
-    # Unload the existing platforms
-    await hass.config_entries.async_unload_platforms(entry, PLATFORMS)
+    # Only options changing the set of entities need the entry to be reloaded,
+    # everything else is applied to the running coordinator and entities.
+    if any(
+        entry.options.get(option) != coordinator.options.get(option)
+        for option in RELOAD_OPTIONS
+    ):
+        await hass.config_entries.async_reload(entry.entry_id)
+        return
 
-    # Recreate entities by setting up platforms again
-    await hass.config_entries.async_forward_entry_setups(entry, PLATFORMS)
+    coordinator.async_apply_options(entry.options)
 
 
-async def _async_update_coordinator(hass: HomeAssistant, entry: ConfigEntry, api: Innova):
+async def _async_update_coordinator(
+    hass: HomeAssistant, entry: ConfigEntry, api: Innova, transport: InnovaTransport
+):
     """Helper function to update the coordinator."""
-    scan_interval_seconds = entry.options.get("scan_interval", DEFAULT_SCAN_INTERVAL)
-    scan_interval = timedelta(seconds=scan_interval_seconds)
+    from .cache import InnovaStateCache
+    from .runtime import InnovaRuntimeTracker
+
+    orchestrator = _get_orchestrator(hass)
+    orchestrator.register(entry.entry_id)
+
+    cache = InnovaStateCache(hass, entry.entry_id)
+    runtime = InnovaRuntimeTracker(hass, entry.entry_id)
+    await runtime.async_load()
+    coordinator = create_coordinator(
+        hass, api, cache, entry.options, transport, runtime
+    )
 
-    coordinator = create_coordinator(hass, api, scan_interval)
-    await coordinator.async_config_entry_first_refresh()
+    if (snapshot := await cache.async_load()) is not None:
+        # Come up from the last known state, the unit is polled in the background
+        coordinator.async_restore(snapshot)
+    else:
+        await orchestrator.async_stagger()
+        try:
+            await coordinator.async_config_entry_first_refresh()
+        except Exception:
+            orchestrator.unregister(entry.entry_id)
+            raise
 
     # Save the coordinator in hass.data
     hass.data[DOMAIN][entry.entry_id] = coordinator
@@ -82,14 +276,56 @@ async def _async_update_coordinator(hass: HomeAssistant, entry: ConfigEntry, api
     return coordinator
 
 
-def create_coordinator(hass: HomeAssistant, api: Innova, scan_interval: timedelta) -> InnovaCoordinator:
-    """Create the coordinator with the provided scan interval."""
+async def _async_refresh_restored(
+    hass: HomeAssistant, coordinator: InnovaCoordinator
+) -> None:
+    """Reach a unit restored from the cache for the first time."""
+    await _get_orchestrator(hass).async_stagger()
+    await coordinator.async_refresh()
+
+
+def _get_orchestrator(hass: HomeAssistant) -> InnovaPollOrchestrator:
+    """Return the polling orchestrator shared by all the units."""
+    from .orchestrator import InnovaPollOrchestrator
+
+    if DATA_ORCHESTRATOR not in hass.data[DOMAIN]:
+        hass.data[DOMAIN][DATA_ORCHESTRATOR] = InnovaPollOrchestrator(
+            hass, MAX_CONCURRENT_REQUESTS, POLL_JITTER, STARTUP_SPREAD
+        )
+    return hass.data[DOMAIN][DATA_ORCHESTRATOR]
+
+
+def create_coordinator(
+    hass: HomeAssistant,
+    api: Innova,
+    cache: InnovaStateCache,
+    options: Mapping[str, Any],
+    transport: InnovaTransport | None = None,
+    runtime: InnovaRuntimeTracker | None = None,
+) -> InnovaCoordinator:
+    """Create the coordinator with the provided options."""
+    from .coordinator import InnovaCoordinator
+
     coordinator = InnovaCoordinator(
         hass,
         api,
         _LOGGER,
         name=DOMAIN,
-        update_interval=scan_interval
+        options=options,
+        orchestrator=_get_orchestrator(hass),
+        cache=cache,
+        transport=transport,
+        runtime=runtime,
     )
 
     return coordinator
+
+
+async def _async_import_entry_modules(hass: HomeAssistant) -> None:
+    """Import the modules of the entries off the event loop."""
+    await hass.async_add_import_executor_job(_import_entry_modules)
+
+
+def _import_entry_modules() -> None:
+    for module in ENTRY_MODULES:
+        import_module(f"{__name__}.{module}")
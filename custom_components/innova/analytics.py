@@ -0,0 +1,302 @@
+"""Fleet-wide detection of units slow to heat or cool their room."""
+from __future__ import annotations
+
+import logging
+import time
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import TYPE_CHECKING
+
+import numpy as np
+from homeassistant.components.climate import HVACAction
+from homeassistant.core import CALLBACK_TYPE, HomeAssistant, callback
+from homeassistant.helpers import issue_registry as ir
+from homeassistant.helpers.event import async_track_time_interval
+
+from .const import (
+    ANALYTICS_CYCLE,
+    ANALYTICS_MAX_GAP,
+    ANALYTICS_MIN_ACTIVE,
+    ANALYTICS_MIN_DEMAND,
+    ANALYTICS_MIN_UNITS,
+    ANALYTICS_OUTLIER_SCORE,
+    ANALYTICS_WINDOW,
+    DOMAIN,
+)
+from .hvac_action import infer_hvac_action
+
+if TYPE_CHECKING:
+    from .coordinator import InnovaCoordinator
+
+_LOGGER = logging.getLogger(__name__)
+
+# Sign of the expected change of the ambient temperature while the unit runs
+_SIGNS = {HVACAction.HEATING: 1.0, HVACAction.COOLING: -1.0}
+# Scales the median absolute deviation to the standard deviation of a normal law
+_MAD_SCALE = 0.6745
+
+
+@dataclass(frozen=True, slots=True)
+class UnitResponse:
+    """How fast a unit moved the temperature of its room, in °C per hour."""
+
+    heating_rate: float | None = None
+    cooling_rate: float | None = None
+    slow_heating: bool = False
+    slow_cooling: bool = False
+
+    @property
+    def slow(self) -> bool:
+        """Return True when the unit is an outlier of the fleet."""
+        return self.slow_heating or self.slow_cooling
+
+
+def response_rates(
+    times: np.ndarray, temps: np.ndarray, signs: np.ndarray
+) -> tuple[np.ndarray, np.ndarray]:
+    """Return the heating and cooling rate of every unit, NaN without enough data.
+
+    Each row holds the ring of samples of a unit, unfilled slots are NaN.
+    Consecutive samples pair each slot with the one before it, the pair
+    wrapping from the newest to the oldest sample has a negative duration
+    and is dropped like the pairs over a gap or a change of action.
+    """
+    durations = times - np.roll(times, 1, axis=1)
+    changes = (temps - np.roll(temps, 1, axis=1)) * signs
+    valid = (
+        (durations > 0)
+        & (durations <= ANALYTICS_MAX_GAP)
+        & (signs == np.roll(signs, 1, axis=1))
+        & np.isfinite(changes)
+    )
+    rates = []
+    for sign in (1.0, -1.0):
+        mask = valid & (signs == sign)
+        active = np.where(mask, durations, 0.0).sum(axis=1)
+        change = np.where(mask, changes, 0.0).sum(axis=1)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            rate = np.where(active >= ANALYTICS_MIN_ACTIVE, change / active * 3600, np.nan)
+        rates.append(rate)
+    return rates[0], rates[1]
+
+
+def slow_outliers(rates: np.ndarray) -> np.ndarray:
+    """Return which rates are far below those of the rest of the fleet.
+
+    Uses the modified z-score, from the median and the median absolute
+    deviation, which a few failing units do not drag along.
+    """
+    known = np.isfinite(rates)
+    if known.sum() < ANALYTICS_MIN_UNITS:
+        return np.zeros(rates.shape, dtype=bool)
+    median = np.median(rates[known])
+    deviation = np.median(np.abs(rates[known] - median))
+    if deviation == 0:
+        return np.zeros(rates.shape, dtype=bool)
+    with np.errstate(invalid="ignore"):
+        return known & (_MAD_SCALE * (rates - median) / deviation < -ANALYTICS_OUTLIER_SCORE)
+
+
+def analyze(
+    times: np.ndarray, temps: np.ndarray, signs: np.ndarray
+) -> tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    """Return the rates of the fleet and which of them are outliers."""
+    heating, cooling = response_rates(times, temps, signs)
+    return heating, cooling, slow_outliers(heating), slow_outliers(cooling)
+
+
+class InnovaFleetAnalytics:
+    """Compare how fast the units of the fleet heat and cool their room.
+
+    Every poll adds a sample to the row of the unit in arrays shared by the
+    fleet. Every cycle, the rates of all the units are computed at once
+    from a copy of the arrays in the executor, and a unit much slower than
+    the others, like one with a clogged filter, gets a repair issue and
+    turns its binary sensor on. Only the samples taken while the unit runs
+    at least ANALYTICS_MIN_DEMAND away from its target are used, close to
+    the target the rate says more about the room than the unit.
+    """
+
+    def __init__(self, hass: HomeAssistant) -> None:
+        """Initialize the analytics."""
+        self._hass = hass
+        self._rows: dict[str, int] = {}
+        self._free: list[int] = []
+        self._names: dict[str, str] = {}
+        self._unsubs: dict[str, CALLBACK_TYPE] = {}
+        self._listeners: list[CALLBACK_TYPE] = []
+        # One row per unit, grown when the fleet outgrows it
+        self._times = np.full((0, ANALYTICS_WINDOW), np.nan)
+        self._temps = np.full((0, ANALYTICS_WINDOW), np.nan)
+        self._signs = np.zeros((0, ANALYTICS_WINDOW))
+        self._counts = np.zeros(0, dtype=np.int64)
+        self._running = False
+        self.results: dict[str, UnitResponse] = {}
+        self.cycles = 0
+        self.last_duration: float | None = None
+
+    @callback
+    def async_start(self) -> None:
+        """Run a cycle periodically until Home Assistant stops."""
+        async_track_time_interval(
+            self._hass,
+            self._async_cycle,
+            timedelta(seconds=ANALYTICS_CYCLE),
+            cancel_on_shutdown=True,
+        )
+
+    @callback
+    def register(self, entry_id: str, coordinator: InnovaCoordinator) -> None:
+        """Sample the unit of an entry at every poll."""
+        if self._free:
+            row = self._free.pop()
+        else:
+            row = len(self._rows)
+            if row >= len(self._counts):
+                self._grow(max(2 * len(self._counts), 4))
+        self._rows[entry_id] = row
+        self._names[entry_id] = coordinator.value("name") or entry_id
+
+        @callback
+        def _async_sample() -> None:
+            self._async_sample(row, coordinator)
+
+        self._unsubs[entry_id] = coordinator.async_add_poll_listener(_async_sample)
+
+    @callback
+    def unregister(self, entry_id: str) -> None:
+        """Stop sampling the unit of an entry and drop its issue."""
+        if (row := self._rows.pop(entry_id, None)) is None:
+            return
+        self._unsubs.pop(entry_id)()
+        self._names.pop(entry_id)
+        self._times[row] = np.nan
+        self._temps[row] = np.nan
+        self._signs[row] = 0
+        self._counts[row] = 0
+        self._free.append(row)
+        self.results.pop(entry_id, None)
+        ir.async_delete_issue(self._hass, DOMAIN, _issue_id(entry_id))
+
+    def result(self, entry_id: str) -> UnitResponse:
+        """Return the last rates of the unit of an entry."""
+        return self.results.get(entry_id, UnitResponse())
+
+    @callback
+    def async_add_listener(self, update_callback: CALLBACK_TYPE) -> CALLBACK_TYPE:
+        """Listen for the results of the cycles, return a callback to stop listening."""
+        self._listeners.append(update_callback)
+
+        @callback
+        def _async_remove() -> None:
+            self._listeners.remove(update_callback)
+
+        return _async_remove
+
+    def as_dict(self) -> dict[str, float | int | None]:
+        """Return the state of the analytics for diagnostics."""
+        return {
+            "units": len(self._rows),
+            "rows": len(self._counts),
+            "cycles": self.cycles,
+            "last_duration": self.last_duration,
+        }
+
+    def _grow(self, rows: int) -> None:
+        added = rows - len(self._counts)
+        self._times = np.vstack([self._times, np.full((added, ANALYTICS_WINDOW), np.nan)])
+        self._temps = np.vstack([self._temps, np.full((added, ANALYTICS_WINDOW), np.nan)])
+        self._signs = np.vstack([self._signs, np.zeros((added, ANALYTICS_WINDOW))])
+        self._counts = np.concatenate([self._counts, np.zeros(added, dtype=np.int64)])
+
+    @callback
+    def _async_sample(self, row: int, coordinator: InnovaCoordinator) -> None:
+        value = coordinator.value
+        ambient, target = value("ambient_temp"), value("target_temperature")
+        sign = 0.0
+        if (
+            ambient is not None
+            and target is not None
+            and abs(target - ambient) >= ANALYTICS_MIN_DEMAND
+        ):
+            action = infer_hvac_action(value("power"), value("mode"), ambient, target)
+            sign = _SIGNS.get(action, 0.0)
+        column = self._counts[row] % ANALYTICS_WINDOW
+        self._times[row, column] = time.time()
+        self._temps[row, column] = ambient if ambient is not None else np.nan
+        self._signs[row, column] = sign
+        self._counts[row] += 1
+
+    async def _async_cycle(self, _now: datetime | None = None) -> None:
+        """Compute the rates of the fleet in the executor and report the outliers."""
+        if self._running or not self._rows:
+            return
+        self._running = True
+        rows = dict(self._rows)
+        start = time.perf_counter()
+        try:
+            heating, cooling, slow_heating, slow_cooling = (
+                await self._hass.async_add_executor_job(
+                    analyze, self._times.copy(), self._temps.copy(), self._signs.copy()
+                )
+            )
+        finally:
+            self._running = False
+        self.cycles += 1
+        self.last_duration = time.perf_counter() - start
+
+        for entry_id, row in rows.items():
+            if self._rows.get(entry_id) != row:
+                # Unloaded while the cycle ran
+                continue
+            response = UnitResponse(
+                heating_rate=_rate(heating[row]),
+                cooling_rate=_rate(cooling[row]),
+                slow_heating=bool(slow_heating[row]),
+                slow_cooling=bool(slow_cooling[row]),
+            )
+            previous = self.results.get(entry_id, UnitResponse())
+            self.results[entry_id] = response
+            if response.slow and not previous.slow:
+                self._async_create_issue(entry_id, response, heating, cooling)
+            elif previous.slow and not response.slow:
+                ir.async_delete_issue(self._hass, DOMAIN, _issue_id(entry_id))
+
+        for update_callback in list(self._listeners):
+            update_callback()
+
+    @callback
+    def _async_create_issue(
+        self,
+        entry_id: str,
+        response: UnitResponse,
+        heating: np.ndarray,
+        cooling: np.ndarray,
+    ) -> None:
+        if response.slow_heating:
+            mode, rate, rates = "heating", response.heating_rate, heating
+        else:
+            mode, rate, rates = "cooling", response.cooling_rate, cooling
+        name = self._names[entry_id]
+        _LOGGER.warning("Innova unit %s is much slower %s than the others", name, mode)
+        ir.async_create_issue(
+            self._hass,
+            DOMAIN,
+            _issue_id(entry_id),
+            is_fixable=False,
+            severity=ir.IssueSeverity.WARNING,
+            translation_key=f"slow_{mode}",
+            translation_placeholders={
+                "name": name,
+                "rate": f"{rate:.2f}",
+                "median": f"{float(np.nanmedian(rates)):.2f}",
+            },
+        )
+
+
+def _issue_id(entry_id: str) -> str:
+    return f"slow_response_{entry_id}"
+
+
+def _rate(value: float) -> float | None:
+    return round(float(value), 2) if np.isfinite(value) else None
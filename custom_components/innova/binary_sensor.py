@@ -0,0 +1,78 @@
+from __future__ import annotations
+
+from typing import TYPE_CHECKING, Any
+
+from homeassistant.components.binary_sensor import (
+    BinarySensorDeviceClass,
+    BinarySensorEntity,
+)
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers.entity_platform import AddEntitiesCallback
+
+from .const import DATA_ANALYTICS, DOMAIN
+from .coordinator import InnovaCoordinator
+from .entity import InnovaCoordinatorEntity
+
+if TYPE_CHECKING:
+    from .analytics import InnovaFleetAnalytics
+
+
+async def async_setup_entry(
+    hass: HomeAssistant,
+    config_entry: ConfigEntry,
+    async_add_entities: AddEntitiesCallback,
+):
+    coordinator: InnovaCoordinator = hass.data[DOMAIN][config_entry.entry_id]
+    async_add_entities(
+        [
+            InnovaSlowResponseBinarySensor(
+                coordinator, hass.data[DOMAIN][DATA_ANALYTICS], config_entry.entry_id
+            )
+        ]
+    )
+
+
+class InnovaSlowResponseBinarySensor(InnovaCoordinatorEntity, BinarySensorEntity):
+    """On when the unit heats or cools its room much slower than the rest of the fleet."""
+
+    _attr_device_class = BinarySensorDeviceClass.PROBLEM
+    _sensor_name = "slow-response"
+    # Written by the fleet analytics after each of their cycles
+    _innova_fields = frozenset()
+
+    def __init__(
+        self,
+        coordinator: InnovaCoordinator,
+        analytics: InnovaFleetAnalytics,
+        entry_id: str,
+    ) -> None:
+        super().__init__(coordinator)
+        self._analytics = analytics
+        self._entry_id = entry_id
+
+    async def async_added_to_hass(self) -> None:
+        await super().async_added_to_hass()
+        self.async_on_remove(self._analytics.async_add_listener(self.async_write_ha_state))
+
+    @property
+    def name(self) -> str | None:
+        return f"{self._device_info.name}-{self._sensor_name}"
+
+    @property
+    def unique_id(self) -> str | None:
+        return f"{self._device_info.unique_id}-{self._sensor_name}"
+
+    @property
+    def is_on(self) -> bool:
+        return self._analytics.result(self._entry_id).slow
+
+    @property
+    def extra_state_attributes(self) -> dict[str, Any]:
+        response = self._analytics.result(self._entry_id)
+        return {
+            "heating_rate": response.heating_rate,
+            "cooling_rate": response.cooling_rate,
+            "slow_heating": response.slow_heating,
+            "slow_cooling": response.slow_cooling,
+        }
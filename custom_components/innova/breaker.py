@@ -0,0 +1,59 @@
+"""Circuit breaker for unreachable Innova units."""
+from __future__ import annotations
+
+from datetime import timedelta
+
+
+class InnovaCircuitBreaker:
+    """Stop waiting on a unit that keeps failing.
+
+    The circuit opens after a number of consecutive failed polls. While it
+    is open, commands fail right away and the unit is only probed, with an
+    exponential backoff. The first successful probe closes it again.
+    """
+
+    def __init__(
+        self,
+        threshold: int,
+        probe_interval: timedelta,
+        max_probe_interval: timedelta,
+    ) -> None:
+        """Initialize the circuit breaker."""
+        self._threshold = threshold
+        self._first_probe_interval = probe_interval
+        self._max_probe_interval = max_probe_interval
+        self._probe_interval = probe_interval
+        self.failures = 0
+        self.opened = 0
+
+    @property
+    def is_open(self) -> bool:
+        """Return True while the unit is considered unreachable."""
+        return self.failures >= self._threshold
+
+    @property
+    def probe_interval(self) -> timedelta:
+        """Return the interval before the next probe of an open circuit."""
+        return self._probe_interval
+
+    def configure(self, max_probe_interval: timedelta) -> None:
+        """Change the longest interval between probes."""
+        self._max_probe_interval = max_probe_interval
+        self._probe_interval = min(self._probe_interval, max_probe_interval)
+
+    def on_success(self) -> bool:
+        """Close the circuit, return True if it was open."""
+        was_open = self.is_open
+        self.failures = 0
+        self._probe_interval = self._first_probe_interval
+        return was_open
+
+    def on_failure(self) -> bool:
+        """Count a failure, return True if it opened the circuit."""
+        self.failures += 1
+        if self.failures == self._threshold:
+            self.opened += 1
+            return True
+        if self.failures > self._threshold:
+            self._probe_interval = min(self._probe_interval * 2, self._max_probe_interval)
+        return False
@@ -0,0 +1,42 @@
+"""Persistent cache of the last known state of an Innova unit."""
+from __future__ import annotations
+
+from typing import Any
+
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.storage import Store
+
+from .const import DOMAIN
+from .snapshot import InnovaSnapshot
+
+STORAGE_VERSION = 1
+# Seconds to coalesce cache writes, readings change on every poll
+SAVE_DELAY = 60
+
+
+class InnovaStateCache:
+    """Store the last successful poll of a unit to restore it at startup."""
+
+    def __init__(self, hass: HomeAssistant, entry_id: str) -> None:
+        """Initialize the cache."""
+        self._store: Store[dict[str, Any]] = Store(
+            hass, STORAGE_VERSION, f"{DOMAIN}.{entry_id}"
+        )
+
+    async def async_load(self) -> InnovaSnapshot | None:
+        """Return the cached state, or None when the unit was never polled."""
+        if (data := await self._store.async_load()) is None:
+            return None
+        try:
+            return InnovaSnapshot.from_dict(data)
+        except (KeyError, TypeError, ValueError):
+            return None
+
+    @callback
+    def async_save(self, snapshot: InnovaSnapshot) -> None:
+        """Schedule a write of the state of the unit."""
+        self._store.async_delay_save(snapshot.as_dict, SAVE_DELAY)
+
+    async def async_remove(self) -> None:
+        """Remove the cache of a deleted entry."""
+        await self._store.async_remove()
@@ -0,0 +1,120 @@
+"""Capability model of an Innova unit, shared by all the platforms."""
+from __future__ import annotations
+
+from collections.abc import Mapping
+from dataclasses import dataclass
+
+from homeassistant.components.climate import ClimateEntityFeature, HVACMode
+from homeassistant.components.climate.const import (FAN_AUTO, FAN_HIGH,
+                                                    FAN_LOW, FAN_MEDIUM,
+                                                    PRESET_NONE, PRESET_SLEEP,
+                                                    SWING_OFF, SWING_ON)
+from homeassistant.const import Platform
+from innova_controls.fan_speed import FanSpeed
+from innova_controls.mode import Mode
+
+from .snapshot import InnovaSnapshot
+
+FAN_MAPPINGS = {
+    FanSpeed.AUTO: FAN_AUTO,
+    FanSpeed.LOW: FAN_LOW,
+    FanSpeed.MEDIUM: FAN_MEDIUM,
+    FanSpeed.HIGH: FAN_HIGH,
+}
+FAN_SPEEDS = {fan_mode: speed for speed, fan_mode in FAN_MAPPINGS.items()}
+
+# Innova method switching the unit on in each HVAC mode
+HVAC_MODE_COMMANDS = {
+    HVACMode.COOL: "set_cooling",
+    HVACMode.HEAT: "set_heating",
+    HVACMode.DRY: "set_dehumidifying",
+    HVACMode.FAN_ONLY: "set_fan_only",
+    HVACMode.HEAT_COOL: "set_auto",
+}
+
+PRESET_MODES = [PRESET_NONE, PRESET_SLEEP]
+SWING_MODES = [SWING_OFF, SWING_ON]
+
+
+def hvac_mode_of(mode: Mode) -> HVACMode | None:
+    """Return the HVAC mode of a unit mode, None if it has no equivalent."""
+    if mode.is_cooling:
+        return HVACMode.COOL
+    if mode.is_heating:
+        return HVACMode.HEAT
+    if mode.is_dehumidifying:
+        return HVACMode.DRY
+    if mode.is_fan_only:
+        return HVACMode.FAN_ONLY
+    if mode.is_auto:
+        return HVACMode.HEAT_COOL
+    return None
+
+
+@dataclass(frozen=True, slots=True)
+class InnovaCapabilities:
+    """What a unit supports, with the lookup tables used by the entities.
+
+    Built once per model and firmware version, the entity properties return
+    these values as is instead of rebuilding them on every state write.
+    """
+
+    supported_features: ClimateEntityFeature
+    supports_water_temp: bool
+    supports_keyboard_lock: bool
+    hvac_modes: list[HVACMode]
+    fan_modes: list[str]
+    # Read direction: unit mode code -> HVAC mode
+    hvac_mode_by_code: Mapping[int, HVACMode]
+    # Write direction: HVAC mode -> unit mode
+    mode_by_hvac_mode: Mapping[HVACMode, Mode]
+    # Platforms with at least one entity for the unit
+    platforms: tuple[Platform, ...]
+
+    @classmethod
+    def from_snapshot(cls, snapshot: InnovaSnapshot) -> InnovaCapabilities:
+        """Compute the capabilities of the unit a snapshot was taken from."""
+        features = ClimateEntityFeature.TURN_ON | ClimateEntityFeature.TURN_OFF
+        if snapshot.supports_target_temp:
+            features |= ClimateEntityFeature.TARGET_TEMPERATURE
+        if snapshot.supports_swing:
+            features |= ClimateEntityFeature.SWING_MODE
+        if snapshot.supports_fan:
+            features |= ClimateEntityFeature.FAN_MODE
+        if snapshot.supports_preset:
+            features |= ClimateEntityFeature.PRESET_MODE
+
+        hvac_modes = [HVACMode.OFF]
+        hvac_mode_by_code: dict[int, HVACMode] = {}
+        mode_by_hvac_mode: dict[HVACMode, Mode] = {}
+        for mode in snapshot.supported_modes:
+            if (hvac_mode := hvac_mode_of(mode)) is None:
+                continue
+            hvac_modes.append(hvac_mode)
+            hvac_mode_by_code[mode.code] = hvac_mode
+            mode_by_hvac_mode.setdefault(hvac_mode, mode)
+
+        # The climate entity and the ambient sensor exist for every unit, and
+        # so does the scheduling switch, the keyboard lock is the optional one.
+        platforms = (Platform.CLIMATE, Platform.SENSOR, Platform.SWITCH)
+        if HVACMode.HEAT in hvac_modes or HVACMode.COOL in hvac_modes:
+            # The response of the unit is only judged while it heats or cools
+            platforms = (Platform.BINARY_SENSOR, *platforms)
+
+        return cls(
+            supported_features=features,
+            supports_water_temp=snapshot.supports_water_temp,
+            supports_keyboard_lock=snapshot.supports_keyboard_lock,
+            hvac_modes=hvac_modes,
+            fan_modes=[FAN_MAPPINGS[speed] for speed in snapshot.supported_fan_speeds],
+            hvac_mode_by_code=hvac_mode_by_code,
+            mode_by_hvac_mode=mode_by_hvac_mode,
+            platforms=platforms,
+        )
+
+    def hvac_mode(self, mode: Mode) -> HVACMode:
+        """Return the HVAC mode of the unit mode."""
+        if (hvac_mode := self.hvac_mode_by_code.get(mode.code)) is not None:
+            return hvac_mode
+        # Modes missing from the supported list are rare, resolve them directly
+        return hvac_mode_of(mode) or HVACMode.OFF
@@ -1,34 +1,34 @@
 """Climate entity definition for Innova 2.0 HVAC."""
 from __future__ import annotations
 
-from homeassistant.components.climate import (ClimateEntity,
-                                              ClimateEntityFeature, HVACAction,
-                                              HVACMode)
-from homeassistant.components.climate.const import (FAN_AUTO, FAN_HIGH,
-                                                    FAN_LOW, FAN_MEDIUM,
-                                                    PRESET_NONE, PRESET_SLEEP,
+import asyncio
+from datetime import datetime
+from functools import partial
+
+import voluptuous as vol
+from homeassistant.components.climate import ClimateEntity, HVACMode
+from homeassistant.components.climate.const import (PRESET_NONE, PRESET_SLEEP,
                                                     SWING_OFF, SWING_ON)
 from homeassistant.config_entries import ConfigEntry
 from homeassistant.const import (ATTR_TEMPERATURE, PRECISION_HALVES,
                                  PRECISION_TENTHS, PRECISION_WHOLE,
                                  UnitOfTemperature)
-from homeassistant.core import HomeAssistant
-from homeassistant.helpers.entity import DeviceInfo
+from homeassistant.core import HomeAssistant, ServiceResponse, SupportsResponse, callback
+from homeassistant.exceptions import HomeAssistantError
+from homeassistant.helpers import config_validation as cv
+from homeassistant.helpers import entity_platform
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
-from homeassistant.helpers.update_coordinator import CoordinatorEntity
-from innova_controls.fan_speed import FanSpeed
-from innova_controls.mode import Mode
-
-from .const import DOMAIN
+from homeassistant.util import dt as dt_util
+
+from .capabilities import (FAN_MAPPINGS, FAN_SPEEDS, HVAC_MODE_COMMANDS,
+                           PRESET_MODES, SWING_MODES)
+from .command_queue import (COMMAND_FAN_SPEED, COMMAND_POWER, COMMAND_PRESET,
+                            COMMAND_SWING, COMMAND_TEMPERATURE)
+from .const import (DOMAIN, SERVICE_CANCEL_PRECONDITION, SERVICE_PRECONDITION,
+                    SERVICE_SET_FLEET)
 from .coordinator import InnovaCoordinator
-from .device_info import InnovaDeviceInfo
-
-FAN_MAPPINGS = {
-    FanSpeed.AUTO: FAN_AUTO,
-    FanSpeed.LOW: FAN_LOW,
-    FanSpeed.MEDIUM: FAN_MEDIUM,
-    FanSpeed.HIGH: FAN_HIGH,
-}
+from .entity import InnovaCoordinatorEntity
+from .hvac_action import infer_hvac_action
 
 
 async def async_setup_entry(
@@ -40,39 +40,67 @@ async def async_setup_entry(
     coordinator: InnovaCoordinator = hass.data[DOMAIN][config_entry.entry_id]
     async_add_entities([InnovaEntity(coordinator)])
 
-
-class InnovaEntity(CoordinatorEntity[InnovaCoordinator], ClimateEntity):
+    # The units targeted by a call are handled concurrently, the shared
+    # orchestrator bounds the number of requests in flight.
+    platform = entity_platform.async_get_current_platform()
+    platform.async_register_entity_service(
+        SERVICE_SET_FLEET,
+        {
+            vol.Optional("hvac_mode"): vol.Coerce(HVACMode),
+            vol.Optional(ATTR_TEMPERATURE): vol.Coerce(float),
+            vol.Optional("fan_mode"): cv.string,
+            vol.Optional("preset_mode"): cv.string,
+            vol.Optional("swing_mode"): cv.string,
+        },
+        "async_set_fleet",
+        supports_response=SupportsResponse.OPTIONAL,
+    )
+    platform.async_register_entity_service(
+        SERVICE_PRECONDITION,
+        {
+            vol.Required("at"): cv.datetime,
+            vol.Required(ATTR_TEMPERATURE): vol.Coerce(float),
+            vol.Optional("hvac_mode"): vol.In([HVACMode.HEAT, HVACMode.COOL]),
+        },
+        "async_precondition",
+    )
+    platform.async_register_entity_service(
+        SERVICE_CANCEL_PRECONDITION, {}, "async_cancel_precondition"
+    )
+
+
+class InnovaEntity(InnovaCoordinatorEntity, ClimateEntity):
     """Representation of an Innova AC Unit controls."""
 
+    _innova_fields = frozenset({
+        "name",
+        "supports_target_temp",
+        "supports_swing",
+        "supports_fan",
+        "supports_preset",
+        "temperature_step",
+        "min_temperature",
+        "max_temperature",
+        "supported_modes",
+        "supported_fan_speeds",
+        "ambient_temp",
+        "target_temperature",
+        "power",
+        "mode",
+        "fan_speed",
+        "rotation",
+        "night_mode",
+    })
+
     def __init__(self, coordinator: InnovaCoordinator):
         """Initialize the thermostat."""
         self._enable_turn_on_off_backwards_compatibility = False
         super().__init__(coordinator)
-        self._device_info = InnovaDeviceInfo(self.coordinator.innova)
 
     @property
     def supported_features(self):
         """Return the list of supported features."""
-        features: int = 0
-
-        if self.coordinator.innova.supports_target_temp:
-            features |= ClimateEntityFeature.TARGET_TEMPERATURE
-        if self.coordinator.innova.supports_swing:
-            features |= ClimateEntityFeature.SWING_MODE
-        if self.coordinator.innova.supports_fan:
-            features |= ClimateEntityFeature.FAN_MODE
-        if self.coordinator.innova.supports_preset:
-            features |= ClimateEntityFeature.PRESET_MODE
-
-        features |= ClimateEntityFeature.TURN_ON
-        features |= ClimateEntityFeature.TURN_OFF
-
-        return features
-
-    @property
-    def device_info(self) -> DeviceInfo:
-        """Return a device description for device registry."""
-        return self._device_info.device_info
+        return self.coordinator.capabilities.supported_features
 
     @property
     def icon(self) -> str | None:
@@ -101,176 +129,248 @@ class InnovaEntity(CoordinatorEntity[InnovaCoordinator], ClimateEntity):
     @property
     def current_temperature(self) -> float:
         """Return the current temperature."""
-        return self.coordinator.innova.ambient_temp
+        compensator = self.coordinator.compensator
+        if compensator is not None and compensator.temperature is not None:
+            return compensator.temperature
+        return self.coordinator.value("ambient_temp")
 
     @property
     def target_temperature(self):
         """Return the temperature we try to reach."""
-        return self.coordinator.innova.target_temperature
+        compensator = self.coordinator.compensator
+        if compensator is not None and compensator.target is not None:
+            return compensator.target
+        return self.coordinator.value("target_temperature")
 
     @property
     def target_temperature_step(self) -> float | None:
         """Return the temperature step by which it can be increased/decreased."""
-        return self.coordinator.innova.temperature_step
+        return self.coordinator.value("temperature_step")
 
     @property
     def min_temp(self) -> float:
-        return self.coordinator.innova.min_temperature
+        return self.coordinator.value("min_temperature")
 
     @property
     def max_temp(self) -> float:
-        return self.coordinator.innova.max_temperature
+        return self.coordinator.value("max_temperature")
 
     @property
     def hvac_action(self):
         """Return the current state of the thermostat."""
-        if not self.coordinator.innova.power:
-            return HVACAction.OFF
-
-        mode = self.coordinator.innova.mode
-        if mode.is_heating:
-            if self.current_temperature < self.target_temperature:
-                return HVACAction.HEATING
-            else:
-                return HVACAction.IDLE
-        if mode.is_cooling:
-            if self.current_temperature > self.target_temperature:
-                return HVACAction.COOLING
-            else:
-                return HVACAction.IDLE
-        if mode.is_dehumidifying:
-            return HVACAction.DRYING
-        if mode.is_fan_only:
-            return HVACAction.FAN
-        if mode.is_auto:
-            if self.current_temperature > self.target_temperature + 1:
-                return HVACAction.COOLING
-            elif self.current_temperature < self.target_temperature - 1:
-                return HVACAction.HEATING
-            else:
-                return HVACAction.IDLE
-        return HVACAction.IDLE
+        return infer_hvac_action(
+            self.coordinator.value("power"),
+            self.coordinator.value("mode"),
+            self.current_temperature,
+            self.target_temperature,
+        )
 
     @property
     def hvac_mode(self):
         """Return the current state of the thermostat."""
-        if not self.coordinator.innova.power:
+        if not self.coordinator.value("power"):
             return HVACMode.OFF
 
-        if self.coordinator.innova.mode.is_cooling:
-            return HVACMode.COOL
-        if self.coordinator.innova.mode.is_heating:
-            return HVACMode.HEAT
-        if self.coordinator.innova.mode.is_dehumidifying:
-            return HVACMode.DRY
-        if self.coordinator.innova.mode.is_fan_only:
-            return HVACMode.FAN_ONLY
-        if self.coordinator.innova.mode.is_auto:
-            return HVACMode.HEAT_COOL
-        return HVACMode.OFF
+        return self.coordinator.capabilities.hvac_mode(self.coordinator.value("mode"))
 
     @property
     def hvac_modes(self):
         """Return available HVAC modes."""
-        modes = [HVACMode.OFF]
-        for mode in self.coordinator.innova.supported_modes:
-            if mode.is_cooling:
-                modes.append(HVACMode.COOL)
-            elif mode.is_heating:
-                modes.append(HVACMode.HEAT)
-            elif mode.is_dehumidifying:
-                modes.append(HVACMode.DRY)
-            elif mode.is_fan_only:
-                modes.append(HVACMode.FAN_ONLY)
-            elif mode.is_auto:
-                modes.append(HVACMode.HEAT_COOL)
-        return modes
+        return self.coordinator.capabilities.hvac_modes
 
     @property
     def preset_modes(self) -> list[str] | None:
-        return [PRESET_NONE, PRESET_SLEEP]
+        return PRESET_MODES
 
     @property
     def preset_mode(self) -> str | None:
-        if self.coordinator.innova.night_mode == True:
+        if self.coordinator.value("night_mode") == True:
             return PRESET_SLEEP
-        if self.coordinator.innova.night_mode == False:
+        if self.coordinator.value("night_mode") == False:
             return PRESET_NONE
         return None
 
     @property
     def fan_modes(self) -> list[str] | None:
-        return [FAN_MAPPINGS[fan] for fan in self.coordinator.innova.supported_fan_speeds]
+        return self.coordinator.capabilities.fan_modes
 
     @property
     def fan_mode(self) -> str | None:
-        current_mode = self.coordinator.innova.fan_speed
-        if current_mode in FAN_MAPPINGS:
-            return FAN_MAPPINGS[current_mode]
-        return None
+        return FAN_MAPPINGS.get(self.coordinator.value("fan_speed"))
 
     @property
     def swing_modes(self) -> list[str] | None:
-        return [SWING_OFF, SWING_ON]
+        return SWING_MODES
 
     @property
     def swing_mode(self) -> str | None:
-        if self.coordinator.innova.rotation:
+        if self.coordinator.value("rotation"):
             return SWING_ON
         else:
             return SWING_OFF
 
     async def async_set_hvac_mode(self, hvac_mode: str) -> None:
-        if hvac_mode == HVACMode.OFF:
-            await self.coordinator.innova.power_off()
-        if hvac_mode == HVACMode.COOL:
-            await self.coordinator.innova.set_cooling()
-        if hvac_mode == HVACMode.HEAT:
-            await self.coordinator.innova.set_heating()
-        if hvac_mode == HVACMode.DRY:
-            await self.coordinator.innova.set_dehumidifying()
-        if hvac_mode == HVACMode.FAN_ONLY:
-            await self.coordinator.innova.set_fan_only()
-        if hvac_mode == HVACMode.HEAT_COOL:
-            await self.coordinator.innova.set_auto()
-        self.coordinator.async_update_listeners()
+        await self._async_queue_hvac_mode(hvac_mode)
 
     async def async_set_preset_mode(self, preset_mode: str) -> None:
-        if preset_mode == PRESET_SLEEP:
-            await self.coordinator.innova.night_mode_on()
-        if preset_mode == PRESET_NONE:
-            await self.coordinator.innova.night_mode_off()
-        self.coordinator.async_update_listeners()
+        await self._async_queue_preset_mode(preset_mode)
 
     async def async_set_fan_mode(self, fan_mode: str) -> None:
-        if fan_mode == FAN_AUTO:
-            await self.coordinator.innova.set_fan_speed(FanSpeed.AUTO)
-        if fan_mode == FAN_LOW:
-            await self.coordinator.innova.set_fan_speed(FanSpeed.LOW)
-        if fan_mode == FAN_MEDIUM:
-            await self.coordinator.innova.set_fan_speed(FanSpeed.MEDIUM)
-        if fan_mode == FAN_HIGH:
-            await self.coordinator.innova.set_fan_speed(FanSpeed.HIGH)
-        self.coordinator.async_update_listeners()
+        await self._async_queue_fan_mode(fan_mode)
 
     async def async_set_swing_mode(self, swing_mode: str) -> None:
-        if swing_mode == SWING_ON:
-            await self.coordinator.innova.rotation_on()
-        if swing_mode == SWING_OFF:
-            await self.coordinator.innova.rotation_off()
-        self.coordinator.async_update_listeners()
+        await self._async_queue_swing_mode(swing_mode)
 
     async def async_set_temperature(self, **kwargs):
         """Set new target temperature."""
         if (temperature := kwargs.get(ATTR_TEMPERATURE)) is None:
             return
-        await self.coordinator.innova.set_temperature(temperature)
-        self.coordinator.async_update_listeners()
+        await self._async_queue_temperature(temperature)
+
+    async def async_set_fleet(
+        self,
+        hvac_mode: HVACMode | None = None,
+        temperature: float | None = None,
+        fan_mode: str | None = None,
+        preset_mode: str | None = None,
+        swing_mode: str | None = None,
+    ) -> ServiceResponse:
+        """Apply the settings of a fleet service call and report the outcome.
+
+        The commands are sent together right away rather than after the
+        cooldown, and confirmed by a single poll.
+        """
+        futures = []
+        error = None
+        try:
+            for queue, value in (
+                (self._async_queue_hvac_mode, hvac_mode),
+                (self._async_queue_temperature, temperature),
+                (self._async_queue_fan_mode, fan_mode),
+                (self._async_queue_preset_mode, preset_mode),
+                (self._async_queue_swing_mode, swing_mode),
+            ):
+                if value is not None and (future := await queue(value)) is not None:
+                    futures.append(future)
+        except HomeAssistantError as err:
+            error = str(err)
+        # The settings queued before a failure are sent too, the entity shows them already
+        try:
+            await self.coordinator.command_queue.async_flush()
+        except HomeAssistantError as err:
+            error = error or str(err)
+
+        # Commands dropped by an unload come back cancelled, they failed as well
+        results = await asyncio.gather(*futures, return_exceptions=True)
+        if error is not None:
+            return {"success": False, "error": error}
+        if any(isinstance(result, BaseException) or not result for result in results):
+            return {"success": False, "error": "The unit rejected a command"}
+        return {"success": True, "error": None}
+
+    async def async_added_to_hass(self) -> None:
+        await super().async_added_to_hass()
+        if (preconditioner := self.coordinator.preconditioner) is not None:
+            self.async_on_remove(
+                preconditioner.async_set_start_callback(self._async_precondition_start)
+            )
+        if (compensator := self.coordinator.compensator) is not None:
+            self.async_on_remove(compensator.async_add_listener(self.async_write_ha_state))
+
+    async def async_precondition(
+        self, at: datetime, temperature: float, hvac_mode: HVACMode | None = None
+    ) -> None:
+        """Reach a temperature at a given time, starting the unit just early enough."""
+        if self.coordinator.preconditioner is None:
+            raise HomeAssistantError("Pre-conditioning is not set up for this unit")
+        if at.tzinfo is None:
+            at = at.replace(tzinfo=dt_util.get_default_time_zone())
+        self.coordinator.preconditioner.async_schedule(at, temperature, hvac_mode)
+
+    async def async_cancel_precondition(self) -> None:
+        """Drop the pending pre-conditioning of the unit."""
+        if self.coordinator.preconditioner is not None:
+            self.coordinator.preconditioner.async_cancel()
+
+    async def _async_precondition_start(self, hvac_mode: HVACMode, temperature: float) -> None:
+        await self._async_queue_hvac_mode(hvac_mode)
+        await self._async_queue_temperature(temperature)
+
+    async def _async_queue_hvac_mode(self, hvac_mode: str) -> asyncio.Future[bool] | None:
+        innova = self.coordinator.innova
+        if hvac_mode == HVACMode.OFF:
+            self._async_release_load()
+            return await self.coordinator.async_send_command(
+                COMMAND_POWER, innova.power_off, power=False
+            )
+        if (command := HVAC_MODE_COMMANDS.get(hvac_mode)) is None:
+            return None
+        overlay = {"power": True}
+        modes = self.coordinator.capabilities.mode_by_hvac_mode
+        if (mode := modes.get(hvac_mode)) is not None:
+            overlay["mode"] = mode
+        return await self.coordinator.async_send_command(
+            COMMAND_POWER, getattr(innova, command), **overlay
+        )
+
+    async def _async_queue_preset_mode(self, preset_mode: str) -> asyncio.Future[bool] | None:
+        innova = self.coordinator.innova
+        if preset_mode == PRESET_SLEEP:
+            command, night_mode = innova.night_mode_on, True
+        elif preset_mode == PRESET_NONE:
+            command, night_mode = innova.night_mode_off, False
+        else:
+            return None
+        return await self.coordinator.async_send_command(
+            COMMAND_PRESET, command, night_mode=night_mode
+        )
+
+    async def _async_queue_fan_mode(self, fan_mode: str) -> asyncio.Future[bool] | None:
+        if (speed := FAN_SPEEDS.get(fan_mode)) is None:
+            return None
+        return await self.coordinator.async_send_command(
+            COMMAND_FAN_SPEED,
+            partial(self.coordinator.innova.set_fan_speed, speed),
+            fan_speed=speed,
+        )
+
+    async def _async_queue_swing_mode(self, swing_mode: str) -> asyncio.Future[bool] | None:
+        innova = self.coordinator.innova
+        if swing_mode == SWING_ON:
+            command, rotation = innova.rotation_on, True
+        elif swing_mode == SWING_OFF:
+            command, rotation = innova.rotation_off, False
+        else:
+            return None
+        return await self.coordinator.async_send_command(
+            COMMAND_SWING, command, rotation=rotation
+        )
+
+    async def _async_queue_temperature(
+        self, temperature: float
+    ) -> asyncio.Future[bool] | None:
+        if (compensator := self.coordinator.compensator) is not None:
+            # The target is the one of the room, the unit gets a compensated setpoint
+            return await compensator.async_set_target(temperature)
+        return await self.coordinator.async_send_command(
+            COMMAND_TEMPERATURE,
+            partial(self.coordinator.innova.set_temperature, temperature),
+            target_temperature=temperature,
+        )
 
     async def async_turn_on(self) -> None:
-        await self.coordinator.innova.power_on()
-        self.coordinator.async_update_listeners()
+        await self.coordinator.async_send_command(
+            COMMAND_POWER, self.coordinator.innova.power_on, power=True
+        )
 
     async def async_turn_off(self) -> None:
-        await self.coordinator.innova.power_off()
-        self.coordinator.async_update_listeners()
+        self._async_release_load()
+        await self.coordinator.async_send_command(
+            COMMAND_POWER, self.coordinator.innova.power_off, power=False
+        )
+
+    @callback
+    def _async_release_load(self) -> None:
+        # Switched off on purpose, the load manager must not switch it back on
+        if self.coordinator.load_manager is not None:
+            self.coordinator.load_manager.async_release(self.coordinator)
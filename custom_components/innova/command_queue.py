@@ -0,0 +1,109 @@
+"""Command coalescing queue for the Innova integration."""
+from __future__ import annotations
+
+import asyncio
+import logging
+from collections.abc import Awaitable, Callable
+
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers.debounce import Debouncer
+
+# Commands sharing a key supersede each other, only the latest one is sent.
+COMMAND_POWER = "power"
+COMMAND_TEMPERATURE = "temperature"
+COMMAND_FAN_SPEED = "fan_speed"
+COMMAND_SWING = "swing"
+COMMAND_PRESET = "preset"
+COMMAND_SCHEDULING = "scheduling"
+COMMAND_KEYBOARD_LOCK = "keyboard_lock"
+
+InnovaCommand = Callable[[], Awaitable[bool]]
+
+
+class InnovaCommandQueue:
+    """Debounce, merge and send the commands of a single Innova unit in order."""
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        logger: logging.Logger,
+        cooldown: float,
+        on_flushed: Callable[[], None],
+    ) -> None:
+        """Initialize the queue."""
+        self._hass = hass
+        self._logger = logger
+        self._on_flushed = on_flushed
+        # Latest command of each key, with the future of its result
+        self._pending: dict[str, tuple[InnovaCommand, asyncio.Future[bool]]] = {}
+        self._lock = asyncio.Lock()
+        self._debouncer = Debouncer(
+            hass,
+            logger,
+            cooldown=cooldown,
+            immediate=False,
+            function=self._async_flush,
+        )
+        self.commands_merged = 0
+        self.commands_sent = 0
+        self.commands_failed = 0
+
+    @property
+    def depth(self) -> int:
+        """Return the number of commands waiting to be sent."""
+        return len(self._pending)
+
+    async def async_enqueue(
+        self, key: str, command: InnovaCommand
+    ) -> asyncio.Future[bool]:
+        """Queue a command, superseding any pending command with the same key.
+
+        The returned future tells whether the command sent for the key, this
+        one or a later one merged into it, was accepted by the unit.
+        """
+        if (pending := self._pending.pop(key, None)) is not None:
+            self.commands_merged += 1
+            future = pending[1]
+        else:
+            future = self._hass.loop.create_future()
+        # Re-inserting moves the key to the end so commands keep the order
+        # in which their latest value was requested.
+        self._pending[key] = (command, future)
+        await self._debouncer.async_call()
+        return future
+
+    async def async_flush(self) -> None:
+        """Send the pending commands now instead of waiting for the cooldown."""
+        self._debouncer.async_cancel()
+        await self._async_flush()
+
+    async def async_shutdown(self) -> None:
+        """Drop pending commands and stop the debouncer."""
+        if self._pending:
+            self._logger.debug("Dropping %d pending Innova commands", len(self._pending))
+        for _, future in self._pending.values():
+            future.cancel()
+        self._pending.clear()
+        self._debouncer.async_shutdown()
+
+    async def _async_flush(self) -> None:
+        """Send the pending commands one after the other."""
+        async with self._lock:
+            if not self._pending:
+                return
+            while self._pending:
+                key = next(iter(self._pending))
+                command, future = self._pending.pop(key)
+                try:
+                    success = await command()
+                except Exception:  # pylint: disable=broad-except
+                    self._logger.exception("Unexpected error sending Innova command %s", key)
+                    success = False
+                if success:
+                    self.commands_sent += 1
+                else:
+                    self.commands_failed += 1
+                    self._logger.warning("Innova command %s was not accepted by the unit", key)
+                if not future.done():
+                    future.set_result(success)
+            self._on_flushed()
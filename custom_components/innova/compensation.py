@@ -0,0 +1,324 @@
+"""Setpoint compensation of the Innova units from an external temperature sensor."""
+from __future__ import annotations
+
+import logging
+import time
+from datetime import datetime
+from functools import partial
+from typing import TYPE_CHECKING, Any
+
+from homeassistant.const import ATTR_UNIT_OF_MEASUREMENT, UnitOfTemperature
+from homeassistant.core import (
+    CALLBACK_TYPE,
+    Event,
+    EventStateChangedData,
+    HomeAssistant,
+    State,
+    callback,
+)
+from homeassistant.exceptions import HomeAssistantError
+from homeassistant.helpers.event import async_call_later, async_track_state_change_event
+from homeassistant.helpers.storage import Store
+from homeassistant.util.unit_conversion import TemperatureConverter
+
+from .command_queue import COMMAND_TEMPERATURE
+from .const import DOMAIN
+
+if TYPE_CHECKING:
+    import asyncio
+
+    from .coordinator import InnovaCoordinator
+
+_LOGGER = logging.getLogger(__name__)
+
+STORAGE_VERSION = 1
+SAVE_DELAY = 60
+
+# Degrees of setpoint offset per degree of error, and per degree-hour of error
+PROPORTIONAL_GAIN = 1.0
+INTEGRAL_GAIN = 0.5
+# Largest offset between the setpoint of the unit and the target of the room
+MAX_OFFSET = 3.0
+# Setpoint changes smaller than this are not sent, readings jitter around the target
+HYSTERESIS = 0.5
+# Seconds between two setpoints sent by the controller, user changes are sent at once
+MIN_COMMAND_INTERVAL = 300
+# Longest time between two readings accounted in the integral, in seconds
+MAX_INTEGRATION_STEP = 1800
+
+
+class InnovaTemperatureCompensator:
+    """Drive the setpoint of a unit so that an external sensor reaches the target.
+
+    The onboard sensor of the unit sits in its own airflow. With an external
+    sensor bound to the unit, the target set by the user is the target of
+    the room, and a PI controller offsets the setpoint sent to the unit from
+    the error measured by the sensor, every time its state changes. The
+    offset is bounded, the integral stops growing while it is, and the
+    setpoint is only sent when it moved by more than the hysteresis, at most
+    once every MIN_COMMAND_INTERVAL. When the sensor is unavailable, the
+    unit gets the target itself and regulates on its own sensor.
+    """
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        coordinator: InnovaCoordinator,
+        entry_id: str,
+        entity_id: str,
+    ) -> None:
+        """Initialize the compensator."""
+        self._hass = hass
+        self._coordinator = coordinator
+        self._store = _store(hass, entry_id)
+        self.entity_id = entity_id
+        # Reading of the external sensor in °C, None while it is unavailable
+        self.temperature: float | None = None
+        # Target of the room, set by the user
+        self.target: float | None = None
+        # Last setpoint sent to the unit
+        self.setpoint: float | None = None
+        self.commands = 0
+        self._integral = 0.0
+        self._error: float | None = None
+        self._last_reading: float | None = None
+        self._last_command: float | None = None
+        self._listeners: list[CALLBACK_TYPE] = []
+        self._unsub_retry: CALLBACK_TYPE | None = None
+
+    @property
+    def active(self) -> bool:
+        """Return True while the setpoint of the unit is driven by the sensor."""
+        return self.temperature is not None and self.target is not None
+
+    async def async_load(self) -> None:
+        """Restore the target of the room and the integral of the controller."""
+        if (data := await self._store.async_load()) is None:
+            return
+        try:
+            target = data["target"]
+            setpoint = data["setpoint"]
+            integral = float(data["integral"])
+        except (KeyError, TypeError, ValueError):
+            return
+        self.target = float(target) if target is not None else None
+        self.setpoint = float(setpoint) if setpoint is not None else None
+        self._integral = integral
+
+    @callback
+    def async_start(self) -> CALLBACK_TYPE:
+        """Follow the sensor and the unit until the returned callback is called."""
+        self._async_read(self._hass.states.get(self.entity_id))
+        unsub_sensor = async_track_state_change_event(
+            self._hass, [self.entity_id], self._async_sensor_changed
+        )
+        unsub_unit = self._coordinator.async_add_poll_listener(self._async_unit_updated)
+        if self._coordinator.data is not None and not self._coordinator.restored:
+            self._async_unit_updated()
+
+        @callback
+        def _async_stop() -> None:
+            unsub_sensor()
+            unsub_unit()
+            if self._unsub_retry is not None:
+                self._unsub_retry()
+                self._unsub_retry = None
+
+        return _async_stop
+
+    @callback
+    def async_add_listener(self, update_callback: CALLBACK_TYPE) -> CALLBACK_TYPE:
+        """Listen for new readings, return a callback to stop listening."""
+        self._listeners.append(update_callback)
+
+        @callback
+        def _async_remove() -> None:
+            self._listeners.remove(update_callback)
+
+        return _async_remove
+
+    async def async_set_target(self, temperature: float) -> asyncio.Future[bool] | None:
+        """Set the target of the room and send the resulting setpoint right away."""
+        self.target = temperature
+        self._async_save()
+        for update_callback in list(self._listeners):
+            update_callback()
+        if not self.active:
+            return await self._async_send(temperature)
+        return await self._async_control(force=True)
+
+    @staticmethod
+    async def async_remove_store(hass: HomeAssistant, entry_id: str) -> None:
+        """Remove the saved target of a deleted entry."""
+        await _store(hass, entry_id).async_remove()
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return the state of the controller for diagnostics."""
+        return {
+            "entity_id": self.entity_id,
+            "temperature": self.temperature,
+            "target": self.target,
+            "setpoint": self.setpoint,
+            "integral": self._integral,
+            "commands": self.commands,
+        }
+
+    @callback
+    def _async_sensor_changed(self, event: Event[EventStateChangedData]) -> None:
+        was_active = self.active
+        self._async_read(event.data["new_state"])
+        for update_callback in list(self._listeners):
+            update_callback()
+        if self.active:
+            self._hass.async_create_task(self._async_control(), f"{DOMAIN} compensation")
+        elif was_active and self.target is not None:
+            # Let the unit regulate on its own sensor until the readings come back
+            _LOGGER.info("%s unavailable, the unit regulates on its own sensor", self.entity_id)
+            self._error = None
+            self._hass.async_create_task(
+                self._async_control(fallback=True), f"{DOMAIN} compensation"
+            )
+
+    @callback
+    def _async_read(self, state: State | None) -> None:
+        self.temperature = None
+        if state is None:
+            return
+        try:
+            value = float(state.state)
+        except ValueError:
+            return
+        unit = state.attributes.get(ATTR_UNIT_OF_MEASUREMENT, UnitOfTemperature.CELSIUS)
+        if unit != UnitOfTemperature.CELSIUS:
+            try:
+                value = TemperatureConverter.convert(value, unit, UnitOfTemperature.CELSIUS)
+            except HomeAssistantError:
+                return
+        self.temperature = value
+
+    @callback
+    def _async_unit_updated(self) -> None:
+        unit_target = self._coordinator.value("target_temperature")
+        if unit_target is None:
+            return
+        if self.target is None or (
+            self.setpoint is not None and abs(unit_target - self.setpoint) > 0.01
+        ):
+            # Set on the unit itself, it becomes the target of the room
+            self.target = unit_target
+            self.setpoint = unit_target
+            self._integral = 0.0
+            self._error = None
+            self._async_save()
+            for update_callback in list(self._listeners):
+                update_callback()
+            if self.active:
+                self._hass.async_create_task(self._async_control(), f"{DOMAIN} compensation")
+        if self.setpoint is None:
+            self.setpoint = unit_target
+
+    async def _async_control(
+        self, force: bool = False, fallback: bool = False
+    ) -> asyncio.Future[bool] | None:
+        """Compute the setpoint from the last reading and send it if it moved enough.
+
+        With force, the rate limit is skipped and errors are raised, as for a
+        change made by the user. With fallback, the target itself is sent.
+        """
+        coordinator = self._coordinator
+        if coordinator.data is None or coordinator.restored:
+            return None
+        if fallback:
+            if self.target is None or self.setpoint == self.target:
+                return None
+            return await self._async_send_quietly(self.target)
+        if not self.active:
+            return None
+        value = coordinator.value
+        mode = value("mode")
+        if not value("power") or not (mode.is_heating or mode.is_cooling or mode.is_auto):
+            # Nothing to regulate, the integral would only wind up
+            self._integral = 0.0
+            self._error = None
+            return None
+
+        now = time.monotonic()
+        error = self.target - self.temperature
+        integral = self._integral
+        if self._error is not None and self._last_reading is not None:
+            elapsed = min(now - self._last_reading, MAX_INTEGRATION_STEP)
+            integral += self._error * elapsed / 3600
+        self._error = error
+        self._last_reading = now
+
+        output = PROPORTIONAL_GAIN * error + INTEGRAL_GAIN * integral
+        offset = max(-MAX_OFFSET, min(MAX_OFFSET, output))
+        if offset == output:
+            self._integral = integral
+            self._async_save()
+
+        step = value("temperature_step") or 1.0
+        setpoint = round((self.target + offset) / step) * step
+        setpoint = max(value("min_temperature"), min(value("max_temperature"), setpoint))
+        current = self.setpoint if self.setpoint is not None else value("target_temperature")
+        if current is not None and abs(setpoint - current) < max(HYSTERESIS, step):
+            return None
+        if not force and self._last_command is not None:
+            if (wait := self._last_command + MIN_COMMAND_INTERVAL - now) > 0:
+                if self._unsub_retry is None:
+                    self._unsub_retry = async_call_later(self._hass, wait, self._async_retry)
+                return None
+        if force:
+            return await self._async_send(setpoint)
+        return await self._async_send_quietly(setpoint)
+
+    async def _async_retry(self, _now: datetime) -> None:
+        self._unsub_retry = None
+        await self._async_control()
+
+    async def _async_send(self, setpoint: float) -> asyncio.Future[bool]:
+        previous = self.setpoint
+        self.setpoint = setpoint
+        self._last_command = time.monotonic()
+        self.commands += 1
+        self._async_save()
+        try:
+            future = await self._coordinator.async_send_command(
+                COMMAND_TEMPERATURE,
+                partial(self._coordinator.innova.set_temperature, setpoint),
+                target_temperature=setpoint,
+            )
+        except HomeAssistantError:
+            self.setpoint = previous
+            raise
+
+        @callback
+        def _async_sent(future: asyncio.Future[bool]) -> None:
+            # A rejected setpoint must not be taken for a change made on the unit
+            if not future.cancelled() and not future.result() and self.setpoint == setpoint:
+                self.setpoint = previous
+
+        future.add_done_callback(_async_sent)
+        return future
+
+    async def _async_send_quietly(self, setpoint: float) -> asyncio.Future[bool] | None:
+        try:
+            return await self._async_send(setpoint)
+        except HomeAssistantError as err:
+            _LOGGER.debug("Setpoint %s not sent: %s", setpoint, err)
+            return None
+
+    @callback
+    def _async_save(self) -> None:
+        self._store.async_delay_save(self._data, SAVE_DELAY)
+
+    def _data(self) -> dict[str, Any]:
+        return {
+            "target": self.target,
+            "setpoint": self.setpoint,
+            "integral": self._integral,
+        }
+
+
+def _store(hass: HomeAssistant, entry_id: str) -> Store[dict[str, Any]]:
+    return Store(hass, STORAGE_VERSION, f"{DOMAIN}.{entry_id}.compensation")
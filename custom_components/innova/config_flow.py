@@ -10,14 +10,19 @@ from homeassistant.const import CONF_HOST
 from homeassistant.core import HomeAssistant, callback
 from homeassistant.data_entry_flow import FlowResult
 from homeassistant.exceptions import HomeAssistantError
+from homeassistant.helpers import config_validation as cv
+from homeassistant.helpers import discovery_flow
 from homeassistant.helpers.aiohttp_client import async_get_clientsession
-from innova_controls.innova import Innova
+from homeassistant.helpers.service_info.dhcp import DhcpServiceInfo
 
 from .const import DOMAIN
+from .discovery import InnovaDiscovery, async_probe, async_scan, format_uid
 from .options_flow import InnovaOptionsFlowHandler
 
 _LOGGER = logging.getLogger(__name__)
 
+CONF_HOSTS = "hosts"
+
 STEP_USER_DATA_SCHEMA = vol.Schema(
     {
         vol.Required(CONF_HOST): str,
@@ -32,12 +37,11 @@ async def validate_connectivity(
     Data has the keys from STEP_USER_DATA_SCHEMA with values provided by the user."""
 
     session = async_get_clientsession(hass)
-    innova = Innova(http_session=session, host=data["host"])
-    if not await innova.async_update():
+    if (unit := await async_probe(session, data[CONF_HOST])) is None:
         raise CannotConnect
-    
+
     # Return info that you want to store in the config entry.
-    return {"title": data["host"]}
+    return {"title": data[CONF_HOST], "uid": unit.uid}
 
 
 class InnovaCreateFlowHandler(config_entries.ConfigFlow, domain=DOMAIN):
@@ -45,31 +49,140 @@ class InnovaCreateFlowHandler(config_entries.ConfigFlow, domain=DOMAIN):
 
     VERSION = 1
 
-    CONNECTION_CLASS = config_entries.CONN_CLASS_LOCAL_PUSH
+    CONNECTION_CLASS = config_entries.CONN_CLASS_LOCAL_POLL
+
+    def __init__(self) -> None:
+        """Initialize the flow."""
+        self._discovered: dict[str, InnovaDiscovery] = {}
 
     async def async_step_user(
         self, user_input: dict[str, Any] | None = None
     ) -> FlowResult:
         """Handle the initial step."""
+        return self.async_show_menu(step_id="user", menu_options=["discover", "manual"])
+
+    async def async_step_discover(
+        self, user_input: dict[str, Any] | None = None
+    ) -> FlowResult:
+        """Search the local network and add the selected units."""
+        if user_input is not None:
+            hosts = user_input[CONF_HOSTS]
+            if not hosts:
+                return self.async_abort(reason="no_devices_selected")
+            # This flow adds the first unit, the others are offered as discovered
+            for host in hosts[1:]:
+                unit = self._discovered[host]
+                discovery_flow.async_create_flow(
+                    self.hass,
+                    DOMAIN,
+                    context={"source": config_entries.SOURCE_INTEGRATION_DISCOVERY},
+                    data={
+                        CONF_HOST: unit.host,
+                        "uid": unit.uid,
+                        "name": unit.name,
+                        "serial": unit.serial,
+                    },
+                )
+            unit = self._discovered[hosts[0]]
+            await self.async_set_unique_id(format_uid(unit.uid))
+            self._abort_if_unique_id_configured(updates={CONF_HOST: unit.host})
+            return self.async_create_entry(title=unit.host, data={CONF_HOST: unit.host})
+
+        configured = self._async_current_ids()
+        configured_hosts = {
+            entry.data[CONF_HOST] for entry in self._async_current_entries()
+        }
+        self._discovered = {
+            unit.host: unit
+            for unit in await async_scan(self.hass, configured_hosts)
+            if format_uid(unit.uid) not in configured
+        }
+        if not self._discovered:
+            return self.async_abort(reason="no_devices_found")
+
+        return self.async_show_form(
+            step_id="discover",
+            data_schema=vol.Schema(
+                {
+                    vol.Required(
+                        CONF_HOSTS, default=list(self._discovered)
+                    ): cv.multi_select(
+                        {
+                            host: f"{unit.name or unit.serial or unit.uid} ({host})"
+                            for host, unit in self._discovered.items()
+                        }
+                    ),
+                }
+            ),
+        )
+
+    async def async_step_manual(
+        self, user_input: dict[str, Any] | None = None
+    ) -> FlowResult:
+        """Add a unit from its address."""
         if user_input is None:
             return self.async_show_form(
-                step_id="user", data_schema=STEP_USER_DATA_SCHEMA
+                step_id="manual", data_schema=STEP_USER_DATA_SCHEMA
             )
 
         errors = {}
 
         try:
             info = await validate_connectivity(self.hass, user_input)
-            return self.async_create_entry(title=info["title"], data=user_input)
         except CannotConnect:
             errors["base"] = "cannot_connect"
         except Exception:  # pylint: disable=broad-except
             _LOGGER.exception("Unexpected exception")
             errors["base"] = "unknown"
-        # else:
+        else:
+            await self.async_set_unique_id(format_uid(info["uid"]))
+            self._abort_if_unique_id_configured(updates=user_input)
+            return self.async_create_entry(title=info["title"], data=user_input)
+
+        return self.async_show_form(
+            step_id="manual", data_schema=STEP_USER_DATA_SCHEMA, errors=errors
+        )
 
+    async def async_step_integration_discovery(
+        self, discovery_info: dict[str, Any]
+    ) -> FlowResult:
+        """Offer to add a unit selected along with others during a scan."""
+        unit = InnovaDiscovery(
+            host=discovery_info[CONF_HOST],
+            uid=discovery_info["uid"],
+            name=discovery_info["name"],
+            serial=discovery_info["serial"],
+        )
+        await self.async_set_unique_id(format_uid(unit.uid))
+        self._abort_if_unique_id_configured(updates={CONF_HOST: unit.host})
+        self._discovered = {unit.host: unit}
+        self.context["title_placeholders"] = {"name": unit.name or unit.host}
+        return await self.async_step_discovery_confirm()
+
+    async def async_step_dhcp(self, discovery_info: DhcpServiceInfo) -> FlowResult:
+        """Follow a known unit to its new address, or offer to add a new one."""
+        await self.async_set_unique_id(format_uid(discovery_info.macaddress))
+        self._abort_if_unique_id_configured(updates={CONF_HOST: discovery_info.ip})
+
+        session = async_get_clientsession(self.hass)
+        if (unit := await async_probe(session, discovery_info.ip)) is None:
+            return self.async_abort(reason="not_innova_device")
+        await self.async_set_unique_id(format_uid(unit.uid))
+        self._abort_if_unique_id_configured(updates={CONF_HOST: unit.host})
+        self._discovered = {unit.host: unit}
+        self.context["title_placeholders"] = {"name": unit.name or unit.host}
+        return await self.async_step_discovery_confirm()
+
+    async def async_step_discovery_confirm(
+        self, user_input: dict[str, Any] | None = None
+    ) -> FlowResult:
+        """Confirm adding a unit found by DHCP or selected during a scan."""
+        unit = next(iter(self._discovered.values()))
+        if user_input is not None:
+            return self.async_create_entry(title=unit.host, data={CONF_HOST: unit.host})
         return self.async_show_form(
-            step_id="user", data_schema=STEP_USER_DATA_SCHEMA, errors=errors
+            step_id="discovery_confirm",
+            description_placeholders={"name": unit.name or unit.uid, "host": unit.host},
         )
 
     @staticmethod
@@ -5,3 +5,83 @@ from datetime import timedelta
 DOMAIN = "innova"
 MANUFACTURER = "Innova"
 DEFAULT_SCAN_INTERVAL = 600
+
+CONF_MIN_SCAN_INTERVAL = "min_scan_interval"
+CONF_MAX_SCAN_INTERVAL = "max_scan_interval"
+DEFAULT_MIN_SCAN_INTERVAL = 15
+DEFAULT_MAX_SCAN_INTERVAL = 1800
+
+CONF_TEMPERATURE_DEADBAND = "temperature_deadband"
+DEFAULT_TEMPERATURE_DEADBAND = 0.0
+# Readings the temperature deadband applies to
+DEADBAND_FIELDS = ("ambient_temp", "water_temp")
+
+# Aggregate the temperatures into hourly long-term statistics instead of
+# having the recorder compile them from every raw state
+CONF_COMPACT_STATISTICS = "compact_statistics"
+DEFAULT_COMPACT_STATISTICS = False
+
+# Host and port of a tools/innova_gateway.py instance to reach the unit through
+CONF_GATEWAY = "gateway"
+
+# Temperature sensor of the room the setpoint of the unit is compensated from
+CONF_EXTERNAL_SENSOR = "external_temperature_sensor"
+
+# Options that change the set of entities or the connection to the unit,
+# the entry is reloaded when they change
+RELOAD_OPTIONS: frozenset[str] = frozenset(
+    {CONF_COMPACT_STATISTICS, CONF_GATEWAY, CONF_EXTERNAL_SENSOR}
+)
+
+# Applies the same settings to many units at once
+SERVICE_SET_FLEET = "set_fleet"
+# Start a unit early enough to reach a temperature at a given time
+SERVICE_PRECONDITION = "precondition"
+SERVICE_CANCEL_PRECONDITION = "cancel_precondition"
+# Limit the number of units running their compressor at once
+SERVICE_SET_LOAD_LIMIT = "set_load_limit"
+
+# Seconds to wait for more commands before sending them to the unit
+COMMAND_COOLDOWN = 0.5
+# Seconds after the last command before polling the unit to confirm it
+CONFIRM_DELAY = 5
+
+# Key of the InnovaPollOrchestrator shared by all entries in hass.data[DOMAIN]
+DATA_ORCHESTRATOR = "orchestrator"
+# Key of the InnovaLoadManager shared by all entries in hass.data[DOMAIN]
+DATA_LOAD_MANAGER = "load_manager"
+# Seconds between two decisions of the load manager
+LOAD_CYCLE = 60
+# Seconds a unit keeps running once started before it can be deferred
+DEFAULT_LOAD_MIN_RUNTIME = 600
+# Seconds of running after which a unit gives its turn to waiting units
+DEFAULT_LOAD_ROTATION = 1800
+# Seconds a deferred unit stays off before it can be switched on again
+LOAD_MIN_OFF_TIME = 300
+# Key of the InnovaFleetAnalytics shared by all entries in hass.data[DOMAIN]
+DATA_ANALYTICS = "analytics"
+# Seconds between two analyses of the fleet
+ANALYTICS_CYCLE = 900
+# Samples kept for each unit, about a day at the default scan intervals
+ANALYTICS_WINDOW = 288
+# Seconds between two samples beyond which the change between them is not used
+ANALYTICS_MAX_GAP = 1800
+# Seconds of heating or cooling in the window before a rate is computed
+ANALYTICS_MIN_ACTIVE = 3600
+# Degrees between the ambient and target temperatures for a sample to be used
+ANALYTICS_MIN_DEMAND = 1.0
+# Units with a rate needed to tell an outlier
+ANALYTICS_MIN_UNITS = 4
+# Modified z-score below which a unit is an outlier
+ANALYTICS_OUTLIER_SCORE = 3.5
+# Maximum number of requests in flight across all units
+MAX_CONCURRENT_REQUESTS = 4
+# Fraction of the polling interval randomized to keep units out of lock-step
+POLL_JITTER = 0.1
+# Seconds over which the first polls of units set up together are spread
+STARTUP_SPREAD = 3
+
+# Consecutive failed polls after which a unit is considered unreachable
+CIRCUIT_FAILURE_THRESHOLD = 3
+# Seconds before the first probe of an unreachable unit, doubled up to the maximum scan interval
+CIRCUIT_PROBE_INTERVAL = 30
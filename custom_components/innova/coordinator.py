@@ -1,32 +1,480 @@
+from __future__ import annotations
+
+import asyncio
 import logging
-from datetime import timedelta
+import time
+from collections.abc import Mapping
+from dataclasses import replace
+from datetime import datetime, timedelta
+from typing import TYPE_CHECKING, Any
 
-from homeassistant.core import HomeAssistant
+from homeassistant.const import Platform
+from homeassistant.core import CALLBACK_TYPE, HomeAssistant, callback
+from homeassistant.exceptions import HomeAssistantError
+from homeassistant.helpers.event import async_call_later
 from homeassistant.helpers.update_coordinator import DataUpdateCoordinator, UpdateFailed
-from innova_controls.innova import Innova
+from homeassistant.util import dt as dt_util
+
+from .breaker import InnovaCircuitBreaker
+from .cache import InnovaStateCache
+from .capabilities import InnovaCapabilities
+from .command_queue import InnovaCommand, InnovaCommandQueue
+from .compensation import InnovaTemperatureCompensator
+from .const import (
+    CIRCUIT_FAILURE_THRESHOLD,
+    CIRCUIT_PROBE_INTERVAL,
+    COMMAND_COOLDOWN,
+    CONF_MAX_SCAN_INTERVAL,
+    CONF_MIN_SCAN_INTERVAL,
+    CONF_TEMPERATURE_DEADBAND,
+    CONFIRM_DELAY,
+    DEADBAND_FIELDS,
+    DEFAULT_MAX_SCAN_INTERVAL,
+    DEFAULT_MIN_SCAN_INTERVAL,
+    DEFAULT_SCAN_INTERVAL,
+    DEFAULT_TEMPERATURE_DEADBAND,
+)
+from .device_info import InnovaDeviceInfo
+from .energy import estimate_power
+from .hvac_action import infer_hvac_action
+from .instrumentation import InnovaInstrumentation
+from .load_manager import InnovaLoadManager
+from .orchestrator import PRIORITY_COMMAND, PRIORITY_POLL, InnovaPollOrchestrator
+from .preconditioning import InnovaPreconditioner
+from .push import InnovaEventChannel
+from .runtime import InnovaRuntimeTracker
+from .scheduler import AdaptivePollScheduler
+from .snapshot import InnovaSnapshot
+from .transport import InnovaTransport
+
+if TYPE_CHECKING:
+    from innova_controls.innova import Innova
 
 
-class InnovaCoordinator(DataUpdateCoordinator[Innova]):
+def scan_intervals(options: Mapping[str, Any]) -> tuple[timedelta, timedelta, timedelta]:
+    """Return the base, minimum and maximum scan intervals from the options."""
+    scan_interval = options.get("scan_interval", DEFAULT_SCAN_INTERVAL)
+    min_interval = options.get(CONF_MIN_SCAN_INTERVAL, DEFAULT_MIN_SCAN_INTERVAL)
+    max_interval = options.get(CONF_MAX_SCAN_INTERVAL, DEFAULT_MAX_SCAN_INTERVAL)
+    return (
+        timedelta(seconds=scan_interval),
+        timedelta(seconds=min(min_interval, scan_interval)),
+        timedelta(seconds=max(max_interval, scan_interval)),
+    )
+
+
+class InnovaCoordinator(DataUpdateCoordinator[InnovaSnapshot]):
     def __init__(
         self,
         hass: HomeAssistant,
         innova: Innova,
         logger: logging.Logger,
         name: str,
-        update_interval: timedelta,
+        options: Mapping[str, Any],
+        orchestrator: InnovaPollOrchestrator,
+        cache: InnovaStateCache,
+        transport: InnovaTransport | None = None,
+        runtime: InnovaRuntimeTracker | None = None,
     ):
         self.innova = innova
+        self.transport = transport
+        self.runtime = runtime
+        # Set up by the config entry, it listens to the coordinator
+        self.preconditioner: InnovaPreconditioner | None = None
+        # Set up by the config entry when an external sensor is bound to the unit
+        self.compensator: InnovaTemperatureCompensator | None = None
+        # Shared by all the units, set once the unit is registered with it
+        self.load_manager: InnovaLoadManager | None = None
+        # Platforms forwarded by the config entry, unloaded with it
+        self.platforms: tuple[Platform, ...] = ()
+        # Replaces routine polls while the firmware pushes state changes
+        self.event_channel: InnovaEventChannel | None = None
+        self.orchestrator = orchestrator
+        self.cache = cache
+        self.options = dict(options)
+        # True while the state comes from the cache, until the unit is first reached
+        self._restored = False
+        # Snapshot the last notified changes were computed against
+        self._reference: InnovaSnapshot | None = None
+        # Fields changed by the last update, None when every entity must be written
+        self.changed_fields: frozenset[str] | None = None
+        # Shared by the entities, rebuilt only when the unit reports new values
+        self.capabilities: InnovaCapabilities | None = None
+        self.device_info: InnovaDeviceInfo | None = None
+        self.instrumentation = InnovaInstrumentation()
+        update_interval, min_interval, max_interval = scan_intervals(options)
+        self.scheduler = AdaptivePollScheduler(min_interval, update_interval, max_interval)
+        self.breaker = InnovaCircuitBreaker(
+            CIRCUIT_FAILURE_THRESHOLD,
+            timedelta(seconds=CIRCUIT_PROBE_INTERVAL),
+            max_interval,
+        )
+        if runtime is not None:
+            # Polls further apart than this missed what the unit did in between
+            runtime.configure(2 * max_interval)
 
+        if transport is not None:
+            self.event_channel = InnovaEventChannel(
+                hass,
+                transport,
+                self.breaker,
+                orchestrator,
+                logger,
+                self.async_request_refresh,
+                self._async_event_channel_active,
+            )
         super().__init__(hass, logger, name=name, update_interval=update_interval)
 
-    async def _async_update_data(self) -> Innova:
+        self.command_queue = InnovaCommandQueue(
+            hass, logger, COMMAND_COOLDOWN, self._async_commands_flushed
+        )
+        # Optimistic values of pending writes: field -> (command sequence, value)
+        self._overlay: dict[str, tuple[int, Any]] = {}
+        # Fields written by the queued command of each key and those merged into it
+        self._command_fields: dict[str, set[str]] = {}
+        self._command_seq = 0
+        self._sent_seq = 0
+        self._unsub_confirm: CALLBACK_TYPE | None = None
+
+    @property
+    def commands_merged(self) -> int:
+        """Return the number of commands superseded before being sent."""
+        return self.command_queue.commands_merged
+
+    @property
+    def commands_sent(self) -> int:
+        """Return the number of commands accepted by the unit."""
+        return self.command_queue.commands_sent
+
+    @callback
+    def async_apply_options(self, options: Mapping[str, Any]) -> None:
+        """Apply changed options to the running coordinator and its entities."""
+        self.options = dict(options)
+        update_interval, min_interval, max_interval = scan_intervals(options)
+        interval = self.scheduler.configure(min_interval, update_interval, max_interval)
+        if self.event_channel is not None and self.event_channel.active:
+            interval = max_interval
+        self.update_interval = self.orchestrator.jitter(interval)
+        self.breaker.configure(max_interval)
+        # The next poll was scheduled from the previous interval
+        self._schedule_refresh()
+        if self.runtime is not None:
+            self.runtime.configure(2 * max_interval)
+        self.changed_fields = None
+        self.async_update_listeners()
+
+    @property
+    def available(self) -> bool:
+        """Return False once the unit failed enough polls to open the circuit."""
+        return not self.breaker.is_open
+
+    @property
+    def update_mode(self) -> str:
+        """Return push while the unit signals its changes, poll otherwise."""
+        if self.event_channel is not None and self.event_channel.active:
+            return "push"
+        return "poll"
+
+    @property
+    def restored(self) -> bool:
+        """Return True while the state comes from the cache rather than the unit."""
+        return self._restored
+
+    @callback
+    def async_restore(self, snapshot: InnovaSnapshot) -> None:
+        """Serve a cached state until the unit is reached."""
+        self._restored = True
+        self._reference = snapshot
+        self._async_update_model(snapshot)
+        self.data = snapshot
+
+    def value(self, field: str) -> Any:
+        """Return a field of the unit, with pending writes overlaid on the last poll."""
+        if field in self._overlay:
+            return self._overlay[field][1]
+        return getattr(self.data, field)
+
+    def fields_changed(self, fields: frozenset[str]) -> bool:
+        """Return True if the last update may have changed any of the fields."""
+        return self.changed_fields is None or not self.changed_fields.isdisjoint(fields)
+
+    @callback
+    def async_add_poll_listener(self, update_callback: CALLBACK_TYPE) -> CALLBACK_TYPE:
+        """Listen for the states polled from the unit, return the unsubscribe.
+
+        Unlike the entities, the callback is called once per new snapshot of
+        the unit, not for optimistic writes, failed polls or a cached state.
+        """
+        last_snapshot: InnovaSnapshot | None = None
+
+        @callback
+        def _async_filter() -> None:
+            nonlocal last_snapshot
+            snapshot = self.data
+            if (
+                snapshot is None
+                or snapshot is last_snapshot
+                or self._restored
+                or not self.last_update_success
+            ):
+                return
+            last_snapshot = snapshot
+            update_callback()
+
+        return self.async_add_listener(_async_filter)
+
+    async def async_send_command(
+        self, key: str, command: InnovaCommand, **overlay: Any
+    ) -> asyncio.Future[bool]:
+        """Queue a command for the unit, merging it with pending commands of the same key.
+
+        The keyword arguments are the fields the command is expected to change,
+        they are shown right away until the unit confirms or rejects them. The
+        returned future resolves once the command was sent.
+        """
+        if self._restored:
+            raise HomeAssistantError(
+                f"Innova unit {self.value('name')} has not been reached since startup"
+            )
+        if self.breaker.is_open:
+            raise HomeAssistantError(
+                f"Innova unit {self.value('name')} is unreachable, "
+                f"next attempt in {self.breaker.probe_interval.total_seconds():.0f} seconds"
+            )
+        self._command_seq += 1
+        seq = self._command_seq
+        for field, value in overlay.items():
+            self._overlay[field] = (seq, value)
+        self._command_fields.setdefault(key, set()).update(overlay)
+        if overlay:
+            self.changed_fields = frozenset(overlay)
+            self.async_update_listeners()
+
+        async def _async_send() -> bool:
+            fields = self._command_fields.pop(key, set())
+            success = False
+            try:
+                if self.breaker.is_open:
+                    # The unit went away while the command was queued
+                    return False
+                async with self.orchestrator.async_slot(PRIORITY_COMMAND):
+                    start = time.perf_counter()
+                    success = await command()
+                    self.instrumentation.latency[key].add(time.perf_counter() - start)
+            finally:
+                if not success:
+                    self.instrumentation.record_error(f"{key}_rejected")
+                    self._async_rollback(seq, fields)
+            if success:
+                self._sent_seq = seq
+            self.instrumentation.record_queue_depth(self.command_queue.depth)
+            return success
+
+        future = await self.command_queue.async_enqueue(key, _async_send)
+        self.instrumentation.record_queue_depth(self.command_queue.depth)
+        return future
+
+    @callback
+    def async_update_listeners(self) -> None:
+        """Update all registered listeners, timing the entity state writes."""
+        start = time.perf_counter()
+        super().async_update_listeners()
+        self.instrumentation.state_writes.add(time.perf_counter() - start)
+
+    async def async_shutdown(self) -> None:
+        """Cancel pending commands and stop refreshing."""
+        if self._unsub_confirm:
+            self._unsub_confirm()
+            self._unsub_confirm = None
+        await self.command_queue.async_shutdown()
+        self._command_fields.clear()
+        if self.event_channel is not None:
+            await self.event_channel.async_stop()
+        await super().async_shutdown()
+
+    @callback
+    def _async_rollback(self, seq: int, fields: set[str]) -> None:
+        """Drop the optimistic values written by a rejected command.
+
+        Older values of its fields go too, they were merged into it. The values
+        of other commands stay, whether they were accepted or are still queued.
+        """
+        for field in fields:
+            if field in self._overlay and self._overlay[field][0] <= seq:
+                del self._overlay[field]
+
+    @callback
+    def _async_commands_flushed(self) -> None:
+        """Refresh entities and schedule a confirmation poll after the last command."""
+        self.update_interval = self.orchestrator.jitter(self.scheduler.on_command())
+        self.changed_fields = None
+        self.async_update_listeners()
+        if self._unsub_confirm:
+            self._unsub_confirm()
+        self._unsub_confirm = async_call_later(
+            self.hass, CONFIRM_DELAY, self._async_confirm
+        )
+
+    async def _async_confirm(self, _now: datetime) -> None:
+        """Poll the unit to reconcile the optimistic values."""
+        self._unsub_confirm = None
+        await self.async_refresh()
+
+    @callback
+    def _async_reconcile(self, sent_seq: int, snapshot: InnovaSnapshot) -> frozenset[str]:
+        """Drop optimistic values of commands sent before the last poll started."""
+        reconciled = []
+        for field, (seq, value) in list(self._overlay.items()):
+            if seq > sent_seq:
+                continue
+            del self._overlay[field]
+            reconciled.append(field)
+            if getattr(snapshot, field) != value:
+                self.logger.debug(
+                    "Innova unit did not apply %s=%s, rolling back", field, value
+                )
+        return frozenset(reconciled)
+
+    @callback
+    def _async_update_model(self, snapshot: InnovaSnapshot) -> bool:
+        """Rebuild the capabilities and device info if the unit changed them.
+
+        Return True when the capabilities were rebuilt.
+        """
+        if self.device_info is None or (
+            snapshot.name,
+            snapshot.model,
+            snapshot.software_version,
+        ) != (
+            self.device_info.name,
+            self.device_info.device_info.get("model"),
+            self.device_info.device_info.get("sw_version"),
+        ):
+            self.device_info = InnovaDeviceInfo(snapshot)
+
+        if self.capabilities is not None and (
+            self.data is None
+            or (snapshot.model, snapshot.software_version)
+            == (self.data.model, self.data.software_version)
+        ):
+            return False
+        self.capabilities = InnovaCapabilities.from_snapshot(snapshot)
+        return True
+
+    @callback
+    def _async_diff(self, snapshot: InnovaSnapshot) -> frozenset[str] | None:
+        """Return the fields changed since the last notified snapshot."""
+        if self._reference is None or not self.last_update_success:
+            self._reference = snapshot
+            return None
+
+        deadband = self.options.get(CONF_TEMPERATURE_DEADBAND, DEFAULT_TEMPERATURE_DEADBAND)
+        deadbands = {field: deadband for field in DEADBAND_FIELDS} if deadband else {}
+        changed = snapshot.diff(self._reference, deadbands)
+        if changed:
+            # Fields held back by their deadband keep their reference value so
+            # slow drifts are still reported once they exceed it.
+            self._reference = replace(
+                self._reference, **{field: getattr(snapshot, field) for field in changed}
+            )
+        return changed
+
+    async def _async_update_data(self) -> InnovaSnapshot:
         """Fetch data from API endpoint.
 
-        This is the place to pre-process the data to lookup tables
-        so entities can quickly look up their data.
+        The polled values are frozen into a snapshot and diffed against the
+        last notified one, so entities only write their state when one of
+        their fields changed.
         """
-        success = await self.innova.async_update()
+        start = time.perf_counter()
+        try:
+            snapshot = await self._async_poll()
+        except Exception as err:
+            # A failure changes the availability of every entity
+            self.changed_fields = None
+            if not isinstance(err, UpdateFailed):
+                self.instrumentation.record_failure(type(err).__name__)
+            self._async_poll_failed()
+            raise
+        finally:
+            self.instrumentation.polls.add(time.perf_counter() - start)
+        self.instrumentation.record_success()
+        if self.breaker.on_success():
+            self.logger.info("Innova unit %s is reachable again", self.value("name"))
+        return snapshot
+
+    @callback
+    def _async_poll_failed(self) -> None:
+        """Back off after a failed poll, only probing units that keep failing."""
+        interval = self.scheduler.on_failure()
+        if self.breaker.on_failure():
+            self.logger.warning(
+                "Innova unit %s is unreachable, commands are rejected until it answers",
+                self.value("name"),
+            )
+        if self.breaker.is_open:
+            interval = self.breaker.probe_interval
+        self.update_interval = self.orchestrator.jitter(interval)
+
+    @callback
+    def _async_event_channel_active(self, active: bool) -> None:
+        """Switch between pushed and polled updates."""
+        if active:
+            self.logger.info("Innova unit %s pushes its state changes", self.value("name"))
+            interval = scan_intervals(self.options)[2]
+        else:
+            self.logger.info("Innova unit %s is polled", self.value("name"))
+            interval = self.scheduler.interval
+        self.update_interval = self.orchestrator.jitter(interval)
+
+    async def _async_poll(self) -> InnovaSnapshot:
+        """Poll the unit and compute the changed fields."""
+        sent_seq = self._sent_seq
+        # Confirmation polls of pending writes go before routine polls
+        priority = PRIORITY_COMMAND if self._overlay else PRIORITY_POLL
+        waiting = time.perf_counter()
+        async with self.orchestrator.async_slot(priority):
+            start = time.perf_counter()
+            self.instrumentation.slot_waits.add(start - waiting)
+            success = await self.innova.async_update()
+            self.instrumentation.latency["status"].add(time.perf_counter() - start)
         if not success:
-            raise UpdateFailed("Innova connection issue")
-        
-        return self.innova
+            self.instrumentation.record_failure("unreachable")
+            raise UpdateFailed(
+                "Innova connection issue, "
+                f"{self.instrumentation.consecutive_failures} failed polls in a row"
+            )
+
+        snapshot = InnovaSnapshot.from_innova(self.innova)
+        self._restored = False
+        reconciled = self._async_reconcile(sent_seq, snapshot)
+        changed = self._async_diff(snapshot)
+        if self._async_update_model(snapshot):
+            changed = None
+        if changed is None:
+            self.changed_fields = None
+        else:
+            self.changed_fields = changed | reconciled
+        if changed is None or changed:
+            self.cache.async_save(snapshot)
+
+        hvac_action = infer_hvac_action(
+            snapshot.power,
+            snapshot.mode,
+            snapshot.ambient_temp,
+            snapshot.target_temperature,
+        )
+        if self.runtime is not None:
+            self.runtime.on_poll(
+                dt_util.utcnow(),
+                hvac_action,
+                estimate_power(
+                    snapshot.model, snapshot.power, snapshot.fan_speed, hvac_action
+                ),
+            )
+        interval = self.scheduler.on_success(hvac_action)
+        if self.update_mode == "push":
+            # Changes are signalled, polls only guard against missed events
+            interval = max(interval, scan_intervals(self.options)[2])
+        self.update_interval = self.orchestrator.jitter(interval)
+        return snapshot
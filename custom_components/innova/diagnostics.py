@@ -0,0 +1,98 @@
+"""Diagnostics support for the Innova integration."""
+from __future__ import annotations
+
+from dataclasses import asdict
+from typing import Any
+
+from homeassistant.components.diagnostics import async_redact_data
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.const import CONF_HOST
+from homeassistant.core import HomeAssistant
+
+from .const import DATA_ANALYTICS, DOMAIN
+from .coordinator import InnovaCoordinator
+
+TO_REDACT = {CONF_HOST, "serial", "uid"}
+
+
+async def async_get_config_entry_diagnostics(
+    hass: HomeAssistant, entry: ConfigEntry
+) -> dict[str, Any]:
+    """Return diagnostics for a config entry."""
+    coordinator: InnovaCoordinator = hass.data[DOMAIN][entry.entry_id]
+    orchestrator = coordinator.orchestrator
+
+    return {
+        "entry": async_redact_data(entry.as_dict(), TO_REDACT),
+        "state": (
+            async_redact_data(coordinator.data.as_dict(), TO_REDACT)
+            if coordinator.data is not None
+            else None
+        ),
+        "restored": coordinator.restored,
+        "last_update_success": coordinator.last_update_success,
+        "circuit": {
+            "open": coordinator.breaker.is_open,
+            "failures": coordinator.breaker.failures,
+            "opened": coordinator.breaker.opened,
+            "probe_interval": coordinator.breaker.probe_interval.total_seconds(),
+        },
+        "update_interval": (
+            coordinator.update_interval.total_seconds()
+            if coordinator.update_interval is not None
+            else None
+        ),
+        "update_mode": coordinator.update_mode,
+        "event_channel": (
+            {
+                "supported": coordinator.event_channel.supported,
+                "active": coordinator.event_channel.active,
+                "events": coordinator.event_channel.events,
+            }
+            if coordinator.event_channel is not None
+            else None
+        ),
+        "commands": {
+            "merged": coordinator.commands_merged,
+            "sent": coordinator.commands_sent,
+            "failed": coordinator.command_queue.commands_failed,
+        },
+        "orchestrator": {
+            "units": len(orchestrator.units),
+            "in_flight": orchestrator.in_flight,
+            "waiting": orchestrator.waiting,
+        },
+        "instrumentation": coordinator.instrumentation.as_dict(),
+        "runtime": (
+            coordinator.runtime.as_dict() if coordinator.runtime is not None else None
+        ),
+        "preconditioning": (
+            coordinator.preconditioner.as_dict()
+            if coordinator.preconditioner is not None
+            else None
+        ),
+        "compensation": (
+            coordinator.compensator.as_dict()
+            if coordinator.compensator is not None
+            else None
+        ),
+        "transport": (
+            coordinator.transport.as_dict() if coordinator.transport is not None else None
+        ),
+        "analytics": (
+            {
+                **analytics.as_dict(),
+                "response": asdict(analytics.result(entry.entry_id)),
+            }
+            if (analytics := hass.data[DOMAIN].get(DATA_ANALYTICS)) is not None
+            else None
+        ),
+        "load_manager": (
+            {
+                **coordinator.load_manager.as_dict(),
+                "state": coordinator.load_manager.state(entry.entry_id),
+            }
+            if coordinator.load_manager is not None
+            else None
+        ),
+    }
@@ -0,0 +1,108 @@
+"""Discovery of Innova units on the local network."""
+from __future__ import annotations
+
+import asyncio
+import logging
+from dataclasses import dataclass
+from ipaddress import IPv4Address, IPv4Network, ip_interface
+
+import aiohttp
+from homeassistant.components import network
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers.aiohttp_client import async_get_clientsession
+
+_LOGGER = logging.getLogger(__name__)
+
+# Probes sent at the same time during a scan
+MAX_PROBES = 64
+PROBE_TIMEOUT = aiohttp.ClientTimeout(total=3, connect=1)
+# Networks larger than this are only scanned around the address of the adapter
+MIN_PREFIX = 22
+FALLBACK_PREFIX = 24
+
+
+@dataclass(frozen=True, slots=True)
+class InnovaDiscovery:
+    """Innova unit answering on the local network."""
+
+    host: str
+    uid: str
+    name: str | None
+    serial: str | None
+
+
+def format_uid(uid: str) -> str:
+    """Return the UID of a unit in the form used as unique id."""
+    return uid.replace(":", "").replace("-", "").lower()
+
+
+async def async_probe(
+    session: aiohttp.ClientSession, host: str
+) -> InnovaDiscovery | None:
+    """Return the unit answering at host, None if it is not an Innova unit."""
+    try:
+        async with session.get(
+            f"http://{host}/api/v/1/status", timeout=PROBE_TIMEOUT
+        ) as response:
+            if response.status != 200:
+                return None
+            data = await response.json(content_type=None)
+    except (aiohttp.ClientError, asyncio.TimeoutError, ValueError):
+        return None
+
+    # Innova units answer their status with a RESULT document and their UID
+    if (
+        not isinstance(data, dict)
+        or data.get("success") is not True
+        or not isinstance(data.get("RESULT"), dict)
+        or not data.get("UID")
+    ):
+        return None
+    setup = data.get("setup") or {}
+    return InnovaDiscovery(host, str(data["UID"]), setup.get("name"), setup.get("serial"))
+
+
+async def async_candidate_networks(hass: HomeAssistant) -> list[IPv4Network]:
+    """Return the IPv4 networks of the enabled network adapters."""
+    networks: list[IPv4Network] = []
+    for adapter in await network.async_get_adapters(hass):
+        if not adapter["enabled"]:
+            continue
+        for address in adapter["ipv4"]:
+            interface = ip_interface(f"{address['address']}/{address['network_prefix']}")
+            if interface.ip.is_loopback or interface.ip.is_link_local:
+                continue
+            subnet = interface.network
+            if subnet.prefixlen < MIN_PREFIX:
+                subnet = ip_interface(f"{interface.ip}/{FALLBACK_PREFIX}").network
+            if subnet not in networks:
+                networks.append(subnet)
+    return networks
+
+
+async def async_scan(
+    hass: HomeAssistant, skip: set[str] | None = None
+) -> list[InnovaDiscovery]:
+    """Probe every host of the local networks in parallel."""
+    session = async_get_clientsession(hass)
+    semaphore = asyncio.Semaphore(MAX_PROBES)
+    skip = skip or set()
+
+    async def _async_probe(address: IPv4Address) -> InnovaDiscovery | None:
+        async with semaphore:
+            return await async_probe(session, str(address))
+
+    hosts = [
+        address
+        for subnet in await async_candidate_networks(hass)
+        for address in subnet.hosts()
+        if str(address) not in skip
+    ]
+    _LOGGER.debug("Probing %d hosts for Innova units", len(hosts))
+    results = await asyncio.gather(*(_async_probe(address) for address in hosts))
+
+    units: dict[str, InnovaDiscovery] = {}
+    for unit in results:
+        if unit is not None:
+            units.setdefault(format_uid(unit.uid), unit)
+    return list(units.values())
@@ -0,0 +1,61 @@
+"""Estimated power draw of the Innova units."""
+from __future__ import annotations
+
+from collections.abc import Mapping
+from dataclasses import dataclass
+
+from homeassistant.components.climate import HVACAction
+from innova_controls.fan_speed import FanSpeed
+
+
+@dataclass(frozen=True, slots=True)
+class PowerProfile:
+    """Typical electrical power of a model in each state, in watts."""
+
+    standby: float
+    # Fan motor, drawn whenever the unit is on
+    fan: Mapping[FanSpeed, float]
+    # Compressor, on top of the fan, while the unit heats, cools or dries
+    heating: float
+    cooling: float
+    drying: float
+
+
+# Keyed by the model reported by innova_controls. The figures are nominal
+# values from the data sheets, the units do not measure their consumption.
+POWER_PROFILES: dict[str, PowerProfile] = {
+    "TwoPointZero (2.0)": PowerProfile(
+        standby=1.0,
+        fan={FanSpeed.AUTO: 30.0, FanSpeed.LOW: 20.0, FanSpeed.MEDIUM: 30.0, FanSpeed.HIGH: 45.0},
+        heating=790.0,
+        cooling=870.0,
+        drying=450.0,
+    ),
+    # Hydronic fan coil, the heat comes from the water circuit
+    "AirLeaf": PowerProfile(
+        standby=0.5,
+        fan={FanSpeed.AUTO: 10.0, FanSpeed.LOW: 5.0, FanSpeed.MEDIUM: 10.0, FanSpeed.HIGH: 22.0},
+        heating=0.0,
+        cooling=0.0,
+        drying=0.0,
+    ),
+}
+
+
+def estimate_power(
+    model: str, power: bool, fan_speed: FanSpeed | None, hvac_action: HVACAction
+) -> float | None:
+    """Return the estimated power draw in watts, None for unknown models."""
+    if (profile := POWER_PROFILES.get(model)) is None:
+        return None
+    if not power:
+        return profile.standby
+
+    watts = profile.fan.get(fan_speed, profile.fan[FanSpeed.AUTO])
+    if hvac_action == HVACAction.HEATING:
+        watts += profile.heating
+    elif hvac_action == HVACAction.COOLING:
+        watts += profile.cooling
+    elif hvac_action == HVACAction.DRYING:
+        watts += profile.drying
+    return watts
@@ -0,0 +1,39 @@
+"""Base entity for the Innova integration."""
+from __future__ import annotations
+
+from homeassistant.core import callback
+from homeassistant.helpers.entity import DeviceInfo
+from homeassistant.helpers.update_coordinator import CoordinatorEntity
+
+from .coordinator import InnovaCoordinator
+from .device_info import InnovaDeviceInfo
+
+
+class InnovaCoordinatorEntity(CoordinatorEntity[InnovaCoordinator]):
+    """Entity of an Innova unit, written only when the fields it shows change."""
+
+    # Snapshot fields the entity state depends on, None to write on every update
+    _innova_fields: frozenset[str] | None = None
+
+    @property
+    def _device_info(self) -> InnovaDeviceInfo:
+        """Return the device info shared by the entities of the unit."""
+        return self.coordinator.device_info
+
+    @property
+    def available(self) -> bool:
+        """Stay available through isolated failed polls, until the circuit opens."""
+        return self.coordinator.available
+
+    @property
+    def device_info(self) -> DeviceInfo:
+        """Return a device description for device registry."""
+        return self._device_info.device_info
+
+    @callback
+    def _handle_coordinator_update(self) -> None:
+        """Skip the state write when none of the entity fields changed."""
+        if self._innova_fields is None or self.coordinator.fields_changed(
+            self._innova_fields
+        ):
+            super()._handle_coordinator_update()
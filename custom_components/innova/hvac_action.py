@@ -0,0 +1,36 @@
+"""HVAC action inference shared by the Innova entities and coordinator."""
+from __future__ import annotations
+
+from homeassistant.components.climate import HVACAction
+from innova_controls.mode import Mode
+
+
+def infer_hvac_action(
+    power: bool, mode: Mode, current_temperature: float, target_temperature: float
+) -> HVACAction:
+    """Infer what the unit is doing, the units do not report it."""
+    if not power:
+        return HVACAction.OFF
+
+    if mode.is_heating:
+        if current_temperature < target_temperature:
+            return HVACAction.HEATING
+        else:
+            return HVACAction.IDLE
+    if mode.is_cooling:
+        if current_temperature > target_temperature:
+            return HVACAction.COOLING
+        else:
+            return HVACAction.IDLE
+    if mode.is_dehumidifying:
+        return HVACAction.DRYING
+    if mode.is_fan_only:
+        return HVACAction.FAN
+    if mode.is_auto:
+        if current_temperature > target_temperature + 1:
+            return HVACAction.COOLING
+        elif current_temperature < target_temperature - 1:
+            return HVACAction.HEATING
+        else:
+            return HVACAction.IDLE
+    return HVACAction.IDLE
@@ -0,0 +1,138 @@
+"""Timings and error counters of an Innova unit."""
+from __future__ import annotations
+
+from bisect import bisect_left
+from collections import Counter, defaultdict, deque
+from typing import Any
+
+from homeassistant.util import dt as dt_util
+
+# Upper bounds of the histogram buckets, in seconds
+BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 20)
+# Recent samples kept to compute percentiles
+SAMPLES = 100
+# Recent failures kept with their time
+RECENT_FAILURES = 20
+
+
+class DurationStats:
+    """Recent durations in a ring buffer, all of them in a fixed histogram."""
+
+    __slots__ = ("_samples", "counts", "count", "total", "maximum")
+
+    def __init__(self) -> None:
+        """Initialize the statistics."""
+        self._samples: deque[float] = deque(maxlen=SAMPLES)
+        # The last bucket counts the durations above the last bound
+        self.counts = [0] * (len(BUCKETS) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.maximum = 0.0
+
+    def add(self, seconds: float) -> None:
+        """Record a duration."""
+        self._samples.append(seconds)
+        self.counts[bisect_left(BUCKETS, seconds)] += 1
+        self.count += 1
+        self.total += seconds
+        if seconds > self.maximum:
+            self.maximum = seconds
+
+    @property
+    def last(self) -> float | None:
+        """Return the last recorded duration."""
+        return self._samples[-1] if self._samples else None
+
+    def mean(self) -> float | None:
+        """Return the mean of the recent durations."""
+        if not self._samples:
+            return None
+        return sum(self._samples) / len(self._samples)
+
+    def percentile(self, fraction: float) -> float | None:
+        """Return a percentile of the recent durations."""
+        if not self._samples:
+            return None
+        samples = sorted(self._samples)
+        return samples[min(len(samples) - 1, int(fraction * len(samples)))]
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return the statistics for diagnostics."""
+        return {
+            "count": self.count,
+            "total": self.total,
+            "max": self.maximum,
+            "last": self.last,
+            "p50": self.percentile(0.5),
+            "p95": self.percentile(0.95),
+            "histogram": {
+                **{f"le_{bound}": count for bound, count in zip(BUCKETS, self.counts)},
+                "le_inf": self.counts[-1],
+            },
+        }
+
+
+class InnovaInstrumentation:
+    """Hot path measurements of a unit, bounded in size."""
+
+    def __init__(self) -> None:
+        """Initialize the measurements."""
+        # Request latency per endpoint, "status" for polls and command keys
+        self.latency: defaultdict[str, DurationStats] = defaultdict(DurationStats)
+        # Whole polls, including the wait for a request slot
+        self.polls = DurationStats()
+        self.slot_waits = DurationStats()
+        self.state_writes = DurationStats()
+        self.failures: Counter[str] = Counter()
+        self.recent_failures: deque[tuple[str, str]] = deque(maxlen=RECENT_FAILURES)
+        self.consecutive_failures = 0
+        # Polls made while the previous one failed
+        self.retries = 0
+        self.queue_depth = 0
+        self.max_queue_depth = 0
+
+    @property
+    def failure_count(self) -> int:
+        """Return the number of failed polls and commands."""
+        return sum(self.failures.values())
+
+    def record_success(self) -> None:
+        """Record a successful poll."""
+        if self.consecutive_failures:
+            self.retries += 1
+        self.consecutive_failures = 0
+
+    def record_failure(self, reason: str) -> None:
+        """Record a failed poll."""
+        if self.consecutive_failures:
+            self.retries += 1
+        self.consecutive_failures += 1
+        self.record_error(reason)
+
+    def record_error(self, reason: str) -> None:
+        """Count an error, without affecting the poll failure streak."""
+        self.failures[reason] += 1
+        self.recent_failures.append((dt_util.utcnow().isoformat(), reason))
+
+    def record_queue_depth(self, depth: int) -> None:
+        """Record the number of commands waiting to be sent."""
+        self.queue_depth = depth
+        if depth > self.max_queue_depth:
+            self.max_queue_depth = depth
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return the measurements for diagnostics."""
+        return {
+            "latency": {
+                endpoint: stats.as_dict() for endpoint, stats in self.latency.items()
+            },
+            "polls": self.polls.as_dict(),
+            "slot_waits": self.slot_waits.as_dict(),
+            "state_writes": self.state_writes.as_dict(),
+            "failures": dict(self.failures),
+            "recent_failures": list(self.recent_failures),
+            "consecutive_failures": self.consecutive_failures,
+            "retries": self.retries,
+            "queue_depth": self.queue_depth,
+            "max_queue_depth": self.max_queue_depth,
+        }
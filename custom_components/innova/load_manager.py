@@ -0,0 +1,303 @@
+"""Fleet-wide limit of the Innova units running their compressor at once."""
+from __future__ import annotations
+
+import heapq
+import logging
+import time
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import TYPE_CHECKING, Any
+
+from homeassistant.core import CALLBACK_TYPE, HomeAssistant, callback
+from homeassistant.exceptions import HomeAssistantError
+from homeassistant.helpers.event import async_track_time_interval
+from homeassistant.helpers.storage import Store
+
+from .command_queue import COMMAND_POWER
+from .const import (
+    DEFAULT_LOAD_MIN_RUNTIME,
+    DEFAULT_LOAD_ROTATION,
+    DOMAIN,
+    LOAD_CYCLE,
+    LOAD_MIN_OFF_TIME,
+)
+from .hvac_action import infer_hvac_action
+from .runtime import COMPRESSOR_ACTIONS
+
+if TYPE_CHECKING:
+    from .coordinator import InnovaCoordinator
+
+_LOGGER = logging.getLogger(__name__)
+
+STORAGE_VERSION = 1
+STORAGE_KEY = f"{DOMAIN}.load_manager"
+
+LOAD_ACTIVE = "active"
+LOAD_DEFERRED = "deferred"
+LOAD_IDLE = "idle"
+LOAD_STATES = [LOAD_ACTIVE, LOAD_DEFERRED, LOAD_IDLE]
+
+
+@dataclass(slots=True)
+class _UnitLoad:
+    """What the manager remembers of a unit between cycles."""
+
+    coordinator: InnovaCoordinator
+    # Monotonic time the compressor was first seen running, None when stopped
+    run_started: float | None = None
+    # Monotonic time the manager switched the unit off
+    deferred_since: float | None = None
+
+
+class InnovaLoadManager:
+    """Rotate the units so that at most a given number run their compressor.
+
+    Every cycle looks once at each unit. Units that just started keep
+    running for the minimum runtime, the others compete for the remaining
+    slots: those waiting the longest first, and units running for longer
+    than the rotation period give their slot to waiting ones. Deferred
+    units are switched off, and switched on again when they get a slot or
+    no longer need to run. A limit of 0 disables the manager.
+    """
+
+    def __init__(self, hass: HomeAssistant) -> None:
+        """Initialize the manager."""
+        self._hass = hass
+        self._store: Store[dict[str, Any]] = Store(hass, STORAGE_VERSION, STORAGE_KEY)
+        self._units: dict[str, _UnitLoad] = {}
+        self._listeners: list[CALLBACK_TYPE] = []
+        self.limit = 0
+        self.min_runtime = timedelta(seconds=DEFAULT_LOAD_MIN_RUNTIME)
+        self.rotation = timedelta(seconds=DEFAULT_LOAD_ROTATION)
+        # Entries switched off by the manager, kept across restarts
+        self.deferred: set[str] = set()
+        self.active: set[str] = set()
+
+    async def async_load(self) -> None:
+        """Restore the limit and the deferred units."""
+        if (data := await self._store.async_load()) is None:
+            return
+        try:
+            limit = int(data["limit"])
+            min_runtime = timedelta(seconds=data["min_runtime"])
+            rotation = timedelta(seconds=data["rotation"])
+            deferred = set(data["deferred"])
+        except (KeyError, TypeError, ValueError):
+            return
+        self.limit, self.min_runtime, self.rotation = limit, min_runtime, rotation
+        self.deferred = deferred
+
+    @callback
+    def async_start(self) -> None:
+        """Run a cycle periodically until Home Assistant stops."""
+        async_track_time_interval(
+            self._hass,
+            self._async_cycle,
+            timedelta(seconds=LOAD_CYCLE),
+            cancel_on_shutdown=True,
+        )
+
+    @callback
+    def async_configure(
+        self, limit: int, min_runtime: timedelta, rotation: timedelta
+    ) -> None:
+        """Change the limit and the guards, and apply them right away."""
+        self.limit = limit
+        self.min_runtime = min_runtime
+        self.rotation = rotation
+        self._async_save()
+        self._async_cycle()
+
+    @callback
+    def register(self, entry_id: str, coordinator: InnovaCoordinator) -> None:
+        """Manage the unit of an entry."""
+        load = self._units[entry_id] = _UnitLoad(coordinator)
+        coordinator.load_manager = self
+        if entry_id in self.deferred:
+            # Deferred before a restart, it may get a slot right away
+            load.deferred_since = time.monotonic() - LOAD_MIN_OFF_TIME
+        self._async_notify()
+
+    @callback
+    def unregister(self, entry_id: str) -> None:
+        """Stop managing the unit of an entry, it stays deferred if it was."""
+        self._units.pop(entry_id, None)
+        self.active.discard(entry_id)
+        self._async_notify()
+
+    @callback
+    def async_release(self, coordinator: InnovaCoordinator) -> None:
+        """Forget a deferred unit switched off by the user, it stays off."""
+        for entry_id, load in self._units.items():
+            if load.coordinator is coordinator and entry_id in self.deferred:
+                self.deferred.discard(entry_id)
+                load.deferred_since = None
+                self._async_save()
+                self._async_notify()
+
+    def state(self, entry_id: str) -> str:
+        """Return whether the unit of an entry runs, waits or does not need to run."""
+        if entry_id in self.deferred:
+            return LOAD_DEFERRED
+        if entry_id in self.active:
+            return LOAD_ACTIVE
+        return LOAD_IDLE
+
+    @property
+    def deferred_names(self) -> list[str]:
+        """Return the names of the deferred units."""
+        return sorted(
+            load.coordinator.value("name") or entry_id
+            for entry_id, load in self._units.items()
+            if entry_id in self.deferred
+        )
+
+    @callback
+    def async_add_listener(self, update_callback: CALLBACK_TYPE) -> CALLBACK_TYPE:
+        """Listen for the decisions of the cycles, return a callback to stop listening."""
+        self._listeners.append(update_callback)
+
+        @callback
+        def _async_remove() -> None:
+            self._listeners.remove(update_callback)
+
+        return _async_remove
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return the limit and the decisions for diagnostics."""
+        return {
+            "limit": self.limit,
+            "min_runtime": self.min_runtime.total_seconds(),
+            "rotation": self.rotation.total_seconds(),
+            "units": len(self._units),
+            "active": len(self.active),
+            "deferred": len(self.deferred),
+        }
+
+    @callback
+    def _async_cycle(self, _now: datetime | None = None) -> None:
+        """Decide in one pass over the fleet which units may run."""
+        before = (frozenset(self.active), frozenset(self.deferred))
+        self._async_decide()
+        # The sensors are only written when a decision changed
+        if before != (self.active, self.deferred):
+            self._async_notify()
+
+    @callback
+    def _async_decide(self) -> None:
+        if not self.limit:
+            self.active = set()
+            for entry_id in list(self.deferred):
+                self._async_resume(entry_id)
+            return
+
+        now = time.monotonic()
+        min_runtime = self.min_runtime.total_seconds()
+        rotation = self.rotation.total_seconds()
+        protected: list[str] = []
+        # (priority, entry id), lower priorities get the slots first
+        candidates: list[tuple[float, str]] = []
+        resume: list[str] = []
+
+        for entry_id, load in self._units.items():
+            coordinator = load.coordinator
+            if coordinator.data is None or coordinator.restored or not coordinator.available:
+                continue
+            value = coordinator.value
+            if value("power"):
+                # Switched on by someone else, it is not deferred anymore
+                self.deferred.discard(entry_id)
+                action = infer_hvac_action(
+                    True, value("mode"), value("ambient_temp"), value("target_temperature")
+                )
+                if action not in COMPRESSOR_ACTIONS:
+                    load.run_started = None
+                    continue
+                if load.run_started is None:
+                    load.run_started = now
+                runtime = now - load.run_started
+                if runtime < min_runtime:
+                    protected.append(entry_id)
+                elif runtime < rotation:
+                    candidates.append((load.run_started, entry_id))
+                else:
+                    # Its turn is over, it goes behind the units waiting
+                    candidates.append((now, entry_id))
+                continue
+
+            load.run_started = None
+            if entry_id not in self.deferred:
+                continue
+            action = infer_hvac_action(
+                True, value("mode"), value("ambient_temp"), value("target_temperature")
+            )
+            if action not in COMPRESSOR_ACTIONS:
+                resume.append(entry_id)
+            elif now - (load.deferred_since or 0) >= LOAD_MIN_OFF_TIME:
+                candidates.append((load.deferred_since or 0, entry_id))
+
+        slots = max(self.limit - len(protected), 0)
+        selected = {entry_id for _, entry_id in heapq.nsmallest(slots, candidates)}
+        self.active = set(protected) | selected
+        for _, entry_id in candidates:
+            if entry_id in selected:
+                if entry_id in self.deferred:
+                    self._async_resume(entry_id)
+            elif entry_id not in self.deferred:
+                self._async_defer(entry_id, now)
+        for entry_id in resume:
+            self._async_resume(entry_id)
+
+    @callback
+    def _async_defer(self, entry_id: str, now: float) -> None:
+        load = self._units[entry_id]
+        _LOGGER.info(
+            "Innova unit %s deferred, %d units may run at once",
+            load.coordinator.value("name"),
+            self.limit,
+        )
+        load.run_started = None
+        load.deferred_since = now
+        self.deferred.add(entry_id)
+        self._async_save()
+        self._async_send_power(load.coordinator, False)
+
+    @callback
+    def _async_resume(self, entry_id: str) -> None:
+        self.deferred.discard(entry_id)
+        self._async_save()
+        if (load := self._units.get(entry_id)) is None:
+            return
+        load.deferred_since = None
+        _LOGGER.info("Innova unit %s resumed", load.coordinator.value("name"))
+        self._async_send_power(load.coordinator, True)
+
+    @callback
+    def _async_send_power(self, coordinator: InnovaCoordinator, power: bool) -> None:
+        innova = coordinator.innova
+        command = innova.power_on if power else innova.power_off
+
+        async def _async_send() -> None:
+            try:
+                await coordinator.async_send_command(COMMAND_POWER, command, power=power)
+            except HomeAssistantError as err:
+                _LOGGER.warning("Load manager could not switch a unit: %s", err)
+
+        self._hass.async_create_task(_async_send(), f"{DOMAIN} load manager command")
+
+    @callback
+    def _async_save(self) -> None:
+        self._store.async_delay_save(self._data, 1)
+
+    @callback
+    def _async_notify(self) -> None:
+        for update_callback in list(self._listeners):
+            update_callback()
+
+    def _data(self) -> dict[str, Any]:
+        return {
+            "limit": self.limit,
+            "min_runtime": self.min_runtime.total_seconds(),
+            "rotation": self.rotation.total_seconds(),
+            "deferred": sorted(self.deferred),
+        }
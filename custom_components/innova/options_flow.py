@@ -1,7 +1,21 @@
 """Options flow for the Innova integration."""
 from homeassistant import config_entries
+from homeassistant.components.sensor import SensorDeviceClass
+from homeassistant.helpers import selector
 import voluptuous as vol
-from .const import DEFAULT_SCAN_INTERVAL
+from .const import (
+    CONF_COMPACT_STATISTICS,
+    CONF_EXTERNAL_SENSOR,
+    CONF_GATEWAY,
+    CONF_MAX_SCAN_INTERVAL,
+    CONF_MIN_SCAN_INTERVAL,
+    CONF_TEMPERATURE_DEADBAND,
+    DEFAULT_COMPACT_STATISTICS,
+    DEFAULT_MAX_SCAN_INTERVAL,
+    DEFAULT_MIN_SCAN_INTERVAL,
+    DEFAULT_SCAN_INTERVAL,
+    DEFAULT_TEMPERATURE_DEADBAND,
+)
 
 class InnovaOptionsFlowHandler(config_entries.OptionsFlow):
     """Handle options flow for Innova integration."""
@@ -12,16 +26,59 @@ class InnovaOptionsFlowHandler(config_entries.OptionsFlow):
 
     async def async_step_init(self, user_input=None):
         """Manage the options."""
+        errors = {}
         if user_input is not None:
-            return self.async_create_entry(title="", data=user_input)
+            if not (
+                user_input[CONF_MIN_SCAN_INTERVAL]
+                <= user_input["scan_interval"]
+                <= user_input[CONF_MAX_SCAN_INTERVAL]
+            ):
+                errors["base"] = "invalid_interval_bounds"
+            else:
+                return self.async_create_entry(title="", data=user_input)
 
-        options = self.config_entry.options
+        options = user_input or self.config_entry.options
+        scan_interval = options.get("scan_interval", DEFAULT_SCAN_INTERVAL)
         return self.async_show_form(
             step_id="init",
             data_schema=vol.Schema({
                 vol.Optional(
-                    "scan_interval", 
-                    default=options.get("scan_interval", DEFAULT_SCAN_INTERVAL)
+                    "scan_interval",
+                    default=scan_interval
                 ): vol.All(vol.Coerce(int), vol.Range(min=10, max=86400)),
-            })
+                vol.Optional(
+                    CONF_MIN_SCAN_INTERVAL,
+                    # Entries from before the bounds may poll faster than the default minimum
+                    default=options.get(
+                        CONF_MIN_SCAN_INTERVAL, min(DEFAULT_MIN_SCAN_INTERVAL, scan_interval)
+                    )
+                ): vol.All(vol.Coerce(int), vol.Range(min=10, max=86400)),
+                vol.Optional(
+                    CONF_MAX_SCAN_INTERVAL,
+                    default=options.get(
+                        CONF_MAX_SCAN_INTERVAL, max(DEFAULT_MAX_SCAN_INTERVAL, scan_interval)
+                    )
+                ): vol.All(vol.Coerce(int), vol.Range(min=10, max=86400)),
+                vol.Optional(
+                    CONF_TEMPERATURE_DEADBAND,
+                    default=options.get(CONF_TEMPERATURE_DEADBAND, DEFAULT_TEMPERATURE_DEADBAND)
+                ): vol.All(vol.Coerce(float), vol.Range(min=0, max=5)),
+                vol.Optional(
+                    CONF_COMPACT_STATISTICS,
+                    default=options.get(CONF_COMPACT_STATISTICS, DEFAULT_COMPACT_STATISTICS)
+                ): bool,
+                vol.Optional(
+                    CONF_GATEWAY,
+                    description={"suggested_value": options.get(CONF_GATEWAY)},
+                ): str,
+                vol.Optional(
+                    CONF_EXTERNAL_SENSOR,
+                    description={"suggested_value": options.get(CONF_EXTERNAL_SENSOR)},
+                ): selector.EntitySelector(
+                    selector.EntitySelectorConfig(
+                        domain="sensor", device_class=SensorDeviceClass.TEMPERATURE
+                    )
+                ),
+            }),
+            errors=errors,
         )
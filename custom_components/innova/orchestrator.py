@@ -0,0 +1,105 @@
+"""Polling orchestration shared by all the Innova units."""
+from __future__ import annotations
+
+import asyncio
+import heapq
+import itertools
+import random
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
+from datetime import timedelta
+
+from homeassistant.core import HomeAssistant
+
+PRIORITY_COMMAND = 0
+PRIORITY_POLL = 1
+
+
+class InnovaPollOrchestrator:
+    """Spread the requests of every configured unit over time.
+
+    All the coordinators of the domain share one orchestrator. It caps the
+    number of requests in flight across units, serves units with pending
+    commands first and adds jitter to polling intervals so the units do not
+    drift into lock-step.
+    """
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        max_concurrent: int,
+        jitter: float,
+        startup_spread: float,
+    ) -> None:
+        """Initialize the orchestrator."""
+        self._hass = hass
+        self._max_concurrent = max_concurrent
+        self._jitter = jitter
+        self._startup_spread = startup_spread
+        self._in_flight = 0
+        self._waiters: list[tuple[int, int, asyncio.Future[None]]] = []
+        self._counter = itertools.count()
+        self.units: set[str] = set()
+
+    @property
+    def in_flight(self) -> int:
+        """Return the number of requests currently sent to units."""
+        return self._in_flight
+
+    @property
+    def waiting(self) -> int:
+        """Return the number of requests waiting for a free slot."""
+        return sum(1 for _, _, future in self._waiters if not future.done())
+
+    def register(self, unit_id: str) -> None:
+        """Register a unit polled through this orchestrator."""
+        self.units.add(unit_id)
+
+    def unregister(self, unit_id: str) -> None:
+        """Forget a unit that is no longer polled."""
+        self.units.discard(unit_id)
+
+    def jitter(self, interval: timedelta) -> timedelta:
+        """Randomize an interval so unit polls drift apart."""
+        spread = interval.total_seconds() * self._jitter
+        return interval + timedelta(seconds=random.uniform(-spread, spread))
+
+    async def async_stagger(self) -> None:
+        """Wait a random delay so units set up together are not polled at once."""
+        await asyncio.sleep(random.uniform(0, self._startup_spread))
+
+    @asynccontextmanager
+    async def async_slot(self, priority: int = PRIORITY_POLL) -> AsyncIterator[None]:
+        """Hold one of the shared request slots for the duration of the block."""
+        await self._async_acquire(priority)
+        try:
+            yield
+        finally:
+            self._release()
+
+    async def _async_acquire(self, priority: int) -> None:
+        """Wait for a free request slot, lowest priority value first."""
+        # Slots are handed over directly to waiters, so a free slot means
+        # nobody is waiting.
+        if self._in_flight < self._max_concurrent:
+            self._in_flight += 1
+            return
+
+        future: asyncio.Future[None] = self._hass.loop.create_future()
+        heapq.heappush(self._waiters, (priority, next(self._counter), future))
+        try:
+            await future
+        except asyncio.CancelledError:
+            # The slot may have been handed over right before the cancellation
+            if future.done() and not future.cancelled():
+                self._release()
+            raise
+
+    def _release(self) -> None:
+        """Hand the slot over to the next waiter or free it."""
+        while self._waiters:
+            _, _, future = heapq.heappop(self._waiters)
+            if not future.done():
+                future.set_result(None)
+                return
+        self._in_flight -= 1
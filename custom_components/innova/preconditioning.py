@@ -0,0 +1,386 @@
+"""Predictive pre-conditioning of the rooms of the Innova units."""
+from __future__ import annotations
+
+import logging
+import time
+from collections.abc import Awaitable, Callable
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import TYPE_CHECKING, Any
+
+from homeassistant.components.climate import HVACAction, HVACMode
+from homeassistant.core import CALLBACK_TYPE, HomeAssistant, callback
+from homeassistant.exceptions import HomeAssistantError
+from homeassistant.helpers.event import async_track_point_in_utc_time
+from homeassistant.helpers.storage import Store
+from homeassistant.util import dt as dt_util
+
+from .const import DOMAIN
+from .hvac_action import infer_hvac_action
+
+if TYPE_CHECKING:
+    from .coordinator import InnovaCoordinator
+
+_LOGGER = logging.getLogger(__name__)
+
+STORAGE_VERSION = 1
+SAVE_DELAY = 60
+
+# Degrees per hour assumed until a rate was learnt, on the slow side so the
+# first pre-conditionings start early rather than late
+DEFAULT_RATE = 1.0
+# Weight of the latest run in the learnt rates
+RATE_SMOOTHING = 0.3
+# Runs shorter than this say too little with whole degree readings
+MIN_RUN = timedelta(minutes=15)
+# Long runs are measured in slices, the rate drops as the room approaches the target
+MAX_RUN = timedelta(hours=1)
+# Polls further apart than this break a run
+MAX_POLL_GAP = timedelta(minutes=30)
+# Lead time safety margin and bounds
+LEAD_MARGIN = 1.2
+MAX_LEAD = timedelta(hours=4)
+# Start time changes smaller than this do not re-arm the timer
+RESCHEDULE_TOLERANCE = timedelta(minutes=1)
+
+PreconditionStart = Callable[[HVACMode, float], Awaitable[None]]
+
+
+@dataclass(frozen=True, slots=True)
+class PreconditionPlan:
+    """Temperature a room must reach at a given time."""
+
+    at: datetime
+    hvac_mode: HVACMode
+    temperature: float
+    # Time the unit was started, None while waiting
+    started: datetime | None = None
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return the plan in a JSON serializable form."""
+        return {
+            "at": self.at.isoformat(),
+            "hvac_mode": self.hvac_mode,
+            "temperature": self.temperature,
+            "started": self.started.isoformat() if self.started is not None else None,
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict[str, Any]) -> PreconditionPlan:
+        """Rebuild a plan saved with as_dict."""
+        return cls(
+            at=datetime.fromisoformat(data["at"]),
+            hvac_mode=HVACMode(data["hvac_mode"]),
+            temperature=float(data["temperature"]),
+            started=(
+                datetime.fromisoformat(data["started"]) if data["started"] else None
+            ),
+        )
+
+
+class InnovaPreconditioner:
+    """Start a unit just early enough to reach a temperature at a given time.
+
+    The heating and cooling rates of the room are learnt from the polls, over
+    runs during which the unit keeps heating or cooling. Learning is constant
+    time per poll and the start time is only computed again when a rate or
+    the ambient temperature changes, a timer then starts the unit.
+    """
+
+    def __init__(
+        self, hass: HomeAssistant, coordinator: InnovaCoordinator, entry_id: str
+    ) -> None:
+        """Initialize the preconditioner."""
+        self._hass = hass
+        self._coordinator = coordinator
+        self._store = _store(hass, entry_id)
+        # Learnt degrees per hour, None until a run was measured
+        self.heating_rate: float | None = None
+        self.cooling_rate: float | None = None
+        self.plan: PreconditionPlan | None = None
+        # Ambient minus target temperature when the last plan was due
+        self.last_error: float | None = None
+        self._start_callback: PreconditionStart | None = None
+        self._listeners: list[CALLBACK_TYPE] = []
+        # Current run: action, monotonic start time and ambient temperature
+        self._run: tuple[HVACAction, float, float] | None = None
+        self._last_poll: float | None = None
+        self._scheduled_start: datetime | None = None
+        self._unsub_start: CALLBACK_TYPE | None = None
+        self._unsub_due: CALLBACK_TYPE | None = None
+
+    @property
+    def start_time(self) -> datetime | None:
+        """Return when the unit was or will be started for the plan."""
+        if self.plan is None:
+            return None
+        if self.plan.started is not None:
+            return self.plan.started
+        return self._compute_start(self.plan)
+
+    async def async_load(self) -> None:
+        """Restore the rates and the plan saved before a restart."""
+        if (data := await self._store.async_load()) is None:
+            return
+        try:
+            plan = PreconditionPlan.from_dict(data["plan"]) if data["plan"] else None
+            heating_rate = data["heating_rate"]
+            cooling_rate = data["cooling_rate"]
+            last_error = data["last_error"]
+        except (KeyError, TypeError, ValueError):
+            return
+        self.heating_rate = heating_rate
+        self.cooling_rate = cooling_rate
+        self.last_error = last_error
+        if plan is not None and plan.at > dt_util.utcnow():
+            self.plan = plan
+
+    @callback
+    def async_start(self) -> CALLBACK_TYPE:
+        """Start learning and arm the timers of a restored plan."""
+        unsub_listener = self._coordinator.async_add_poll_listener(self._async_handle_update)
+        if self.plan is not None:
+            self._async_arm()
+
+        @callback
+        def _async_stop() -> None:
+            unsub_listener()
+            self._async_disarm()
+
+        return _async_stop
+
+    @callback
+    def async_set_start_callback(self, start: PreconditionStart) -> CALLBACK_TYPE:
+        """Set the coroutine sending the commands that start the unit."""
+        self._start_callback = start
+
+        @callback
+        def _async_remove() -> None:
+            self._start_callback = None
+
+        return _async_remove
+
+    @callback
+    def async_add_listener(self, update_callback: CALLBACK_TYPE) -> CALLBACK_TYPE:
+        """Listen for changes of the plan, return a callback to stop listening."""
+        self._listeners.append(update_callback)
+
+        @callback
+        def _async_remove() -> None:
+            self._listeners.remove(update_callback)
+
+        return _async_remove
+
+    @callback
+    def async_schedule(
+        self, at: datetime, temperature: float, hvac_mode: HVACMode | None = None
+    ) -> None:
+        """Plan to reach a temperature at a time, replacing any previous plan."""
+        at = dt_util.as_utc(at)
+        if at <= dt_util.utcnow():
+            raise HomeAssistantError("The pre-conditioning time must be in the future")
+        if hvac_mode is None:
+            current = self._coordinator.value("ambient_temp")
+            hvac_mode = HVACMode.HEAT if temperature > current else HVACMode.COOL
+        if hvac_mode not in (HVACMode.HEAT, HVACMode.COOL):
+            raise HomeAssistantError("Pre-conditioning only supports heat and cool")
+
+        self._async_disarm()
+        self.plan = PreconditionPlan(at, hvac_mode, temperature)
+        self._async_arm()
+        self._async_changed()
+
+    @callback
+    def async_cancel(self) -> None:
+        """Drop the current plan, a unit already started keeps running."""
+        if self.plan is None:
+            return
+        self._async_disarm()
+        self.plan = None
+        self._async_changed()
+
+    @staticmethod
+    async def async_remove_store(hass: HomeAssistant, entry_id: str) -> None:
+        """Remove the rates and plan of a deleted entry."""
+        await _store(hass, entry_id).async_remove()
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return the learnt rates and the plan for diagnostics."""
+        start_time = self.start_time
+        return {
+            "heating_rate": self.heating_rate,
+            "cooling_rate": self.cooling_rate,
+            "last_error": self.last_error,
+            "plan": self.plan.as_dict() if self.plan is not None else None,
+            "start_time": start_time.isoformat() if start_time is not None else None,
+        }
+
+    def _compute_start(self, plan: PreconditionPlan) -> datetime:
+        """Return the time the unit must start to reach the plan temperature."""
+        current = self._coordinator.value("ambient_temp")
+        if plan.hvac_mode == HVACMode.HEAT:
+            delta = plan.temperature - current
+            rate = self.heating_rate or DEFAULT_RATE
+        else:
+            delta = current - plan.temperature
+            rate = self.cooling_rate or DEFAULT_RATE
+        lead = timedelta(hours=max(delta, 0) / rate * LEAD_MARGIN)
+        return plan.at - min(lead, MAX_LEAD)
+
+    @callback
+    def _async_handle_update(self) -> None:
+        snapshot = self._coordinator.data
+        now = time.monotonic()
+        temperature = snapshot.ambient_temp
+        action = infer_hvac_action(
+            snapshot.power, snapshot.mode, temperature, snapshot.target_temperature
+        )
+        if self._last_poll is None or now - self._last_poll > MAX_POLL_GAP.total_seconds():
+            self._run = None
+        self._last_poll = now
+
+        if self._run is not None and self._run[0] == action:
+            if now - self._run[1] >= MAX_RUN.total_seconds():
+                self._async_learn(now, temperature)
+                self._run = (action, now, temperature)
+        else:
+            if self._run is not None:
+                self._async_learn(now, temperature)
+            self._run = (action, now, temperature)
+
+        if self.plan is not None and self.plan.started is None:
+            self._async_arm()
+
+    @callback
+    def _async_learn(self, now: float, temperature: float) -> None:
+        """Update the rates from the run ending now."""
+        action, start, start_temperature = self._run
+        duration = now - start
+        if duration < MIN_RUN.total_seconds():
+            return
+        rate = (temperature - start_temperature) * 3600 / duration
+        if action == HVACAction.HEATING and rate > 0:
+            self.heating_rate = _smooth(self.heating_rate, rate)
+        elif action == HVACAction.COOLING and rate < 0:
+            self.cooling_rate = _smooth(self.cooling_rate, -rate)
+        else:
+            return
+        _LOGGER.debug(
+            "Innova unit %s %s at %.2f°C/h",
+            self._coordinator.value("name"),
+            action,
+            abs(rate),
+        )
+        self._store.async_delay_save(self._data, SAVE_DELAY)
+
+    @callback
+    def _async_arm(self) -> None:
+        """Arm the start and due timers of the plan."""
+        plan = self.plan
+        if self._unsub_due is None:
+            self._unsub_due = async_track_point_in_utc_time(
+                self._hass, self._async_due, plan.at
+            )
+        if plan.started is not None:
+            return
+
+        start = self._compute_start(plan)
+        if start <= dt_util.utcnow():
+            self._async_start_unit()
+            return
+        if (
+            self._scheduled_start is not None
+            and abs(start - self._scheduled_start) < RESCHEDULE_TOLERANCE
+        ):
+            return
+        if self._unsub_start is not None:
+            self._unsub_start()
+        self._scheduled_start = start
+        self._unsub_start = async_track_point_in_utc_time(
+            self._hass, self._async_start_timer, start
+        )
+        self._async_changed()
+
+    @callback
+    def _async_disarm(self) -> None:
+        if self._unsub_start is not None:
+            self._unsub_start()
+            self._unsub_start = None
+        if self._unsub_due is not None:
+            self._unsub_due()
+            self._unsub_due = None
+        self._scheduled_start = None
+
+    @callback
+    def _async_start_timer(self, _now: datetime) -> None:
+        self._unsub_start = None
+        self._async_start_unit()
+
+    @callback
+    def _async_start_unit(self) -> None:
+        """Send the commands reaching the plan temperature."""
+        plan = self.plan = PreconditionPlan(
+            self.plan.at, self.plan.hvac_mode, self.plan.temperature, dt_util.utcnow()
+        )
+        if self._unsub_start is not None:
+            self._unsub_start()
+            self._unsub_start = None
+        self._scheduled_start = None
+        self._async_changed()
+
+        if self._start_callback is None:
+            _LOGGER.warning(
+                "Innova unit %s cannot be pre-conditioned, its climate entity is not set up",
+                self._coordinator.value("name"),
+            )
+            return
+        self._hass.async_create_task(
+            self._async_send_start(self._start_callback, plan),
+            f"{DOMAIN} pre-conditioning start",
+        )
+
+    async def _async_send_start(
+        self, start: PreconditionStart, plan: PreconditionPlan
+    ) -> None:
+        try:
+            await start(plan.hvac_mode, plan.temperature)
+        except HomeAssistantError as err:
+            _LOGGER.warning(
+                "Innova unit %s could not be started for pre-conditioning: %s",
+                self._coordinator.value("name"),
+                err,
+            )
+
+    @callback
+    def _async_due(self, _now: datetime) -> None:
+        """Record how close to the target the room got."""
+        self._unsub_due = None
+        if self.plan is not None:
+            self.last_error = self._coordinator.value("ambient_temp") - self.plan.temperature
+        self._async_disarm()
+        self.plan = None
+        self._async_changed()
+
+    @callback
+    def _async_changed(self) -> None:
+        self._store.async_delay_save(self._data, SAVE_DELAY)
+        for update_callback in list(self._listeners):
+            update_callback()
+
+    def _data(self) -> dict[str, Any]:
+        return {
+            "heating_rate": self.heating_rate,
+            "cooling_rate": self.cooling_rate,
+            "last_error": self.last_error,
+            "plan": self.plan.as_dict() if self.plan is not None else None,
+        }
+
+
+def _smooth(current: float | None, sample: float) -> float:
+    if current is None:
+        return sample
+    return current + RATE_SMOOTHING * (sample - current)
+
+
+def _store(hass: HomeAssistant, entry_id: str) -> Store[dict[str, Any]]:
+    return Store(hass, STORAGE_VERSION, f"{DOMAIN}.{entry_id}.preconditioning")
@@ -0,0 +1,152 @@
+"""Long-poll event channel of the Innova units whose firmware offers one."""
+from __future__ import annotations
+
+import asyncio
+import logging
+from collections.abc import Awaitable, Callable
+from typing import TYPE_CHECKING
+
+import aiohttp
+from homeassistant.core import HomeAssistant, callback
+
+from .const import DOMAIN
+
+if TYPE_CHECKING:
+    from .breaker import InnovaCircuitBreaker
+    from .orchestrator import InnovaPollOrchestrator
+    from .transport import InnovaTransport
+
+# The unit answers a request with the ETag of its current state as soon as
+# it differs from If-None-Match, or 304 once the wait elapsed.
+EVENTS_PATH = "/api/v/1/events"
+# Seconds a request is held by the unit
+EVENTS_WAIT = 60
+EVENTS_TIMEOUT = aiohttp.ClientTimeout(total=EVENTS_WAIT + 15, connect=3)
+PROBE_TIMEOUT = aiohttp.ClientTimeout(total=10, connect=3)
+# Seconds before reconnecting after the channel broke, doubled up to the maximum
+RETRY_DELAY = 60
+MAX_RETRY_DELAY = 1800
+
+
+class EventChannelError(Exception):
+    """The unit answered the event channel unexpectedly."""
+
+
+class InnovaEventChannel:
+    """Tell when the state of a unit changed, without polling it.
+
+    Through a gateway, the channel is always listened to. A unit reached
+    directly is probed once, and listened to only if its firmware answers.
+    Probes and reconnections take a slot of the orchestrator and wait while
+    the circuit of the unit is open, the held requests do not, they would
+    starve the polls of the other units. When the channel breaks,
+    on_active(False) lets the coordinator go back to adaptive polling.
+    """
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        transport: InnovaTransport,
+        breaker: InnovaCircuitBreaker,
+        orchestrator: InnovaPollOrchestrator,
+        logger: logging.Logger,
+        on_change: Callable[[], Awaitable[None]],
+        on_active: Callable[[bool], None],
+    ) -> None:
+        """Initialize the channel."""
+        self._hass = hass
+        self._transport = transport
+        self._breaker = breaker
+        self._orchestrator = orchestrator
+        self._url = f"http://{transport.host}{EVENTS_PATH}"
+        self._logger = logger
+        self._on_change = on_change
+        self._on_active = on_active
+        self._task: asyncio.Task | None = None
+        self._etag: str | None = None
+        self.active = False
+        self.supported: bool | None = None
+        self.events = 0
+
+    @callback
+    def async_start(self, probe: bool) -> None:
+        """Listen in the background, after probing the unit first if asked to."""
+        self._task = self._hass.async_create_background_task(
+            self._async_run(probe), f"{DOMAIN} {self._url} events"
+        )
+
+    async def async_stop(self) -> None:
+        """Stop listening."""
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+        self._set_active(False)
+
+    async def _async_run(self, probe: bool) -> None:
+        if probe:
+            await self._async_wait_reachable()
+            try:
+                async with self._orchestrator.async_slot():
+                    self.supported = await self._async_probe()
+            except (aiohttp.ClientError, asyncio.TimeoutError) as err:
+                self._logger.debug("Event channel probe of %s failed: %s", self._url, err)
+                self.supported = False
+            if not self.supported:
+                return
+            # The held requests need a connection besides the one of the polls
+            await self._transport.async_set_connections(2)
+
+        failures = 0
+        while True:
+            await self._async_wait_reachable()
+            try:
+                async with self._orchestrator.async_slot():
+                    if not await self._async_probe():
+                        raise EventChannelError("no ETag")
+                self.supported = True
+                self._set_active(True)
+                while True:
+                    if await self._async_wait():
+                        self.events += 1
+                        failures = 0
+                        await self._on_change()
+            except (aiohttp.ClientError, asyncio.TimeoutError, EventChannelError) as err:
+                self._logger.debug("Event channel of %s broke: %s", self._url, err)
+            self._set_active(False)
+            failures += 1
+            await asyncio.sleep(min(RETRY_DELAY * 2 ** (failures - 1), MAX_RETRY_DELAY))
+
+    async def _async_wait_reachable(self) -> None:
+        """Wait until the polls of the coordinator closed the circuit of the unit."""
+        while self._breaker.is_open:
+            await asyncio.sleep(self._breaker.probe_interval.total_seconds())
+
+    async def _async_probe(self) -> bool:
+        """Return True if the unit answers the event channel."""
+        async with self._transport.hold(
+            self._url, PROBE_TIMEOUT, params={"wait": 0}
+        ) as response:
+            if response.status != 200 or "ETag" not in response.headers:
+                return False
+            self._etag = response.headers["ETag"]
+            return True
+
+    async def _async_wait(self) -> bool:
+        """Wait for a change of state, return False if none happened in time."""
+        async with self._transport.hold(
+            self._url,
+            EVENTS_TIMEOUT,
+            params={"wait": EVENTS_WAIT},
+            headers={"If-None-Match": self._etag},
+        ) as response:
+            if response.status == 304:
+                return False
+            if response.status != 200 or "ETag" not in response.headers:
+                raise EventChannelError(f"HTTP {response.status}")
+            self._etag = response.headers["ETag"]
+            return True
+
+    def _set_active(self, active: bool) -> None:
+        if active != self.active:
+            self.active = active
+            self._on_active(active)
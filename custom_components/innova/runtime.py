@@ -0,0 +1,179 @@
+"""Runtime, duty cycle and energy accumulated from the polls of an Innova unit."""
+from __future__ import annotations
+
+from datetime import date, datetime, timedelta
+from typing import Any
+
+from homeassistant.components.climate import HVACAction
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.storage import Store
+from homeassistant.util import dt as dt_util
+
+from .const import DEFAULT_MAX_SCAN_INTERVAL, DOMAIN
+
+STORAGE_VERSION = 1
+# Seconds to coalesce writes, the totals change on every poll
+SAVE_DELAY = 60
+
+# Actions during which the compressor runs
+COMPRESSOR_ACTIONS = frozenset({HVACAction.HEATING, HVACAction.COOLING, HVACAction.DRYING})
+
+
+class InnovaRuntimeTracker:
+    """Accumulate how long a unit runs, from the action inferred at each poll.
+
+    The action seen at a poll is assumed to last until the next one. Time
+    between polls further apart than the maximum gap, while the unit is
+    unreachable or Home Assistant is stopped, is not counted at all. Only
+    running totals are kept, the memory used does not grow with time.
+    """
+
+    def __init__(self, hass: HomeAssistant, entry_id: str) -> None:
+        """Initialize the tracker."""
+        self._store = _store(hass, entry_id)
+        self._max_gap = 2.0 * DEFAULT_MAX_SCAN_INTERVAL
+        self.compressor_seconds = 0.0
+        self.heating_seconds = 0.0
+        self.cooling_seconds = 0.0
+        # Estimated energy, for models with a power profile
+        self.energy_wh = 0.0
+        # Local day the duty cycle is computed for
+        self.day: date | None = None
+        self.day_running_seconds = 0.0
+        self.day_observed_seconds = 0.0
+        self.previous_duty_cycle: float | None = None
+        self._last_time: float | None = None
+        self._last_action: HVACAction | None = None
+        self._last_power: float | None = None
+
+    @property
+    def duty_cycle(self) -> float | None:
+        """Return the fraction of the observed time of the day the compressor ran."""
+        if not self.day_observed_seconds:
+            return None
+        return self.day_running_seconds / self.day_observed_seconds
+
+    def configure(self, max_gap: timedelta) -> None:
+        """Change the longest time between polls that is still counted."""
+        self._max_gap = max_gap.total_seconds()
+
+    async def async_load(self) -> None:
+        """Restore the totals saved before a restart."""
+        if (data := await self._store.async_load()) is None:
+            return
+        try:
+            day = date.fromisoformat(data["day"]) if data["day"] else None
+            last_action = HVACAction(data["last_action"]) if data["last_action"] else None
+            totals = (
+                float(data["compressor_seconds"]),
+                float(data["heating_seconds"]),
+                float(data["cooling_seconds"]),
+                float(data["day_running_seconds"]),
+                float(data["day_observed_seconds"]),
+            )
+            previous_duty_cycle = data["previous_duty_cycle"]
+            last_time = data["last_time"]
+            # Added after the first version of the store
+            energy_wh = float(data.get("energy_wh", 0.0))
+            last_power = data.get("last_power")
+        except (KeyError, TypeError, ValueError):
+            return
+        (
+            self.compressor_seconds,
+            self.heating_seconds,
+            self.cooling_seconds,
+            self.day_running_seconds,
+            self.day_observed_seconds,
+        ) = totals
+        self.day = day
+        self.previous_duty_cycle = previous_duty_cycle
+        self._last_time = last_time
+        self._last_action = last_action
+        self.energy_wh = energy_wh
+        self._last_power = last_power
+
+    @callback
+    def on_poll(
+        self, now: datetime, action: HVACAction, power: float | None = None
+    ) -> None:
+        """Account for the time since the previous poll and save the totals."""
+        timestamp = now.timestamp()
+        today = dt_util.as_local(now).date()
+        if (
+            self.day is not None
+            and self._last_time is not None
+            and 0 < timestamp - self._last_time <= self._max_gap
+        ):
+            # Split the elapsed time at local midnights
+            start = self._last_time
+            while timestamp >= (day_end := self._day_end()):
+                self._add(day_end - start)
+                self._start_day(self.day + timedelta(days=1))
+                start = day_end
+            self._add(timestamp - start)
+        elif self.day != today:
+            self._start_day(today)
+
+        self._last_time = timestamp
+        self._last_action = action
+        self._last_power = power
+        self._store.async_delay_save(self._data, SAVE_DELAY)
+
+    @staticmethod
+    async def async_remove_store(hass: HomeAssistant, entry_id: str) -> None:
+        """Remove the totals of a deleted entry."""
+        await _store(hass, entry_id).async_remove()
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return the totals for diagnostics."""
+        return {
+            "compressor_seconds": self.compressor_seconds,
+            "heating_seconds": self.heating_seconds,
+            "cooling_seconds": self.cooling_seconds,
+            "energy_wh": self.energy_wh,
+            "day": self.day.isoformat() if self.day is not None else None,
+            "duty_cycle": self.duty_cycle,
+            "previous_duty_cycle": self.previous_duty_cycle,
+        }
+
+    def _add(self, seconds: float) -> None:
+        """Credit seconds spent in the last polled action."""
+        self.day_observed_seconds += seconds
+        if self._last_power is not None:
+            self.energy_wh += self._last_power * seconds / 3600
+        if self._last_action in COMPRESSOR_ACTIONS:
+            self.compressor_seconds += seconds
+            self.day_running_seconds += seconds
+        if self._last_action == HVACAction.HEATING:
+            self.heating_seconds += seconds
+        elif self._last_action == HVACAction.COOLING:
+            self.cooling_seconds += seconds
+
+    def _day_end(self) -> float:
+        return dt_util.start_of_local_day(self.day + timedelta(days=1)).timestamp()
+
+    def _start_day(self, day: date) -> None:
+        if self.day is not None:
+            self.previous_duty_cycle = self.duty_cycle
+        self.day = day
+        self.day_running_seconds = 0.0
+        self.day_observed_seconds = 0.0
+
+    def _data(self) -> dict[str, Any]:
+        return {
+            "compressor_seconds": self.compressor_seconds,
+            "heating_seconds": self.heating_seconds,
+            "cooling_seconds": self.cooling_seconds,
+            "day": self.day.isoformat() if self.day is not None else None,
+            "day_running_seconds": self.day_running_seconds,
+            "day_observed_seconds": self.day_observed_seconds,
+            "previous_duty_cycle": self.previous_duty_cycle,
+            "last_time": self._last_time,
+            "last_action": self._last_action,
+            "energy_wh": self.energy_wh,
+            "last_power": self._last_power,
+        }
+
+
+def _store(hass: HomeAssistant, entry_id: str) -> Store[dict[str, Any]]:
+    return Store(hass, STORAGE_VERSION, f"{DOMAIN}.{entry_id}.runtime")
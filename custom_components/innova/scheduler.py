@@ -0,0 +1,72 @@
+"""Adaptive polling interval for the Innova units."""
+from __future__ import annotations
+
+from datetime import timedelta
+
+from homeassistant.components.climate import HVACAction
+
+
+class AdaptivePollScheduler:
+    """Pick the next polling interval of a unit from its recent activity.
+
+    Polls run at the minimum interval right after a command or when the
+    inferred HVAC action changes, then slow down exponentially up to the base
+    interval while the unit is on, or up to the maximum interval while it is
+    off or unreachable.
+    """
+
+    def __init__(
+        self,
+        min_interval: timedelta,
+        base_interval: timedelta,
+        max_interval: timedelta,
+    ) -> None:
+        """Initialize the scheduler."""
+        self._min_interval = min_interval
+        self._base_interval = base_interval
+        self._max_interval = max_interval
+        self._interval = base_interval
+        self._last_action: HVACAction | None = None
+
+    @property
+    def interval(self) -> timedelta:
+        """Return the interval to wait before the next poll."""
+        return self._interval
+
+    def configure(
+        self,
+        min_interval: timedelta,
+        base_interval: timedelta,
+        max_interval: timedelta,
+    ) -> timedelta:
+        """Change the interval bounds, keeping the current activity level."""
+        self._min_interval = min_interval
+        self._base_interval = base_interval
+        self._max_interval = max_interval
+        self._interval = max(min_interval, min(self._interval, max_interval))
+        return self._interval
+
+    def on_command(self) -> timedelta:
+        """Poll fast after a command was sent to the unit."""
+        self._interval = self._min_interval
+        return self._interval
+
+    def on_success(self, hvac_action: HVACAction) -> timedelta:
+        """Update the interval after a successful poll."""
+        if self._last_action is not None and hvac_action != self._last_action:
+            self._interval = self._min_interval
+        else:
+            if hvac_action == HVACAction.OFF:
+                ceiling = self._max_interval
+            else:
+                ceiling = self._base_interval
+            self._interval = min(self._interval * 2, ceiling)
+        self._last_action = hvac_action
+        return self._interval
+
+    def on_failure(self) -> timedelta:
+        """Back off after a failed poll."""
+        self._interval = min(
+            max(self._interval, self._min_interval) * 2, self._max_interval
+        )
+        return self._interval
@@ -1,18 +1,34 @@
+from datetime import datetime
+from typing import Any
+
 from homeassistant.components.sensor import (
     SensorDeviceClass,
     SensorEntity,
     SensorStateClass,
 )
 from homeassistant.config_entries import ConfigEntry
-from homeassistant.const import UnitOfTemperature
+from homeassistant.const import (
+    PERCENTAGE,
+    EntityCategory,
+    UnitOfEnergy,
+    UnitOfPower,
+    UnitOfTemperature,
+    UnitOfTime,
+)
 from homeassistant.core import HomeAssistant
-from homeassistant.helpers.entity import DeviceInfo
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
-from homeassistant.helpers.update_coordinator import CoordinatorEntity
 
-from .const import DOMAIN
+from .const import (
+    CONF_COMPACT_STATISTICS,
+    DATA_LOAD_MANAGER,
+    DEFAULT_COMPACT_STATISTICS,
+    DOMAIN,
+)
 from .coordinator import InnovaCoordinator
-from .device_info import InnovaDeviceInfo
+from .energy import POWER_PROFILES, estimate_power
+from .entity import InnovaCoordinatorEntity
+from .hvac_action import infer_hvac_action
+from .load_manager import LOAD_STATES, InnovaLoadManager
 
 
 async def async_setup_entry(
@@ -22,20 +38,45 @@ async def async_setup_entry(
 ):
     """Add entities for passed config_entry in HA."""
     coordinator: InnovaCoordinator = hass.data[DOMAIN][config_entry.entry_id]
-    entities = [InnovaAmbientSensor(coordinator)]
-    if coordinator.innova.supports_water_temp:
+    entities = [
+        InnovaAmbientSensor(coordinator),
+        InnovaPollIntervalSensor(coordinator),
+        InnovaLatencySensor(coordinator),
+        InnovaStateWriteSensor(coordinator),
+        InnovaFailuresSensor(coordinator),
+    ]
+    if coordinator.transport is not None:
+        entities.append(InnovaConnectionReuseSensor(coordinator))
+    if coordinator.capabilities.supports_water_temp:
         entities.append(InnovaWaterSensor(coordinator))
+    if coordinator.preconditioner is not None:
+        entities.append(InnovaPreconditionSensor(coordinator))
+    if coordinator.runtime is not None:
+        entities += [
+            InnovaCompressorRuntimeSensor(coordinator),
+            InnovaHeatingRuntimeSensor(coordinator),
+            InnovaCoolingRuntimeSensor(coordinator),
+            InnovaDutyCycleSensor(coordinator),
+        ]
+        if coordinator.value("model") in POWER_PROFILES:
+            entities += [
+                InnovaPowerSensor(coordinator),
+                InnovaEnergySensor(coordinator),
+            ]
+    entities.append(
+        InnovaLoadSensor(
+            coordinator, hass.data[DOMAIN][DATA_LOAD_MANAGER], config_entry.entry_id
+        )
+    )
     async_add_entities(entities)
 
 
-class InnovaTemperatureSensor(CoordinatorEntity, SensorEntity):
-    def __init__(self, coordinator: InnovaCoordinator) -> None:
-        super().__init__(coordinator)
-        self._innova = coordinator.innova
-        self._device_info = InnovaDeviceInfo(self._innova)
-
+class InnovaTemperatureSensor(InnovaCoordinatorEntity, SensorEntity):
     @property
     def state_class(self) -> SensorStateClass | str | None:
+        # Long-term statistics are then imported by the integration itself
+        if self.coordinator.options.get(CONF_COMPACT_STATISTICS, DEFAULT_COMPACT_STATISTICS):
+            return None
         return SensorStateClass.MEASUREMENT
 
     @property
@@ -46,13 +87,10 @@ class InnovaTemperatureSensor(CoordinatorEntity, SensorEntity):
     def native_unit_of_measurement(self) -> str | None:
         return UnitOfTemperature.CELSIUS
 
-    @property
-    def device_info(self) -> DeviceInfo:
-        """Return a device description for device registry."""
-        return self._device_info.device_info
-
 
 class InnovaAmbientSensor(InnovaTemperatureSensor):
+    _innova_fields = frozenset({"name", "ambient_temp"})
+
     def __init__(self, coordinator: InnovaCoordinator) -> None:
         super().__init__(coordinator)
 
@@ -62,7 +100,7 @@ class InnovaAmbientSensor(InnovaTemperatureSensor):
 
     @property
     def native_value(self) -> int:
-        return self._innova.ambient_temp
+        return self.coordinator.value("ambient_temp")
 
     @property
     def unique_id(self) -> str | None:
@@ -70,6 +108,8 @@ class InnovaAmbientSensor(InnovaTemperatureSensor):
 
 
 class InnovaWaterSensor(InnovaTemperatureSensor):
+    _innova_fields = frozenset({"name", "water_temp"})
+
     def __init__(self, coordinator: InnovaCoordinator) -> None:
         super().__init__(coordinator)
 
@@ -79,8 +119,346 @@ class InnovaWaterSensor(InnovaTemperatureSensor):
 
     @property
     def native_value(self) -> int:
-        return self._innova.water_temp
+        return self.coordinator.value("water_temp")
 
     @property
     def unique_id(self) -> str | None:
         return f"{self._device_info.unique_id}-water-{self.device_class}"
+
+
+class InnovaRuntimeSensor(InnovaCoordinatorEntity, SensorEntity):
+    """Sensor reporting the hours a unit spent running since it was added."""
+
+    _attr_device_class = SensorDeviceClass.DURATION
+    _attr_native_unit_of_measurement = UnitOfTime.HOURS
+    _attr_state_class = SensorStateClass.TOTAL_INCREASING
+    _attr_suggested_display_precision = 1
+    _sensor_name: str
+    _runtime_attribute: str
+
+    @property
+    def name(self) -> str | None:
+        return f"{self._device_info.name}-{self._sensor_name}"
+
+    @property
+    def unique_id(self) -> str | None:
+        return f"{self._device_info.unique_id}-{self._sensor_name}"
+
+    @property
+    def native_value(self) -> float:
+        return getattr(self.coordinator.runtime, self._runtime_attribute) / 3600
+
+
+class InnovaCompressorRuntimeSensor(InnovaRuntimeSensor):
+    """Hours the compressor ran, heating, cooling or drying."""
+
+    _sensor_name = "compressor-runtime"
+    _runtime_attribute = "compressor_seconds"
+
+
+class InnovaHeatingRuntimeSensor(InnovaRuntimeSensor):
+    """Hours the unit spent heating."""
+
+    _sensor_name = "heating-runtime"
+    _runtime_attribute = "heating_seconds"
+
+
+class InnovaCoolingRuntimeSensor(InnovaRuntimeSensor):
+    """Hours the unit spent cooling."""
+
+    _sensor_name = "cooling-runtime"
+    _runtime_attribute = "cooling_seconds"
+
+
+class InnovaDutyCycleSensor(InnovaCoordinatorEntity, SensorEntity):
+    """Sensor reporting the share of the day the compressor ran."""
+
+    _attr_native_unit_of_measurement = PERCENTAGE
+    _attr_state_class = SensorStateClass.MEASUREMENT
+    _attr_suggested_display_precision = 0
+    _sensor_name = "duty-cycle"
+
+    @property
+    def name(self) -> str | None:
+        return f"{self._device_info.name}-{self._sensor_name}"
+
+    @property
+    def unique_id(self) -> str | None:
+        return f"{self._device_info.unique_id}-{self._sensor_name}"
+
+    @property
+    def native_value(self) -> float | None:
+        if (duty_cycle := self.coordinator.runtime.duty_cycle) is None:
+            return None
+        return duty_cycle * 100
+
+    @property
+    def extra_state_attributes(self) -> dict[str, float | None]:
+        previous = self.coordinator.runtime.previous_duty_cycle
+        return {"previous_day": previous * 100 if previous is not None else None}
+
+
+class InnovaPowerSensor(InnovaCoordinatorEntity, SensorEntity):
+    """Sensor estimating the power drawn by the unit from its state."""
+
+    _attr_device_class = SensorDeviceClass.POWER
+    _attr_native_unit_of_measurement = UnitOfPower.WATT
+    _attr_state_class = SensorStateClass.MEASUREMENT
+    _attr_suggested_display_precision = 0
+    _innova_fields = frozenset(
+        {"name", "model", "power", "mode", "fan_speed", "ambient_temp", "target_temperature"}
+    )
+    _sensor_name = "power"
+
+    @property
+    def name(self) -> str | None:
+        return f"{self._device_info.name}-{self._sensor_name}"
+
+    @property
+    def unique_id(self) -> str | None:
+        return f"{self._device_info.unique_id}-{self._sensor_name}"
+
+    @property
+    def native_value(self) -> float | None:
+        value = self.coordinator.value
+        hvac_action = infer_hvac_action(
+            value("power"),
+            value("mode"),
+            value("ambient_temp"),
+            value("target_temperature"),
+        )
+        return estimate_power(
+            value("model"), value("power"), value("fan_speed"), hvac_action
+        )
+
+
+class InnovaEnergySensor(InnovaCoordinatorEntity, SensorEntity):
+    """Sensor accumulating the estimated energy used by the unit, for the Energy dashboard."""
+
+    _attr_device_class = SensorDeviceClass.ENERGY
+    _attr_native_unit_of_measurement = UnitOfEnergy.KILO_WATT_HOUR
+    _attr_state_class = SensorStateClass.TOTAL_INCREASING
+    _attr_suggested_display_precision = 2
+    _sensor_name = "energy"
+
+    @property
+    def name(self) -> str | None:
+        return f"{self._device_info.name}-{self._sensor_name}"
+
+    @property
+    def unique_id(self) -> str | None:
+        return f"{self._device_info.unique_id}-{self._sensor_name}"
+
+    @property
+    def native_value(self) -> float:
+        return self.coordinator.runtime.energy_wh / 1000
+
+
+class InnovaPreconditionSensor(InnovaCoordinatorEntity, SensorEntity):
+    """Sensor reporting when the unit starts for the pending pre-conditioning."""
+
+    _attr_device_class = SensorDeviceClass.TIMESTAMP
+    _sensor_name = "precondition-start"
+
+    async def async_added_to_hass(self) -> None:
+        await super().async_added_to_hass()
+        self.async_on_remove(
+            self.coordinator.preconditioner.async_add_listener(self.async_write_ha_state)
+        )
+
+    @property
+    def name(self) -> str | None:
+        return f"{self._device_info.name}-{self._sensor_name}"
+
+    @property
+    def unique_id(self) -> str | None:
+        return f"{self._device_info.unique_id}-{self._sensor_name}"
+
+    @property
+    def native_value(self) -> datetime | None:
+        return self.coordinator.preconditioner.start_time
+
+    @property
+    def extra_state_attributes(self) -> dict[str, Any]:
+        preconditioner = self.coordinator.preconditioner
+        plan = preconditioner.plan
+        return {
+            "target_time": plan.at if plan is not None else None,
+            "hvac_mode": plan.hvac_mode if plan is not None else None,
+            "temperature": plan.temperature if plan is not None else None,
+            "started": plan is not None and plan.started is not None,
+            "heating_rate": preconditioner.heating_rate,
+            "cooling_rate": preconditioner.cooling_rate,
+            "last_error": preconditioner.last_error,
+        }
+
+
+class InnovaLoadSensor(InnovaCoordinatorEntity, SensorEntity):
+    """Sensor reporting whether the load manager lets the unit run."""
+
+    _attr_device_class = SensorDeviceClass.ENUM
+    _attr_options = LOAD_STATES
+    _sensor_name = "load"
+    # Written by the load manager after each of its cycles
+    _innova_fields = frozenset()
+
+    def __init__(
+        self, coordinator: InnovaCoordinator, load_manager: InnovaLoadManager, entry_id: str
+    ) -> None:
+        super().__init__(coordinator)
+        self._load_manager = load_manager
+        self._entry_id = entry_id
+
+    async def async_added_to_hass(self) -> None:
+        await super().async_added_to_hass()
+        self.async_on_remove(self._load_manager.async_add_listener(self.async_write_ha_state))
+
+    @property
+    def name(self) -> str | None:
+        return f"{self._device_info.name}-{self._sensor_name}"
+
+    @property
+    def unique_id(self) -> str | None:
+        return f"{self._device_info.unique_id}-{self._sensor_name}"
+
+    @property
+    def native_value(self) -> str:
+        return self._load_manager.state(self._entry_id)
+
+    @property
+    def extra_state_attributes(self) -> dict[str, Any]:
+        # The fleet-wide decisions, the same on the sensor of every unit
+        load_manager = self._load_manager
+        return {
+            "max_active_units": load_manager.limit or None,
+            "active_units": len(load_manager.active),
+            "deferred_units": load_manager.deferred_names,
+        }
+
+
+class InnovaDiagnosticSensor(InnovaCoordinatorEntity, SensorEntity):
+    """Diagnostic sensor about how the unit is polled."""
+
+    _attr_entity_category = EntityCategory.DIAGNOSTIC
+    _sensor_name: str
+
+    @property
+    def available(self) -> bool:
+        # These are most interesting while the unit is unreachable
+        return True
+
+    @property
+    def name(self) -> str | None:
+        return f"{self._device_info.name}-{self._sensor_name}"
+
+    @property
+    def unique_id(self) -> str | None:
+        return f"{self._device_info.unique_id}-{self._sensor_name}"
+
+
+class InnovaPollIntervalSensor(InnovaDiagnosticSensor):
+    """Diagnostic sensor reporting the current adaptive polling interval."""
+
+    _attr_device_class = SensorDeviceClass.DURATION
+    _attr_native_unit_of_measurement = UnitOfTime.SECONDS
+    _sensor_name = "poll-interval"
+
+    @property
+    def native_value(self) -> float | None:
+        if self.coordinator.update_interval is None:
+            return None
+        return self.coordinator.update_interval.total_seconds()
+
+    @property
+    def extra_state_attributes(self) -> dict[str, str]:
+        return {"update_mode": self.coordinator.update_mode}
+
+
+class InnovaLatencySensor(InnovaDiagnosticSensor):
+    """Diagnostic sensor reporting the median latency of the status requests."""
+
+    _attr_device_class = SensorDeviceClass.DURATION
+    _attr_entity_registry_enabled_default = False
+    _attr_native_unit_of_measurement = UnitOfTime.MILLISECONDS
+    _attr_state_class = SensorStateClass.MEASUREMENT
+    _attr_suggested_display_precision = 0
+    _sensor_name = "status-latency"
+
+    @property
+    def native_value(self) -> float | None:
+        if (median := self.coordinator.instrumentation.latency["status"].percentile(0.5)) is None:
+            return None
+        return median * 1000
+
+    @property
+    def extra_state_attributes(self) -> dict[str, float | None]:
+        stats = self.coordinator.instrumentation.latency["status"]
+        p95 = stats.percentile(0.95)
+        return {
+            "p95": p95 * 1000 if p95 is not None else None,
+            "max": stats.maximum * 1000,
+        }
+
+
+class InnovaStateWriteSensor(InnovaDiagnosticSensor):
+    """Diagnostic sensor reporting the event loop time spent writing entity states."""
+
+    _attr_device_class = SensorDeviceClass.DURATION
+    _attr_entity_registry_enabled_default = False
+    _attr_native_unit_of_measurement = UnitOfTime.MILLISECONDS
+    _attr_state_class = SensorStateClass.MEASUREMENT
+    _attr_suggested_display_precision = 2
+    _sensor_name = "state-write-time"
+
+    @property
+    def native_value(self) -> float | None:
+        if (mean := self.coordinator.instrumentation.state_writes.mean()) is None:
+            return None
+        return mean * 1000
+
+
+class InnovaFailuresSensor(InnovaDiagnosticSensor):
+    """Diagnostic sensor counting the failed polls and commands."""
+
+    _attr_entity_registry_enabled_default = False
+    _attr_state_class = SensorStateClass.TOTAL_INCREASING
+    _sensor_name = "failures"
+
+    @property
+    def native_value(self) -> int:
+        return self.coordinator.instrumentation.failure_count
+
+    @property
+    def extra_state_attributes(self) -> dict[str, int]:
+        instrumentation = self.coordinator.instrumentation
+        return {
+            **instrumentation.failures,
+            "consecutive": instrumentation.consecutive_failures,
+            "retries": instrumentation.retries,
+            "queue_depth": instrumentation.queue_depth,
+        }
+
+
+class InnovaConnectionReuseSensor(InnovaDiagnosticSensor):
+    """Diagnostic sensor reporting how often the connection to the unit is reused."""
+
+    _attr_entity_registry_enabled_default = False
+    _attr_native_unit_of_measurement = PERCENTAGE
+    _attr_state_class = SensorStateClass.MEASUREMENT
+    _attr_suggested_display_precision = 0
+    _sensor_name = "connection-reuse"
+
+    @property
+    def native_value(self) -> float | None:
+        if (rate := self.coordinator.transport.reuse_rate) is None:
+            return None
+        return rate * 100
+
+    @property
+    def extra_state_attributes(self) -> dict[str, int]:
+        transport = self.coordinator.transport
+        return {
+            "handshakes": transport.handshakes,
+            "reused": transport.reused,
+            "errors": transport.errors,
+        }
@@ -0,0 +1,117 @@
+"""Immutable snapshot of the state polled from an Innova unit."""
+from __future__ import annotations
+
+from collections.abc import Mapping
+from dataclasses import dataclass, fields
+from typing import TYPE_CHECKING, Any
+
+from innova_controls.fan_speed import FanSpeed
+from innova_controls.mode import Mode
+
+if TYPE_CHECKING:
+    from innova_controls.innova import Innova
+
+
+def _encode_mode(mode: Mode) -> dict[str, Any]:
+    return {
+        "command": mode.command,
+        "code": mode.code,
+        "heat": mode.is_heating,
+        "cool": mode.is_cooling,
+        "dehumidify": mode.is_dehumidifying,
+        "fan_only": mode.is_fan_only,
+        "auto": mode.is_auto,
+    }
+
+
+@dataclass(frozen=True, slots=True)
+class InnovaSnapshot:
+    """Values of an Innova unit at the time of a poll."""
+
+    # Identity
+    serial: str | None
+    uid: str | None
+    name: str | None
+    model: str
+    software_version: str | None
+    # Capabilities
+    supports_target_temp: bool
+    supports_water_temp: bool
+    supports_swing: bool
+    supports_fan: bool
+    supports_preset: bool
+    supports_keyboard_lock: bool
+    temperature_step: float
+    min_temperature: float
+    max_temperature: float
+    supported_modes: tuple[Mode, ...]
+    supported_fan_speeds: tuple[FanSpeed, ...]
+    # Readings
+    ambient_temp: float
+    water_temp: float | None
+    target_temperature: float
+    power: bool
+    mode: Mode
+    # None for an AirLeaf in night mode
+    fan_speed: FanSpeed | None
+    rotation: bool
+    night_mode: bool
+    scheduling_mode: bool
+    keyboard_locked: bool
+
+    @classmethod
+    def from_innova(cls, innova: Innova) -> InnovaSnapshot:
+        """Capture the state of a unit that was successfully polled."""
+        values = {field.name: getattr(innova, field.name) for field in fields(cls)}
+        values["supported_modes"] = tuple(innova.supported_modes)
+        values["supported_fan_speeds"] = tuple(sorted(innova.supported_fan_speeds))
+        return cls(**values)
+
+    @classmethod
+    def from_dict(cls, data: Mapping[str, Any]) -> InnovaSnapshot:
+        """Rebuild a snapshot saved with as_dict."""
+        values = {field.name: data[field.name] for field in fields(cls)}
+        values["mode"] = Mode(**data["mode"])
+        values["supported_modes"] = tuple(Mode(**mode) for mode in data["supported_modes"])
+        values["fan_speed"] = (
+            FanSpeed(data["fan_speed"]) if data["fan_speed"] is not None else None
+        )
+        values["supported_fan_speeds"] = tuple(
+            FanSpeed(speed) for speed in data["supported_fan_speeds"]
+        )
+        return cls(**values)
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return a JSON serializable version of the snapshot."""
+        data = {field.name: getattr(self, field.name) for field in fields(self)}
+        data["mode"] = _encode_mode(self.mode)
+        data["supported_modes"] = [_encode_mode(mode) for mode in self.supported_modes]
+        data["fan_speed"] = int(self.fan_speed) if self.fan_speed is not None else None
+        data["supported_fan_speeds"] = [int(speed) for speed in self.supported_fan_speeds]
+        return data
+
+    def diff(
+        self, previous: InnovaSnapshot, deadbands: Mapping[str, float]
+    ) -> frozenset[str]:
+        """Return the fields that changed since a previous snapshot.
+
+        Numeric fields listed in deadbands only count as changed when they
+        moved by at least the deadband.
+        """
+        changed = []
+        for field in fields(self):
+            name = field.name
+            value = getattr(self, name)
+            old = getattr(previous, name)
+            if name == "mode":
+                if value.code != old.code:
+                    changed.append(name)
+            elif name == "supported_modes":
+                if [mode.code for mode in value] != [mode.code for mode in old]:
+                    changed.append(name)
+            elif name in deadbands and value is not None and old is not None:
+                if abs(value - old) >= deadbands[name] and value != old:
+                    changed.append(name)
+            elif value != old:
+                changed.append(name)
+        return frozenset(changed)
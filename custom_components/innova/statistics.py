@@ -0,0 +1,267 @@
+"""Compact long-term temperature statistics of an Innova unit."""
+from __future__ import annotations
+
+import time
+from array import array
+from collections.abc import Iterator
+from datetime import datetime, timezone
+from typing import TYPE_CHECKING, Any
+
+from homeassistant.const import UnitOfTemperature
+from homeassistant.core import CALLBACK_TYPE, HomeAssistant, callback
+from homeassistant.helpers.storage import Store
+from homeassistant.util import slugify
+from homeassistant.util.unit_conversion import TemperatureConverter
+
+from .const import DOMAIN
+
+if TYPE_CHECKING:
+    from .coordinator import InnovaCoordinator
+
+STORAGE_VERSION = 1
+SAVE_DELAY = 300
+BUCKET_SECONDS = 3600
+# Hourly buckets kept, to import them again after a long recorder outage
+CAPACITY = 24 * 7
+# Longest time a reading is taken to hold without a newer one, in seconds
+MAX_HOLD = 3600
+
+STATISTICS = {
+    "ambient_temp": ("ambient_temperature", "ambient temperature"),
+    "water_temp": ("water_temperature", "water temperature"),
+}
+
+
+class HourlyRing:
+    """Hourly min, max and time-weighted mean of a reading, in fixed size flat arrays.
+
+    As in the recorder, each reading holds until the next one, so the mean is
+    not skewed towards the hours polled more often. A reading holds at most
+    MAX_HOLD, across a restart or an outage nothing tells how long it held.
+    """
+
+    __slots__ = (
+        "_starts",
+        "_minimums",
+        "_maximums",
+        "_sums",
+        "_durations",
+        "_head",
+        "_last",
+    )
+
+    def __init__(self, capacity: int = CAPACITY) -> None:
+        """Initialize empty buckets."""
+        self._starts = array("q", [0]) * capacity
+        self._minimums = array("d", [0.0]) * capacity
+        self._maximums = array("d", [0.0]) * capacity
+        # Sum of the readings weighted by the seconds they held, and those seconds
+        self._sums = array("d", [0.0]) * capacity
+        self._durations = array("d", [0.0]) * capacity
+        # Index of the bucket of the current hour, -1 before the first reading
+        self._head = -1
+        # Time and value of the last reading, which holds until the next one
+        self._last: tuple[float, float] | None = None
+
+    def add(self, timestamp: float, value: float) -> bool:
+        """Add a reading, return True if it closed the previous bucket."""
+        closed = False
+        if self._last is not None:
+            since, last = self._last
+            held_until = min(timestamp, since + MAX_HOLD)
+            # The last reading held until now, over every hour it spanned
+            while since < held_until:
+                start = _bucket(since)
+                end = min(held_until, start + BUCKET_SECONDS)
+                closed |= self._add(start, last, end - since)
+                since = end
+        closed |= self._add(_bucket(timestamp), value, 0.0)
+        self._last = (timestamp, value)
+        return closed
+
+    def _add(self, start: int, value: float, seconds: float) -> bool:
+        """Add a reading held for some seconds of a bucket, return True if one closed."""
+        head = self._head
+        if head >= 0 and self._starts[head] >= start:
+            if self._starts[head] > start:
+                # The clock went back, the bucket was closed already
+                return False
+            self._sums[head] += value * seconds
+            self._durations[head] += seconds
+            if value < self._minimums[head]:
+                self._minimums[head] = value
+            if value > self._maximums[head]:
+                self._maximums[head] = value
+            return False
+
+        closed = head >= 0
+        head = self._head = (head + 1) % len(self._starts)
+        self._starts[head] = start
+        self._minimums[head] = value
+        self._maximums[head] = value
+        self._sums[head] = value * seconds
+        self._durations[head] = seconds
+        return closed
+
+    def closed_buckets(self, after: int) -> Iterator[tuple[int, float, float, float]]:
+        """Yield the start, mean, min and max of the closed buckets started after a time."""
+        capacity = len(self._starts)
+        for offset in range(1, capacity):
+            index = (self._head + offset) % capacity
+            if self._durations[index] and self._starts[index] > after:
+                yield (
+                    self._starts[index],
+                    self._sums[index] / self._durations[index],
+                    self._minimums[index],
+                    self._maximums[index],
+                )
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return the buckets in a JSON serializable form."""
+        return {
+            "head": self._head,
+            "starts": self._starts.tolist(),
+            "minimums": self._minimums.tolist(),
+            "maximums": self._maximums.tolist(),
+            "sums": self._sums.tolist(),
+            "durations": self._durations.tolist(),
+            "last": self._last,
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict[str, Any]) -> HourlyRing:
+        """Rebuild buckets saved with as_dict."""
+        ring = cls(len(data["starts"]))
+        ring._head = data["head"]
+        ring._starts = array("q", data["starts"])
+        ring._minimums = array("d", data["minimums"])
+        ring._maximums = array("d", data["maximums"])
+        ring._sums = array("d", data["sums"])
+        ring._durations = array("d", data["durations"])
+        if (last := data["last"]) is not None:
+            ring._last = (float(last[0]), float(last[1]))
+        return ring
+
+
+class InnovaTemperatureStatistics:
+    """Import hourly temperature statistics of a unit into the recorder.
+
+    Readings are aggregated by the integration and only the closed hourly
+    buckets reach the database, so the raw states of the temperature
+    sensors do not need to be recorded.
+    """
+
+    def __init__(
+        self, hass: HomeAssistant, coordinator: InnovaCoordinator, entry_id: str
+    ) -> None:
+        """Initialize the statistics."""
+        self._hass = hass
+        self._coordinator = coordinator
+        self._store = _store(hass, entry_id)
+        self._rings: dict[str, HourlyRing] = {}
+        # Start of the last bucket imported, per reading
+        self._imported: dict[str, int] = {}
+
+    async def async_load(self) -> None:
+        """Restore the buckets saved before a restart."""
+        fields = ["ambient_temp"]
+        if self._coordinator.capabilities.supports_water_temp:
+            fields.append("water_temp")
+        data = await self._store.async_load() or {}
+        for field in fields:
+            try:
+                self._rings[field] = HourlyRing.from_dict(data["rings"][field])
+                self._imported[field] = data["imported"][field]
+            except (KeyError, TypeError, ValueError):
+                self._rings[field] = HourlyRing()
+                self._imported[field] = 0
+
+    @callback
+    def async_start(self) -> CALLBACK_TYPE:
+        """Start aggregating the polled readings, return the stop callback."""
+        return self._coordinator.async_add_poll_listener(self._async_handle_update)
+
+    async def async_save(self) -> None:
+        """Save the buckets now."""
+        await self._store.async_save(self._data())
+
+    @staticmethod
+    async def async_remove_store(hass: HomeAssistant, entry_id: str) -> None:
+        """Remove the buckets of a deleted entry."""
+        await _store(hass, entry_id).async_remove()
+
+    @callback
+    def _async_handle_update(self) -> None:
+        snapshot = self._coordinator.data
+        now = time.time()
+        closed = False
+        for field, ring in self._rings.items():
+            if (value := getattr(snapshot, field)) is not None:
+                closed |= ring.add(now, value)
+        if closed:
+            self._async_import()
+        self._store.async_delay_save(self._data, SAVE_DELAY)
+
+    @callback
+    def _async_import(self) -> None:
+        """Import the buckets closed since the last import."""
+        if "recorder" not in self._hass.config.components:
+            return
+        # The recorder pulls in the database layer, only import it once it is loaded
+        from homeassistant.components.recorder.models import (
+            StatisticData,
+            StatisticMetaData,
+        )
+
+        try:
+            from homeassistant.components.recorder.models import StatisticMeanType
+        except ImportError:
+            # Cores before the mean types only know whether there is a mean
+            StatisticMeanType = None
+        from homeassistant.components.recorder.statistics import (
+            async_add_external_statistics,
+        )
+
+        unique_id = slugify(self._coordinator.device_info.unique_id)
+        for field, ring in self._rings.items():
+            buckets = list(ring.closed_buckets(self._imported[field]))
+            if not buckets:
+                continue
+            object_id, label = STATISTICS[field]
+            metadata = StatisticMetaData(
+                has_sum=False,
+                name=f"{self._coordinator.device_info.name} {label}",
+                source=DOMAIN,
+                statistic_id=f"{DOMAIN}:{unique_id}_{object_id}",
+                unit_of_measurement=UnitOfTemperature.CELSIUS,
+            )
+            if StatisticMeanType is not None:
+                metadata["mean_type"] = StatisticMeanType.ARITHMETIC
+                metadata["unit_class"] = TemperatureConverter.UNIT_CLASS
+            else:
+                metadata["has_mean"] = True
+            statistics = [
+                StatisticData(
+                    start=datetime.fromtimestamp(start, timezone.utc),
+                    mean=mean,
+                    min=minimum,
+                    max=maximum,
+                )
+                for start, mean, minimum, maximum in buckets
+            ]
+            async_add_external_statistics(self._hass, metadata, statistics)
+            self._imported[field] = buckets[-1][0]
+
+    def _data(self) -> dict[str, Any]:
+        return {
+            "rings": {field: ring.as_dict() for field, ring in self._rings.items()},
+            "imported": self._imported,
+        }
+
+
+def _bucket(timestamp: float) -> int:
+    return int(timestamp // BUCKET_SECONDS * BUCKET_SECONDS)
+
+
+def _store(hass: HomeAssistant, entry_id: str) -> Store[dict[str, Any]]:
+    return Store(hass, STORAGE_VERSION, f"{DOMAIN}.{entry_id}.statistics")
@@ -1,13 +1,12 @@
 from homeassistant.components.switch import SwitchDeviceClass, SwitchEntity
 from homeassistant.config_entries import ConfigEntry
 from homeassistant.core import HomeAssistant
-from homeassistant.helpers.entity import DeviceInfo
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
-from homeassistant.helpers.update_coordinator import CoordinatorEntity
 
+from .command_queue import COMMAND_KEYBOARD_LOCK, COMMAND_SCHEDULING
 from .const import DOMAIN
 from .coordinator import InnovaCoordinator
-from .device_info import InnovaDeviceInfo
+from .entity import InnovaCoordinatorEntity
 
 
 async def async_setup_entry(
@@ -17,23 +16,15 @@ async def async_setup_entry(
 ):
     coordinator: InnovaCoordinator = hass.data[DOMAIN][config_entry.entry_id]
     entities = [InnovaSchedulingSwitch(coordinator)]
-    if coordinator.innova.supports_keyboard_lock:
+    if coordinator.capabilities.supports_keyboard_lock:
         entities.append(InnovaKeyboardLockSwitch(coordinator))
     async_add_entities(entities)
 
 
-class InnovaBaseSwitch(CoordinatorEntity[InnovaCoordinator], SwitchEntity):
+class InnovaBaseSwitch(InnovaCoordinatorEntity, SwitchEntity):
     _attr_device_class = SwitchDeviceClass.SWITCH
     _switch_name: str
 
-    def __init__(self, coordinator: InnovaCoordinator) -> None:
-        super().__init__(coordinator)
-        self._device_info = InnovaDeviceInfo(self.coordinator.innova)
-
-    @property
-    def device_info(self) -> DeviceInfo:
-        return self._device_info.device_info
-
     @property
     def name(self) -> str:
         return f"{self._device_info.name}-{self._switch_name}-{self.device_class}"
@@ -45,37 +36,51 @@ class InnovaBaseSwitch(CoordinatorEntity[InnovaCoordinator], SwitchEntity):
 
 class InnovaSchedulingSwitch(InnovaBaseSwitch):
     _switch_name = "scheduling"
+    _innova_fields = frozenset({"name", "scheduling_mode"})
 
     def __init__(self, coordinator: InnovaCoordinator) -> None:
         super().__init__(coordinator)
 
     @property
     def is_on(self) -> bool | None:
-        return self.coordinator.innova.scheduling_mode
+        return self.coordinator.value("scheduling_mode")
 
     async def async_turn_on(self) -> None:
-        await self.coordinator.innova.set_scheduling_on()
-        self.coordinator.async_update_listeners()
+        await self.coordinator.async_send_command(
+            COMMAND_SCHEDULING,
+            self.coordinator.innova.set_scheduling_on,
+            scheduling_mode=True,
+        )
 
     async def async_turn_off(self) -> None:
-        await self.coordinator.innova.set_scheduling_off()
-        self.coordinator.async_update_listeners()
+        await self.coordinator.async_send_command(
+            COMMAND_SCHEDULING,
+            self.coordinator.innova.set_scheduling_off,
+            scheduling_mode=False,
+        )
 
 
 class InnovaKeyboardLockSwitch(InnovaBaseSwitch):
     _switch_name = "keyboard-lock"
+    _innova_fields = frozenset({"name", "keyboard_locked"})
 
     def __init__(self, coordinator: InnovaCoordinator) -> None:
         super().__init__(coordinator)
 
     @property
     def is_on(self) -> bool | None:
-        return self.coordinator.innova.keyboard_locked
+        return self.coordinator.value("keyboard_locked")
 
     async def async_turn_on(self) -> None:
-        await self.coordinator.innova.lock_keyboard()
-        self.coordinator.async_update_listeners()
+        await self.coordinator.async_send_command(
+            COMMAND_KEYBOARD_LOCK,
+            self.coordinator.innova.lock_keyboard,
+            keyboard_locked=True,
+        )
 
     async def async_turn_off(self) -> None:
-        await self.coordinator.innova.unlock_keyboard()
-        self.coordinator.async_update_listeners()
+        await self.coordinator.async_send_command(
+            COMMAND_KEYBOARD_LOCK,
+            self.coordinator.innova.unlock_keyboard,
+            keyboard_locked=False,
+        )
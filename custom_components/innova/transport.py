@@ -0,0 +1,191 @@
+"""HTTP transport dedicated to a single Innova unit."""
+from __future__ import annotations
+
+import asyncio
+import time
+from collections.abc import Awaitable
+from ipaddress import ip_address
+from types import SimpleNamespace
+from typing import Any
+
+import aiohttp
+
+from .instrumentation import DurationStats
+
+# The embedded web servers of the units cope badly with parallel and new
+# connections, so each unit gets one connection kept open between polls.
+KEEPALIVE_TIMEOUT = 60
+# Status requests are cheap, give up early so the unit is polled again soon
+READ_TIMEOUT = aiohttp.ClientTimeout(total=10, connect=3, sock_read=7)
+# Commands are applied before the unit answers
+WRITE_TIMEOUT = aiohttp.ClientTimeout(total=15, connect=3, sock_read=12)
+DNS_CACHE_TTL = 300
+API_PREFIX = "/api/v/1/"
+
+
+def is_ip_host(host: str) -> bool:
+    """Return True if host is an IP address, with or without a port and path."""
+    host = host.split("/", 1)[0]
+    address = host.rsplit(":", 1)[0] if host.count(":") == 1 else host
+    try:
+        ip_address(address.strip("[]"))
+    except ValueError:
+        return False
+    return True
+
+
+class InnovaTransport:
+    """Keep-alive HTTP session of a unit, used by innova_controls as its session.
+
+    A single connection is allowed to the unit, requests are therefore sent
+    one after the other and reuse it. A second one is only opened for the
+    requests held by a gateway or a unit with an event channel. Status
+    requests and commands get their own timeouts, and the connection reuse
+    is measured.
+    """
+
+    def __init__(self, host: str, connections: int = 1) -> None:
+        """Initialize the transport."""
+        self.host = host
+        self.connections = connections
+        self.requests: dict[str, DurationStats] = {}
+        self.connects = DurationStats()
+        self.handshakes = 0
+        self.reused = 0
+        self.errors = 0
+
+        self._retired: set[aiohttp.ClientSession] = set()
+        self._session = self._create_session(connections)
+
+    def _create_session(self, connections: int) -> aiohttp.ClientSession:
+        """Create the session keeping the connections to the unit open."""
+        trace_config = aiohttp.TraceConfig()
+        trace_config.on_request_start.append(self._on_request_start)
+        trace_config.on_request_end.append(self._on_request_end)
+        trace_config.on_request_exception.append(self._on_request_exception)
+        trace_config.on_connection_create_start.append(self._on_connection_create_start)
+        trace_config.on_connection_create_end.append(self._on_connection_create_end)
+        trace_config.on_connection_reuseconn.append(self._on_connection_reuseconn)
+
+        connector = aiohttp.TCPConnector(
+            limit=connections,
+            limit_per_host=connections,
+            keepalive_timeout=KEEPALIVE_TIMEOUT,
+            # IP addresses are never resolved by aiohttp, names are cached
+            use_dns_cache=not is_ip_host(self.host),
+            ttl_dns_cache=DNS_CACHE_TTL,
+        )
+        return aiohttp.ClientSession(
+            connector=connector,
+            timeout=READ_TIMEOUT,
+            trace_configs=[trace_config],
+        )
+
+    @property
+    def reuse_rate(self) -> float | None:
+        """Return the fraction of requests sent over an already open connection."""
+        if not (connections := self.handshakes + self.reused):
+            return None
+        return self.reused / connections
+
+    def get(self, url: str, **kwargs: Any) -> Awaitable[aiohttp.ClientResponse]:
+        """Send a status request."""
+        kwargs["timeout"] = READ_TIMEOUT
+        return self._session.get(url, **kwargs)
+
+    def post(self, url: str, **kwargs: Any) -> Awaitable[aiohttp.ClientResponse]:
+        """Send a command."""
+        kwargs["timeout"] = WRITE_TIMEOUT
+        return self._session.post(url, **kwargs)
+
+    def hold(
+        self, url: str, timeout: aiohttp.ClientTimeout, **kwargs: Any
+    ) -> Awaitable[aiohttp.ClientResponse]:
+        """Send a request the unit may hold before answering, like the event channel."""
+        kwargs["timeout"] = timeout
+        return self._session.get(url, **kwargs)
+
+    async def async_set_connections(self, connections: int) -> None:
+        """Allow more connections to the unit, for requests it holds."""
+        if connections == self.connections:
+            return
+        retired = self._session
+        self._retired.add(retired)
+        self.connections = connections
+        self._session = self._create_session(connections)
+        # Requests already sent over the previous connection finish first
+        await asyncio.sleep(WRITE_TIMEOUT.total)
+        self._retired.discard(retired)
+        await retired.close()
+
+    async def async_close(self) -> None:
+        """Close the connection to the unit."""
+        await self._session.close()
+        for session in list(self._retired):
+            await session.close()
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return the transport measurements for diagnostics."""
+        return {
+            "handshakes": self.handshakes,
+            "reused": self.reused,
+            "reuse_rate": self.reuse_rate,
+            "errors": self.errors,
+            "connects": self.connects.as_dict(),
+            "requests": {
+                endpoint: stats.as_dict() for endpoint, stats in self.requests.items()
+            },
+        }
+
+    async def _on_request_start(
+        self,
+        _session: aiohttp.ClientSession,
+        context: SimpleNamespace,
+        _params: aiohttp.TraceRequestStartParams,
+    ) -> None:
+        context.request_start = time.perf_counter()
+
+    async def _on_request_end(
+        self,
+        _session: aiohttp.ClientSession,
+        context: SimpleNamespace,
+        params: aiohttp.TraceRequestEndParams,
+    ) -> None:
+        # Requests through a gateway have the path of the unit before the prefix
+        endpoint = params.url.path.rpartition(API_PREFIX)[2]
+        if (stats := self.requests.get(endpoint)) is None:
+            stats = self.requests[endpoint] = DurationStats()
+        stats.add(time.perf_counter() - context.request_start)
+
+    async def _on_request_exception(
+        self,
+        _session: aiohttp.ClientSession,
+        _context: SimpleNamespace,
+        _params: aiohttp.TraceRequestExceptionParams,
+    ) -> None:
+        self.errors += 1
+
+    async def _on_connection_create_start(
+        self,
+        _session: aiohttp.ClientSession,
+        context: SimpleNamespace,
+        _params: aiohttp.TraceConnectionCreateStartParams,
+    ) -> None:
+        context.connect_start = time.perf_counter()
+
+    async def _on_connection_create_end(
+        self,
+        _session: aiohttp.ClientSession,
+        context: SimpleNamespace,
+        _params: aiohttp.TraceConnectionCreateEndParams,
+    ) -> None:
+        self.handshakes += 1
+        self.connects.add(time.perf_counter() - context.connect_start)
+
+    async def _on_connection_reuseconn(
+        self,
+        _session: aiohttp.ClientSession,
+        _context: SimpleNamespace,
+        _params: aiohttp.TraceConnectionReuseconnParams,
+    ) -> None:
+        self.reused += 1
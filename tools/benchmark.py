@@ -0,0 +1,316 @@
+"""Measure the cost of a poll cycle of the Innova integration.
+
+Coordinators and entities are created in a bare Home Assistant instance
+with fake clients answering instantly, so only the integration and the
+state machine are measured:
+
+* poll: one refresh of every coordinator, including the entity state writes
+* write: one forced state write of every entity, per entity class
+* command: a setter, the flush of the command and its confirmation poll
+* analytics: one analysis of the temperature response of the whole fleet
+  over full sample windows, as run in the executor
+
+Every run is appended to a history file and compared with the previous
+run of the same scenario to catch regressions.
+
+    python tools/benchmark.py --units 1 10 50 200
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import gc
+import json
+import logging
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from collections.abc import Awaitable, Callable
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+import numpy as np  # noqa: E402
+from homeassistant.const import EVENT_STATE_CHANGED  # noqa: E402
+from homeassistant.core import HomeAssistant, callback  # noqa: E402
+from homeassistant.helpers import frame  # noqa: E402
+from innova_controls.fan_speed import FanSpeed  # noqa: E402
+from innova_controls.twopointzero import TwoPointZero  # noqa: E402
+
+from custom_components.innova import create_coordinator  # noqa: E402
+from custom_components.innova.analytics import analyze  # noqa: E402
+from custom_components.innova.cache import InnovaStateCache  # noqa: E402
+from custom_components.innova.climate import InnovaEntity  # noqa: E402
+from custom_components.innova.const import ANALYTICS_WINDOW, DOMAIN  # noqa: E402
+from custom_components.innova.coordinator import InnovaCoordinator  # noqa: E402
+from custom_components.innova.entity import InnovaCoordinatorEntity  # noqa: E402
+from custom_components.innova.sensor import (  # noqa: E402
+    InnovaAmbientSensor,
+    InnovaWaterSensor,
+)
+from custom_components.innova.switch import (  # noqa: E402
+    InnovaKeyboardLockSwitch,
+    InnovaSchedulingSwitch,
+)
+
+DEFAULT_HISTORY = ROOT / ".benchmarks" / "history.jsonl"
+
+
+class FakeInnova:
+    """Client answering instantly, the ambient temperature changes every poll."""
+
+    def __init__(self, index: int) -> None:
+        self.serial = f"BENCH{index:05d}"
+        self.uid = f"02:00:00:00:{index // 256:02x}:{index % 256:02x}"
+        self.name = f"Innova {index}"
+        self.model = "TwoPointZero (2.0)"
+        self.software_version = "1.0.0"
+        self.supports_target_temp = True
+        self.supports_water_temp = True
+        self.supports_swing = True
+        self.supports_fan = True
+        self.supports_preset = True
+        self.supports_keyboard_lock = True
+        self.temperature_step = 1.0
+        self.min_temperature = 16
+        self.max_temperature = 31
+        self.supported_modes = list(TwoPointZero.Modes.get_supported_modes())
+        self.supported_fan_speeds = {FanSpeed.AUTO, FanSpeed.LOW, FanSpeed.MEDIUM, FanSpeed.HIGH}
+        self.ambient_temp = 20.0
+        self.water_temp = 35.0
+        self.target_temperature = 21.0
+        self.power = True
+        self.mode = TwoPointZero.Modes.HEATING
+        self.fan_speed = FanSpeed.AUTO
+        self.rotation = False
+        self.night_mode = False
+        self.scheduling_mode = False
+        self.keyboard_locked = False
+        self._polls = 0
+
+    async def async_update(self) -> bool:
+        self._polls += 1
+        self.ambient_temp = 20.0 + (self._polls % 10) / 10
+        return True
+
+    async def set_temperature(self, temperature: float) -> bool:
+        self.target_temperature = temperature
+        return True
+
+
+class Fleet:
+    """Coordinators and entities of the benchmarked units."""
+
+    def __init__(self, hass: HomeAssistant, units: int) -> None:
+        self.hass = hass
+        self.coordinators: list[InnovaCoordinator] = []
+        self.entities: list[InnovaCoordinatorEntity] = []
+        self.state_writes = 0
+        # Set up by async_setup of the integration, which the fleet bypasses
+        hass.data.setdefault(DOMAIN, {})
+        for index in range(units):
+            cache = InnovaStateCache(hass, f"benchmark_{index}")
+            coordinator = create_coordinator(hass, FakeInnova(index), cache, {})
+            self.coordinators.append(coordinator)
+
+    async def async_setup(self) -> None:
+        for coordinator in self.coordinators:
+            await coordinator.async_refresh()
+            for entity_class in (
+                InnovaEntity,
+                InnovaAmbientSensor,
+                InnovaWaterSensor,
+                InnovaSchedulingSwitch,
+                InnovaKeyboardLockSwitch,
+            ):
+                entity = entity_class(coordinator)
+                entity.hass = self.hass
+                entity.entity_id = (
+                    f"{entity_class.__name__.lower()}.{coordinator.device_info.unique_id.lower()}"
+                )
+                await entity.async_added_to_hass()
+                entity.async_write_ha_state()
+                self.entities.append(entity)
+
+        @callback
+        def _count(_event: Any) -> None:
+            self.state_writes += 1
+
+        self.hass.bus.async_listen(EVENT_STATE_CHANGED, _count)
+
+    async def async_poll(self) -> None:
+        for coordinator in self.coordinators:
+            await coordinator.async_refresh()
+
+    async def async_write(self, entity_class: type) -> None:
+        for entity in self.entities:
+            if type(entity) is entity_class:
+                entity.async_write_ha_state()
+
+    async def async_command(self) -> None:
+        for entity in self.entities:
+            if isinstance(entity, InnovaEntity):
+                await entity.async_set_temperature(temperature=22 + entity.current_temperature % 2)
+        for coordinator in self.coordinators:
+            await coordinator.command_queue.async_flush()
+            await coordinator.async_refresh()
+
+    async def async_shutdown(self) -> None:
+        for coordinator in self.coordinators:
+            await coordinator.async_shutdown()
+
+
+async def _async_measure(
+    action: Callable[[], Awaitable[None]], rounds: int
+) -> dict[str, float]:
+    """Return the mean time and allocated memory of an action."""
+    gc.collect()
+    durations = []
+    for _ in range(rounds):
+        start = time.perf_counter()
+        await action()
+        durations.append(time.perf_counter() - start)
+
+    tracemalloc.start()
+    tracemalloc.reset_peak()
+    before = tracemalloc.get_traced_memory()[0]
+    await action()
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    durations.sort()
+    return {
+        "mean_ms": sum(durations) / rounds * 1000,
+        "median_ms": durations[rounds // 2] * 1000,
+        "peak_kib": (peak - before) / 1024,
+        "retained_kib": (current - before) / 1024,
+    }
+
+
+async def async_run_scenario(units: int, rounds: int) -> dict[str, dict[str, float]]:
+    """Benchmark a fleet of units."""
+    with tempfile.TemporaryDirectory() as config_dir:
+        hass = HomeAssistant(config_dir)
+        frame.async_setup(hass)
+        fleet = Fleet(hass, units)
+        await fleet.async_setup()
+
+        results = {}
+        writes = fleet.state_writes
+        results["poll"] = await _async_measure(fleet.async_poll, rounds)
+        results["poll"]["state_writes"] = (fleet.state_writes - writes) / (rounds + 1)
+        for entity_class in (
+            InnovaEntity,
+            InnovaAmbientSensor,
+            InnovaWaterSensor,
+            InnovaSchedulingSwitch,
+            InnovaKeyboardLockSwitch,
+        ):
+            results[f"write_{entity_class.__name__}"] = await _async_measure(
+                lambda entity_class=entity_class: fleet.async_write(entity_class), rounds
+            )
+        results["command"] = await _async_measure(fleet.async_command, rounds)
+
+        # A day of samples heating and cooling at rates spread over the fleet
+        times = np.cumsum(np.full((units, ANALYTICS_WINDOW), 300.0), axis=1)
+        signs = np.where(np.arange(ANALYTICS_WINDOW) % 96 < 48, 1.0, -1.0) * np.ones((units, 1))
+        rates = np.random.default_rng(0).normal(1.0, 0.2, (units, 1)) / 3600
+        temps = 20 + np.cumsum(signs * rates * 300, axis=1)
+
+        async def _async_analyze() -> None:
+            analyze(times, temps, signs)
+
+        results["analytics"] = await _async_measure(_async_analyze, rounds)
+
+        await fleet.async_shutdown()
+        await hass.async_stop(force=True)
+    return results
+
+
+def _revision() -> str | None:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=ROOT,
+            capture_output=True,
+            check=True,
+            text=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def _previous_runs(history: Path) -> dict[int, dict[str, Any]]:
+    """Return the last recorded run of every scenario."""
+    runs: dict[int, dict[str, Any]] = {}
+    if history.exists():
+        for line in history.read_text().splitlines():
+            run = json.loads(line)
+            runs[run["units"]] = run
+    return runs
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--units", type=int, nargs="+", default=[1, 10, 50, 200])
+    parser.add_argument("--rounds", type=int, default=20, help="measured rounds per action")
+    parser.add_argument("--history", type=Path, default=DEFAULT_HISTORY)
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=0.2,
+        help="relative slowdown of the mean reported as a regression",
+    )
+    parser.add_argument("--no-save", action="store_true", help="do not record the run")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.WARNING)
+    previous = _previous_runs(args.history)
+    revision = _revision()
+    regressions = 0
+
+    for units in args.units:
+        results = asyncio.run(async_run_scenario(units, args.rounds))
+        print(f"{units} units")
+        for action, result in results.items():
+            line = (
+                f"  {action:32} {result['mean_ms']:9.3f} ms"
+                f" {result['peak_kib']:9.1f} KiB peak"
+            )
+            if "state_writes" in result:
+                line += f" {result['state_writes']:7.1f} writes"
+            if (old := previous.get(units, {}).get("results", {}).get(action)) is not None:
+                change = result["mean_ms"] / old["mean_ms"] - 1 if old["mean_ms"] else 0
+                line += f" {change:+7.1%}"
+                if change > args.threshold:
+                    line += " REGRESSION"
+                    regressions += 1
+            print(line)
+
+        if not args.no_save:
+            args.history.parent.mkdir(parents=True, exist_ok=True)
+            with args.history.open("a") as history:
+                history.write(
+                    json.dumps(
+                        {
+                            "time": datetime.now(timezone.utc).isoformat(),
+                            "revision": revision,
+                            "python": sys.version.split()[0],
+                            "units": units,
+                            "rounds": args.rounds,
+                            "results": results,
+                        }
+                    )
+                    + "\n"
+                )
+
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
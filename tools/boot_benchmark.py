@@ -0,0 +1,148 @@
+"""Measure what the Innova integration adds to the boot of Home Assistant.
+
+* import: the modules imported by the integration and by each of its
+  platforms on top of it, measured with ``python -X importtime`` in a fresh
+  interpreter where the Home Assistant core modules are already imported,
+  as they are when integrations are loaded
+* setup: the creation and first refresh of the coordinators and the
+  entities of fake units, as in benchmark.py
+
+Measurements over their budget make the script exit with a non-zero code.
+
+    python tools/boot_benchmark.py --units 1 50 --import-budget 150
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import logging
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+
+# Imported by Home Assistant before any integration
+BASELINE = (
+    "aiohttp",
+    "voluptuous",
+    "homeassistant.core",
+    "homeassistant.config_entries",
+    "homeassistant.helpers.entity_platform",
+    "homeassistant.helpers.update_coordinator",
+    "homeassistant.helpers.storage",
+)
+MARKER = "--- baseline imported ---\n"
+PACKAGE = "custom_components.innova"
+MODULES = (
+    PACKAGE,
+    "custom_components.innova.config_flow",
+    "custom_components.innova.climate",
+    "custom_components.innova.sensor",
+    "custom_components.innova.switch",
+    "custom_components.innova.binary_sensor",
+)
+
+
+def measure_import(module: str) -> tuple[float, list[tuple[float, str]]]:
+    """Return the import time of a module in ms and its slowest imports."""
+    baseline = BASELINE
+    if module != PACKAGE:
+        baseline = (*baseline, PACKAGE)
+    code = "; ".join(
+        [
+            *(f"import {name}" for name in baseline),
+            "import sys",
+            f"sys.stderr.write({MARKER!r})",
+            "sys.stderr.flush()",
+            f"import {module}",
+        ]
+    )
+    process = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        cwd=ROOT,
+        capture_output=True,
+        check=True,
+        text=True,
+    )
+    # Only the imports done after the baseline are the cost of the module
+    output = process.stderr.split(MARKER, 1)[1]
+    imports: list[tuple[float, str]] = []
+    total = 0.0
+    for line in output.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        self_us, cumulative_us, name = line.removeprefix("import time:").split("|")
+        if not self_us.strip().isdigit():
+            continue
+        name = name.strip()
+        imports.append((int(self_us) / 1000, name))
+        if name == module:
+            total = int(cumulative_us) / 1000
+    imports.sort(reverse=True)
+    return total, imports
+
+
+async def async_measure_setup(units: int) -> float:
+    """Return the time to set up a fleet of fake units in ms."""
+    from benchmark import Fleet
+    from homeassistant.core import HomeAssistant
+    from homeassistant.helpers import frame
+
+    with tempfile.TemporaryDirectory() as config_dir:
+        hass = HomeAssistant(config_dir)
+        frame.async_setup(hass)
+        start = time.perf_counter()
+        fleet = Fleet(hass, units)
+        await fleet.async_setup()
+        duration = time.perf_counter() - start
+        await fleet.async_shutdown()
+        await hass.async_stop(force=True)
+    return duration * 1000
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--units", type=int, nargs="+", default=[1, 50])
+    parser.add_argument("--rounds", type=int, default=5, help="runs of each measurement")
+    parser.add_argument("--top", type=int, default=5, help="slowest imports listed")
+    parser.add_argument(
+        "--import-budget", type=float, default=150.0, help="ms per module import"
+    )
+    parser.add_argument(
+        "--setup-budget", type=float, default=10.0, help="ms of setup per unit"
+    )
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.WARNING)
+    over_budget = 0
+
+    for module in MODULES:
+        runs = [measure_import(module) for _ in range(args.rounds)]
+        total = statistics.median(run[0] for run in runs)
+        line = f"import {module:40} {total:9.1f} ms"
+        if total > args.import_budget:
+            line += " OVER BUDGET"
+            over_budget += 1
+        print(line)
+        for duration, name in runs[0][1][: args.top]:
+            print(f"    {duration:9.1f} ms {name}")
+
+    for units in args.units:
+        total = statistics.median(
+            asyncio.run(async_measure_setup(units)) for _ in range(args.rounds)
+        )
+        line = f"setup {units:4} units {total:38.1f} ms {total / units:7.2f} ms/unit"
+        if total / units > args.setup_budget:
+            line += " OVER BUDGET"
+            over_budget += 1
+        print(line)
+
+    return 1 if over_budget else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
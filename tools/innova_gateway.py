@@ -0,0 +1,315 @@
+"""Share the local API of Innova units between many clients.
+
+The gateway is the only client polling the units. Each unit is polled over
+a single keep-alive connection, its last status is served to any number of
+clients from cache, and commands are forwarded one at a time, followed by a
+poll so every client sees their effect.
+
+Clients use the same API as the units under ``/units/<unit host>``, so the
+integration or innova_controls only need ``<gateway>/units/<unit host>``
+as their host:
+
+* ``GET /units/<host>/api/v/1/status``: last status of the unit, 503 once
+  the unit stopped answering
+* ``POST /units/<host>/api/v/1/<command>``: command forwarded to the unit
+* ``GET /units/<host>/api/v/1/events?wait=<s>``: long-poll answered with
+  the ETag of the status once it differs from ``If-None-Match``
+* ``GET /units``: the units and how they are polled
+* ``GET /ws``: WebSocket receiving ``{"host": ..., "status": ...}`` on every
+  change, optionally filtered by sending ``{"subscribe": [hosts]}``
+
+    python tools/innova_gateway.py 192.168.1.20 192.168.1.21 --port 8080
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import logging
+import time
+import zlib
+from typing import Any
+
+import aiohttp
+from aiohttp import web
+
+_LOGGER = logging.getLogger("innova_gateway")
+
+API_PREFIX = "api/v/1"
+READ_TIMEOUT = aiohttp.ClientTimeout(total=10, connect=3, sock_read=7)
+WRITE_TIMEOUT = aiohttp.ClientTimeout(total=15, connect=3, sock_read=12)
+KEEPALIVE_TIMEOUT = 60
+# Seconds after a command before polling the unit to publish its effect
+CONFIRM_DELAY = 2
+# Longest hold of an event request
+EVENTS_MAX_WAIT = 120.0
+# Failed polls in a row, or poll intervals without a status, before the cached
+# status is no longer served and clients see the unit as unreachable
+MAX_FAILURES = 3
+
+
+class UnitPoller:
+    """Poll one unit and forward its commands, one request at a time."""
+
+    def __init__(self, host: str, interval: float, max_interval: float) -> None:
+        self.host = host
+        self.interval = interval
+        self.max_interval = max_interval
+        self.status: dict[str, Any] | None = None
+        self.etag: str | None = None
+        self.updated: float | None = None
+        self.polls = 0
+        self.commands = 0
+        self.failures = 0
+        self.consecutive_failures = 0
+        self.listeners: set[asyncio.Queue[dict[str, Any]]] = set()
+        self._lock = asyncio.Lock()
+        self._changed = asyncio.Condition()
+        self._wakeup = asyncio.Event()
+        self._session = aiohttp.ClientSession(
+            connector=aiohttp.TCPConnector(
+                limit=1, limit_per_host=1, keepalive_timeout=KEEPALIVE_TIMEOUT
+            )
+        )
+
+    @property
+    def reachable(self) -> bool:
+        """Return True while the cached status is recent enough to be served."""
+        return (
+            self.updated is not None
+            and self.consecutive_failures < MAX_FAILURES
+            and time.time() - self.updated <= MAX_FAILURES * self.interval
+        )
+
+    @property
+    def next_interval(self) -> float:
+        """Return the delay before the next poll, backing off on failures."""
+        return min(self.interval * 2**self.consecutive_failures, self.max_interval)
+
+    async def async_run(self) -> None:
+        """Poll until cancelled."""
+        while True:
+            await self.async_poll()
+            self._wakeup.clear()
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), self.next_interval)
+            except asyncio.TimeoutError:
+                pass
+
+    async def async_poll(self) -> None:
+        """Refresh the cached status and notify the clients of a change."""
+        async with self._lock:
+            self.polls += 1
+            try:
+                async with self._session.get(
+                    f"http://{self.host}/{API_PREFIX}/status", timeout=READ_TIMEOUT
+                ) as response:
+                    data = await response.json(content_type=None)
+            except (aiohttp.ClientError, asyncio.TimeoutError, ValueError) as err:
+                self._failed(err)
+                return
+        if not isinstance(data, dict) or not data.get("success"):
+            self._failed("unsuccessful status")
+            return
+
+        self.consecutive_failures = 0
+        self.updated = time.time()
+        etag = f'"{zlib.crc32(json.dumps(data, sort_keys=True).encode()):08x}"'
+        if etag == self.etag:
+            return
+        self.status = data
+        self.etag = etag
+        async with self._changed:
+            self._changed.notify_all()
+        for queue in self.listeners:
+            queue.put_nowait({"host": self.host, "status": data})
+
+    async def async_command(
+        self, command: str, body: bytes, content_type: str
+    ) -> tuple[int, bytes]:
+        """Forward a command to the unit and poll it soon after."""
+        async with self._lock:
+            self.commands += 1
+            try:
+                async with self._session.post(
+                    f"http://{self.host}/{API_PREFIX}/{command}",
+                    data=body,
+                    headers={"Content-Type": content_type},
+                    timeout=WRITE_TIMEOUT,
+                ) as response:
+                    result = response.status, await response.read()
+            except (aiohttp.ClientError, asyncio.TimeoutError) as err:
+                self._failed(err)
+                return 502, b'{"success": false}'
+        asyncio.get_running_loop().call_later(CONFIRM_DELAY, self._wakeup.set)
+        return result
+
+    async def async_wait(self, known: str | None, wait: float) -> bool:
+        """Wait until the status differs from a known ETag, False on timeout."""
+        async with self._changed:
+            try:
+                await asyncio.wait_for(
+                    self._changed.wait_for(lambda: self.etag != known), wait
+                )
+            except asyncio.TimeoutError:
+                return False
+        return True
+
+    async def async_close(self) -> None:
+        await self._session.close()
+
+    def as_dict(self) -> dict[str, Any]:
+        return {
+            "host": self.host,
+            "updated": self.updated,
+            "age": time.time() - self.updated if self.updated is not None else None,
+            "reachable": self.reachable,
+            "polls": self.polls,
+            "commands": self.commands,
+            "failures": self.failures,
+            "consecutive_failures": self.consecutive_failures,
+            "next_interval": self.next_interval,
+            "clients": len(self.listeners),
+        }
+
+    def _failed(self, err: object) -> None:
+        self.failures += 1
+        self.consecutive_failures += 1
+        _LOGGER.warning("Polling %s failed: %s", self.host, err)
+
+
+class Gateway:
+    """HTTP and WebSocket front end of the polled units."""
+
+    def __init__(self, pollers: dict[str, UnitPoller]) -> None:
+        self.pollers = pollers
+        self.app = web.Application()
+        self.app.router.add_get("/units", self._units)
+        self.app.router.add_get("/ws", self._websocket)
+        self.app.router.add_get(f"/units/{{host}}/{API_PREFIX}/status", self._status)
+        self.app.router.add_get(f"/units/{{host}}/{API_PREFIX}/events", self._events)
+        self.app.router.add_post(
+            f"/units/{{host}}/{API_PREFIX}/{{command:.+}}", self._command
+        )
+
+    def _poller(self, request: web.Request) -> UnitPoller:
+        if (poller := self.pollers.get(request.match_info["host"])) is None:
+            raise web.HTTPNotFound(text="Unknown unit")
+        return poller
+
+    async def _units(self, _request: web.Request) -> web.Response:
+        return web.json_response([poller.as_dict() for poller in self.pollers.values()])
+
+    async def _status(self, request: web.Request) -> web.Response:
+        poller = self._poller(request)
+        if poller.status is None:
+            await poller.async_poll()
+        if poller.status is None or not poller.reachable:
+            return web.json_response({"success": False}, status=503)
+        return web.json_response(poller.status, headers={"ETag": poller.etag})
+
+    async def _events(self, request: web.Request) -> web.Response:
+        poller = self._poller(request)
+        wait = min(float(request.query.get("wait", 0)), EVENTS_MAX_WAIT)
+        known = request.headers.get("If-None-Match")
+        if poller.etag is None:
+            await poller.async_poll()
+        if poller.etag is not None and not poller.reachable:
+            # Clients go back to polling the status, and see the unit fail
+            return web.json_response({"success": False}, status=503)
+        if poller.etag is None or not await poller.async_wait(known, wait):
+            return web.Response(status=304, headers={"ETag": poller.etag or '""'})
+        return web.Response(headers={"ETag": poller.etag})
+
+    async def _command(self, request: web.Request) -> web.Response:
+        poller = self._poller(request)
+        status, body = await poller.async_command(
+            request.match_info["command"],
+            await request.read(),
+            request.headers.get("Content-Type", "application/x-www-form-urlencoded"),
+        )
+        return web.Response(status=status, body=body, content_type="application/json")
+
+    async def _websocket(self, request: web.Request) -> web.WebSocketResponse:
+        websocket = web.WebSocketResponse(heartbeat=30)
+        await websocket.prepare(request)
+        queue: asyncio.Queue[dict[str, Any]] = asyncio.Queue()
+        subscribed = set(self.pollers)
+
+        async def _async_send() -> None:
+            while True:
+                message = await queue.get()
+                if message["host"] in subscribed:
+                    await websocket.send_json(message)
+
+        for poller in self.pollers.values():
+            poller.listeners.add(queue)
+            if poller.status is not None:
+                queue.put_nowait({"host": poller.host, "status": poller.status})
+        sender = asyncio.create_task(_async_send())
+        try:
+            async for message in websocket:
+                if message.type != aiohttp.WSMsgType.TEXT:
+                    continue
+                try:
+                    hosts = json.loads(message.data)["subscribe"]
+                except (ValueError, KeyError, TypeError):
+                    await websocket.send_json({"error": "expected {\"subscribe\": [hosts]}"})
+                    continue
+                subscribed = set(hosts) & set(self.pollers)
+        finally:
+            sender.cancel()
+            for poller in self.pollers.values():
+                poller.listeners.discard(queue)
+        return websocket
+
+
+async def async_main(args: argparse.Namespace) -> None:
+    """Poll the units and serve them until interrupted."""
+    pollers = {
+        host: UnitPoller(host, args.interval, args.max_interval) for host in args.units
+    }
+    tasks = []
+    for index, poller in enumerate(pollers.values()):
+        # Spread the first polls so the units are not all polled at once
+        await asyncio.sleep(index * args.interval / len(pollers) / 10)
+        tasks.append(asyncio.create_task(poller.async_run()))
+
+    runner = web.AppRunner(Gateway(pollers).app, access_log=None)
+    await runner.setup()
+    await web.TCPSite(runner, args.bind, args.port).start()
+    _LOGGER.info("Serving %d units on %s:%d", len(pollers), args.bind, args.port)
+    try:
+        await asyncio.Event().wait()
+    finally:
+        for task in tasks:
+            task.cancel()
+        await runner.cleanup()
+        for poller in pollers.values():
+            await poller.async_close()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("units", nargs="+", help="host of each unit, with its port if any")
+    parser.add_argument("--bind", default="127.0.0.1", help="address to listen on")
+    parser.add_argument("--port", type=int, default=8080, help="port to listen on")
+    parser.add_argument("--interval", type=float, default=30.0, help="seconds between polls")
+    parser.add_argument(
+        "--max-interval", type=float, default=600.0, help="longest poll interval on failures"
+    )
+    parser.add_argument("--debug", action="store_true", help="log debug messages")
+    args = parser.parse_args()
+
+    logging.basicConfig(
+        level=logging.DEBUG if args.debug else logging.INFO,
+        format="%(asctime)s %(levelname)s %(message)s",
+    )
+    try:
+        asyncio.run(async_main(args))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
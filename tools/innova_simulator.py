@@ -0,0 +1,353 @@
+"""Simulate Innova units on the local machine.
+
+Every simulated unit listens on its own port and answers the local HTTP API
+used by innova_controls, so the integration can be added with a host such
+as ``127.0.0.1:8001``. Network conditions and the room temperature are
+simulated as well, to reproduce the behaviour of a fleet without hardware.
+
+    python tools/innova_simulator.py --units 40 --latency 0.2 --loss 0.02
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import logging
+import random
+import time
+import zlib
+from dataclasses import dataclass, field
+from typing import Any
+
+from aiohttp import web
+
+_LOGGER = logging.getLogger("innova_simulator")
+
+MODEL_TWOPOINTZERO = "001"
+MODEL_AIRLEAF = "002"
+
+# Mode command -> mode code, per model
+MODE_CODES = {
+    MODEL_TWOPOINTZERO: {
+        "heating": 0,
+        "cooling": 1,
+        "dehumidification": 3,
+        "fanonly": 4,
+        "auto": 5,
+    },
+    MODEL_AIRLEAF: {"heating": 3, "cooling": 5},
+}
+HEATING_CODES = {MODEL_TWOPOINTZERO: {0, 5}, MODEL_AIRLEAF: {3}}
+COOLING_CODES = {MODEL_TWOPOINTZERO: {1, 3, 5}, MODEL_AIRLEAF: {5}}
+# AirLeaf functions replace the fan speed and night mode of the 2.0
+AIRLEAF_FUNCTIONS = {"auto": 1, "night": 2, "min": 3, "max": 4}
+# Longest hold of an event request, and how often the state is checked meanwhile
+EVENTS_MAX_WAIT = 120.0
+EVENTS_CHECK_INTERVAL = 0.5
+
+
+@dataclass
+class NetworkConditions:
+    """Network behaviour shared by the simulated units."""
+
+    latency: float = 0.05
+    jitter: float = 0.02
+    # Probability of dropping the connection without answering
+    loss: float = 0.0
+    # Probability of answering after slow_delay instead of the latency
+    slow_rate: float = 0.0
+    slow_delay: float = 25.0
+
+    async def async_delay(self, request: web.Request) -> bool:
+        """Delay a request, return False if it was dropped."""
+        if random.random() < self.loss:
+            if request.transport is not None:
+                request.transport.close()
+            return False
+        if random.random() < self.slow_rate:
+            await asyncio.sleep(self.slow_delay)
+        else:
+            await asyncio.sleep(max(0.0, random.gauss(self.latency, self.jitter)))
+        return True
+
+
+@dataclass
+class ThermalModel:
+    """Room temperature moving towards the setpoint while the unit runs."""
+
+    # Degrees per minute while the unit is heating or cooling
+    rate: float = 0.5
+    # Fraction of the gap to the outdoor temperature closed per minute when idle
+    leak: float = 0.02
+    outdoor: float = 12.0
+    noise: float = 0.05
+
+
+@dataclass
+class SimulatedUnit:
+    """State of one simulated Innova unit."""
+
+    index: int
+    model: str
+    thermal: ThermalModel
+    ambient: float = 20.0
+    water: float = 35.0
+    setpoint: float = 21.0
+    power: bool = False
+    mode: int = 0
+    fan: int = 0
+    rotation: int = 7
+    night: int = 0
+    calendar: int = 0
+    lock: int = 0
+    function: int = 1
+    requests: int = 0
+    commands: int = 0
+    updated: float = field(default_factory=time.monotonic)
+
+    @property
+    def serial(self) -> str:
+        return f"SIM{self.index:05d}"
+
+    @property
+    def uid(self) -> str:
+        return f"02:00:00:00:{self.index // 256:02x}:{self.index % 256:02x}"
+
+    def drift(self, noise: bool = True) -> None:
+        """Advance the room temperature to now."""
+        now = time.monotonic()
+        minutes = (now - self.updated) / 60
+        self.updated = now
+        thermal = self.thermal
+        gap = self.setpoint - self.ambient
+        if self.power and gap > 0 and self.mode in HEATING_CODES[self.model]:
+            self.ambient += min(gap, thermal.rate * minutes)
+        elif self.power and gap < 0 and self.mode in COOLING_CODES[self.model]:
+            self.ambient += max(gap, -thermal.rate * minutes)
+        else:
+            self.ambient += (thermal.outdoor - self.ambient) * min(1.0, thermal.leak * minutes)
+        if noise:
+            self.ambient += random.gauss(0, thermal.noise)
+
+    def status(self, host: str) -> dict[str, Any]:
+        """Return the status document of the unit."""
+        self.drift()
+        if self.model == MODEL_AIRLEAF:
+            result = {
+                "ta": round(self.ambient * 10),
+                "tw": round(self.water * 10),
+                "sp": round(self.setpoint * 10),
+                "fn": self.function,
+            }
+        else:
+            result = {
+                "t": round(self.ambient, 1),
+                "sp": self.setpoint,
+                "fs": self.fan,
+                "fr": self.rotation,
+                "nm": self.night,
+            }
+        result.update(
+            {"ps": int(self.power), "wm": self.mode, "cm": self.calendar, "kl": self.lock}
+        )
+        return {
+            "success": True,
+            "deviceType": self.model,
+            "RESULT": result,
+            "setup": {"name": f"Innova {self.index}", "serial": self.serial},
+            "UID": self.uid,
+            "sw": {"V": "1.0.0-sim"},
+            "net": {"ip": host},
+        }
+
+    def etag(self) -> str:
+        """Return a tag of the state, changing with it."""
+        self.drift(noise=False)
+        state = (
+            self.power,
+            self.mode,
+            self.setpoint,
+            self.fan,
+            self.rotation,
+            self.night,
+            self.calendar,
+            self.lock,
+            self.function,
+            # Half degree steps, sensor noise alone is not a change
+            round(self.ambient * 2) / 2,
+        )
+        return f'"{zlib.crc32(repr(state).encode()):08x}"'
+
+    def command(self, command: str, data: dict[str, Any]) -> bool:
+        """Apply a command, return False if the unit does not support it."""
+        self.drift()
+        group, _, value = command.rpartition("/")
+        if command == "power/on":
+            self.power = True
+        elif command == "power/off":
+            self.power = False
+        elif group == "set/mode" and value in MODE_CODES[self.model]:
+            self.power = True
+            self.mode = MODE_CODES[self.model][value]
+        elif command == "set/setpoint":
+            if self.model == MODEL_AIRLEAF:
+                self.setpoint = float(data["temp"]) / 10
+            else:
+                self.setpoint = float(data["p_temp"])
+        elif command == "set/fan" and self.model == MODEL_TWOPOINTZERO:
+            self.fan = int(data["value"])
+        elif command == "set/feature/rotation" and self.model == MODEL_TWOPOINTZERO:
+            self.rotation = int(data["value"])
+        elif command == "set/feature/night" and self.model == MODEL_TWOPOINTZERO:
+            self.night = int(data["value"])
+        elif group == "set/function" and self.model == MODEL_AIRLEAF:
+            if value not in AIRLEAF_FUNCTIONS:
+                return False
+            self.function = AIRLEAF_FUNCTIONS[value]
+        elif group == "set/calendar":
+            self.calendar = int(value == "on")
+        elif group == "set/lock" and self.model == MODEL_AIRLEAF:
+            self.lock = int(value == "on")
+        else:
+            return False
+        return True
+
+
+class UnitServer:
+    """HTTP front end of a simulated unit."""
+
+    def __init__(
+        self, unit: SimulatedUnit, network: NetworkConditions, events: bool = False
+    ) -> None:
+        self.unit = unit
+        self.network = network
+        self.app = web.Application()
+        self.app.router.add_get("/api/v/1/status", self._status)
+        if events:
+            self.app.router.add_get("/api/v/1/events", self._events)
+        self.app.router.add_post("/api/v/1/{command:.+}", self._command)
+
+    async def _status(self, request: web.Request) -> web.Response:
+        self.unit.requests += 1
+        if not await self.network.async_delay(request):
+            return web.Response()
+        return web.json_response(self.unit.status(request.host))
+
+    async def _events(self, request: web.Request) -> web.Response:
+        """Hold the request until the state differs from If-None-Match."""
+        self.unit.requests += 1
+        wait = min(float(request.query.get("wait", 0)), EVENTS_MAX_WAIT)
+        known = request.headers.get("If-None-Match")
+        deadline = time.monotonic() + wait
+        while (etag := self.unit.etag()) == known:
+            if time.monotonic() >= deadline:
+                return web.Response(status=304, headers={"ETag": etag})
+            await asyncio.sleep(EVENTS_CHECK_INTERVAL)
+        return web.Response(headers={"ETag": etag})
+
+    async def _command(self, request: web.Request) -> web.Response:
+        self.unit.requests += 1
+        if not await self.network.async_delay(request):
+            return web.Response()
+        if request.content_type == "application/json":
+            data = await request.json()
+        else:
+            data = dict(await request.post())
+        try:
+            success = self.unit.command(request.match_info["command"], data)
+        except (KeyError, ValueError):
+            success = False
+        if success:
+            self.unit.commands += 1
+        return web.json_response({"success": success})
+
+
+def _model(args: argparse.Namespace, index: int) -> str:
+    if args.model == "airleaf":
+        return MODEL_AIRLEAF
+    if args.model == "mixed":
+        return MODEL_AIRLEAF if index % 2 else MODEL_TWOPOINTZERO
+    return MODEL_TWOPOINTZERO
+
+
+async def async_main(args: argparse.Namespace) -> None:
+    """Start the units and serve them until interrupted."""
+    network = NetworkConditions(
+        latency=args.latency,
+        jitter=args.jitter,
+        loss=args.loss,
+        slow_rate=args.slow_rate,
+        slow_delay=args.slow_delay,
+    )
+    thermal = ThermalModel(
+        rate=args.drift_rate, leak=args.leak, outdoor=args.outdoor, noise=args.noise
+    )
+    units: list[SimulatedUnit] = []
+    runners: list[web.AppRunner] = []
+    for index in range(args.units):
+        unit = SimulatedUnit(
+            index,
+            _model(args, index),
+            thermal,
+            ambient=random.uniform(17, 23),
+        )
+        runner = web.AppRunner(
+            UnitServer(unit, network, args.events).app, access_log=None
+        )
+        await runner.setup()
+        await web.TCPSite(runner, args.bind, args.port + index).start()
+        units.append(unit)
+        runners.append(runner)
+
+    _LOGGER.info(
+        "Simulating %d units on %s:%d-%d",
+        len(units),
+        args.bind,
+        args.port,
+        args.port + len(units) - 1,
+    )
+    try:
+        await asyncio.Event().wait()
+    finally:
+        for runner in runners:
+            await runner.cleanup()
+        _LOGGER.info(
+            "Served %d requests and %d commands",
+            sum(unit.requests for unit in units),
+            sum(unit.commands for unit in units),
+        )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--units", type=int, default=1, help="number of units")
+    parser.add_argument("--bind", default="127.0.0.1", help="address to listen on")
+    parser.add_argument("--port", type=int, default=8001, help="port of the first unit")
+    parser.add_argument(
+        "--model", choices=("2.0", "airleaf", "mixed"), default="2.0", help="unit model"
+    )
+    parser.add_argument("--latency", type=float, default=0.05, help="mean latency (s)")
+    parser.add_argument("--jitter", type=float, default=0.02, help="latency deviation (s)")
+    parser.add_argument("--loss", type=float, default=0.0, help="dropped request rate")
+    parser.add_argument("--slow-rate", type=float, default=0.0, help="slow response rate")
+    parser.add_argument("--slow-delay", type=float, default=25.0, help="slow response delay (s)")
+    parser.add_argument("--drift-rate", type=float, default=0.5, help="°C per minute when running")
+    parser.add_argument("--leak", type=float, default=0.02, help="idle drift to outdoor per minute")
+    parser.add_argument("--outdoor", type=float, default=12.0, help="outdoor temperature (°C)")
+    parser.add_argument("--noise", type=float, default=0.05, help="sensor noise (°C)")
+    parser.add_argument(
+        "--events", action="store_true", help="serve the long-poll event channel"
+    )
+    parser.add_argument("--seed", type=int, help="random seed, for reproducible runs")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(message)s")
+    if args.seed is not None:
+        random.seed(args.seed)
+    try:
+        asyncio.run(async_main(args))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()